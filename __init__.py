@@ -0,0 +1,67 @@
+"""
+Ahrefs SDK.
+
+Public names are resolved lazily (PEP 562) so `import ...ahrefs` costs almost
+nothing; a submodule is imported the first time one of its names is used.
+"""
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    from .client import AhrefsClient
+    from .config import AhrefsSettings, get_client, get_settings
+    from .errors import (
+        AhrefsAPIError,
+        AhrefsAuthError,
+        AhrefsBatchError,
+        AhrefsBudgetExceededError,
+        AhrefsCassetteMissError,
+        AhrefsError,
+        AhrefsKeyPoolExhaustedError,
+        AhrefsRateLimitError,
+        AhrefsResponseValidationError,
+    )
+    from .hooks import HookRegistry
+    from .metrics import REGISTRY, MetricsRegistry
+    from .units import LEDGER, BudgetGuard, CostTable, UnitLedger, tagged
+
+_EXPORTS: Dict[str, str] = {
+    "AhrefsClient": "client",
+    "AhrefsSettings": "config",
+    "get_client": "config",
+    "get_settings": "config",
+    "AhrefsError": "errors",
+    "AhrefsAPIError": "errors",
+    "AhrefsAuthError": "errors",
+    "AhrefsRateLimitError": "errors",
+    "AhrefsBudgetExceededError": "errors",
+    "AhrefsCassetteMissError": "errors",
+    "AhrefsResponseValidationError": "errors",
+    "AhrefsBatchError": "errors",
+    "AhrefsKeyPoolExhaustedError": "errors",
+    "HookRegistry": "hooks",
+    "MetricsRegistry": "metrics",
+    "REGISTRY": "metrics",
+    "BudgetGuard": "units",
+    "CostTable": "units",
+    "UnitLedger": "units",
+    "LEDGER": "units",
+    "tagged": "units",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value  # cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_EXPORTS))
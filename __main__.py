@@ -0,0 +1,7 @@
+"""`python -m backend.app.core.landing_page.ahrefs`: batch runs over target lists (see cli.py)."""
+import sys
+
+from .cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
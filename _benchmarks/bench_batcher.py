@@ -0,0 +1,67 @@
+"""
+Single-target lookups: one request each vs `MicroBatcher` batch-analysis calls.
+
+`--callers` threads each look up `--lookups` distinct domains against the stub
+(with `--latency` per upstream request). Reports upstream request count, wall
+time and per-lookup p50/p99 latency for both strategies and each window size.
+
+Run:
+    python -m backend.app.core.landing_page.ahrefs._benchmarks.bench_batcher --callers 32 --windows 5,10,20
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+
+from backend.app.core.landing_page.ahrefs.batcher import MicroBatcher
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer, parse_latency
+
+
+def run(lookup: Callable[[str], object], callers: int, lookups: int) -> Tuple[float, List[float]]:
+    def caller(c: int) -> List[float]:
+        samples = []
+        for i in range(lookups):
+            start = time.perf_counter()
+            lookup(f"site{c}-{i}.com")
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(callers) as pool:
+        samples = [s for chunk in pool.map(caller, range(callers)) for s in chunk]
+    return time.perf_counter() - start, samples
+
+
+def report(label: str, requests: int, wall: float, samples: List[float]) -> None:
+    q = statistics.quantiles(samples, n=100)
+    print(f"{label:<18}{requests:>10}{wall:>10.2f}{q[49] * 1000:>10.1f}{q[98] * 1000:>10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callers", type=int, default=32)
+    parser.add_argument("--lookups", type=int, default=20)
+    parser.add_argument("--latency", default="fixed:0.03")
+    parser.add_argument("--windows", default="5,10,20", help="batch windows in ms")
+    args = parser.parse_args()
+
+    print(f"{'strategy':<18}{'requests':>10}{'wall s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    with StubServer(StubConfig(latency=parse_latency(args.latency))) as stub:
+        client = AhrefsClient(api_key="bench", base_url=stub.base_url, rate_limit_per_min=1_000_000, max_retries=0)
+        before = stub.stats.total
+        wall, samples = run(lambda d: client.get_domain_rating(domain=d), args.callers, args.lookups)
+        report("direct", stub.stats.total - before, wall, samples)
+        for window in (float(w) for w in args.windows.split(",")):
+            batcher = MicroBatcher(client, window_s=window / 1000, max_items=100)
+            before = stub.stats.total
+            wall, samples = run(batcher.lookup, args.callers, args.lookups)
+            batcher.close()
+            report(f"batched {window:g}ms", stub.stats.total - before, wall, samples)
+
+
+if __name__ == "__main__":
+    main()
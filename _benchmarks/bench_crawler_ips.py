@@ -0,0 +1,78 @@
+"""
+Crawler IP verification: linear scan over networks vs `CrawlerIPIndex` bisect.
+
+Generates `--ranges` random IPv4/IPv6 networks (roughly the size of the
+published AhrefsBot list and beyond), then checks `--lookups` addresses, about
+`--hit-ratio` of them inside a range. Reports lookups per second.
+
+Run:
+    python -m backend.app.core.landing_page.ahrefs._benchmarks.bench_crawler_ips --ranges 500 --lookups 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import ipaddress
+import random
+import time
+from typing import Any, Callable, List
+
+from backend.app.core.landing_page.ahrefs.crawler_ips import CrawlerIPIndex
+
+
+def make_networks(count: int, rng: random.Random) -> List[Any]:
+    nets = []
+    for i in range(count):
+        if i % 5 == 4:
+            nets.append(ipaddress.IPv6Network((rng.getrandbits(128) >> 80 << 80, 48)))
+        else:
+            prefix = rng.choice((22, 23, 24, 28, 32))
+            nets.append(ipaddress.IPv4Network((rng.getrandbits(32) >> (32 - prefix) << (32 - prefix), prefix)))
+    return nets
+
+
+def make_queries(nets: List[Any], count: int, hit_ratio: float, rng: random.Random) -> List[str]:
+    queries = []
+    for _ in range(count):
+        if rng.random() < hit_ratio:
+            net = rng.choice(nets)
+            queries.append(str(net.network_address + rng.randrange(min(net.num_addresses, 1 << 16))))
+        else:
+            queries.append(str(ipaddress.IPv4Address(rng.getrandbits(32))))
+    return queries
+
+
+def rate(fn: Callable[[str], bool], queries: List[str]) -> float:
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return len(queries) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ranges", type=int, default=500)
+    parser.add_argument("--lookups", type=int, default=1_000_000)
+    parser.add_argument("--hit-ratio", type=float, default=0.1)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    nets = make_networks(args.ranges, rng)
+    queries = make_queries(nets, args.lookups, args.hit_ratio, rng)
+
+    start = time.perf_counter()
+    index = CrawlerIPIndex.from_networks(nets)
+    print(f"{index!r} built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    def linear(ip: str) -> bool:
+        addr = ipaddress.ip_address(ip)
+        return any(addr in net for net in nets)
+
+    scan_queries = queries[: max(1, args.lookups // 200)]  # the scan is too slow for the full set
+    print(f"{'linear scan':<16}{rate(linear, scan_queries):>14,.0f} lookups/s")
+    print(f"{'index (str)':<16}{rate(index.is_ahrefs_crawler, queries):>14,.0f} lookups/s")
+    contains = index.__contains__
+    print(f"{'index in-op':<16}{rate(contains, queries):>14,.0f} lookups/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Cold-start benchmark: import (and first-use) cost of the SDK and router.
+
+Each scenario runs in a fresh interpreter, `--runs` times; the table reports the
+median and best time spent in the scenario itself (interpreter start excluded)
+and the number of modules loaded. `--detail NAME` prints the slowest imports of one scenario
+(`python -X importtime`).
+
+Run:
+    python -m backend.app.core.landing_page.ahrefs._benchmarks.bench_import --runs 7
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+PKG = "backend.app.core.landing_page.ahrefs"
+
+SCENARIOS: Dict[str, str] = {
+    "package": f"import {PKG}",
+    "client": f"from {PKG}.client import AhrefsClient; AhrefsClient(api_key='x')",
+    "client+session": f"from {PKG}.client import AhrefsClient; AhrefsClient(api_key='x').session",
+    "config": f"from {PKG}.config import get_client; get_client()",
+    "router": f"from {PKG}.api import router",
+    "router(site-explorer)": f"from {PKG}.api.routes import build_router; build_router(['site-explorer'])",
+}
+
+_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+exec({code!r})
+print(json.dumps([time.perf_counter() - start, len(sys.modules)]))
+"""
+
+
+def run_once(code: str) -> Tuple[float, int]:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(code=code)],
+        capture_output=True, text=True, check=True,
+    )
+    elapsed, modules = json.loads(out.stdout.strip().splitlines()[-1])
+    return elapsed, modules
+
+
+def detail(code: str, top: int) -> None:
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+    rows: List[Tuple[int, str]] = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((int(cumulative_us), name))
+    for cumulative_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>10.1f} ms  {name}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--only", help="comma-separated scenario names")
+    parser.add_argument("--detail", help="print the slowest imports of one scenario")
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    if args.detail:
+        detail(SCENARIOS[args.detail], args.top)
+        return
+
+    names = args.only.split(",") if args.only else list(SCENARIOS)
+    print(f"{'scenario':<24}{'median ms':>12}{'min ms':>10}{'modules':>10}")
+    for name in names:
+        samples = [run_once(SCENARIOS[name]) for _ in range(args.runs)]
+        times = [t for t, _ in samples]
+        print(f"{name:<24}{statistics.median(times) * 1000:>12.1f}{min(times) * 1000:>10.1f}{samples[-1][1]:>10}")
+
+
+if __name__ == "__main__":
+    main()
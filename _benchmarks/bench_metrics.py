@@ -0,0 +1,94 @@
+"""
+Overhead benchmark for the metrics registry.
+
+Compares the sharded, lock-free registry against a single lock-protected
+counter, single-threaded and under thread contention, and measures the full
+per-request instrumentation cost of `AhrefsClient._request`.
+
+Run:
+    python -m backend.app.core.landing_page.ahrefs._benchmarks.bench_metrics
+"""
+from __future__ import annotations
+
+import threading
+import time
+from types import SimpleNamespace
+from typing import Callable
+
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.metrics import MetricsRegistry
+
+N = 200_000
+THREADS = 8
+
+
+class LockedCounter:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: dict = {}
+
+    def inc(self, name, labels=(), value=1.0) -> None:
+        with self._lock:
+            key = (name, labels)
+            self._values[key] = self._values.get(key, 0.0) + value
+
+
+def _per_op_ns(fn: Callable[[], None], n: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter_ns() - start) / n
+
+
+def _threaded_ops_per_s(fn: Callable[[], None], n: int, threads: int) -> float:
+    def work() -> None:
+        for _ in range(n):
+            fn()
+
+    pool = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return n * threads / (time.perf_counter() - start)
+
+
+def main() -> None:
+    labels = (("endpoint", "/site-explorer/metrics"), ("method", "GET"), ("status", "2xx"))
+    reg = MetricsRegistry()
+    locked = LockedCounter()
+
+    print(f"{'operation':<40}{'ns/op':>10}")
+    print(f"{'baseline: empty call':<40}{_per_op_ns(lambda: None, N):>10.0f}")
+    print(f"{'sharded inc':<40}{_per_op_ns(lambda: reg.inc('c', labels), N):>10.0f}")
+    print(f"{'locked inc':<40}{_per_op_ns(lambda: locked.inc('c', labels), N):>10.0f}")
+    print(f"{'sharded observe':<40}{_per_op_ns(lambda: reg.observe('h', labels, 0.042), N):>10.0f}")
+
+    print()
+    print(f"{'contended ({} threads)'.format(THREADS):<40}{'ops/s':>14}")
+    print(f"{'sharded inc':<40}{_threaded_ops_per_s(lambda: reg.inc('c', labels), N // THREADS, THREADS):>14,.0f}")
+    print(f"{'locked inc':<40}{_threaded_ops_per_s(lambda: locked.inc('c', labels), N // THREADS, THREADS):>14,.0f}")
+
+    # Full request path with a canned response: instrumented vs. noop registry
+    resp = SimpleNamespace(status_code=200, content=b"{}", text="{}", json=lambda: {}, raw=None)
+
+    class NoopRegistry(MetricsRegistry):
+        def inc(self, *a, **k): pass
+        def gauge_add(self, *a, **k): pass
+        def observe(self, *a, **k): pass
+
+    results = {}
+    for name, registry in (("noop", NoopRegistry()), ("instrumented", MetricsRegistry())):
+        client = AhrefsClient(api_key="bench", rate_limit_per_min=10**9, metrics=registry)
+        client.session.request = lambda **kw: resp
+        results[name] = _per_op_ns(lambda: client.get_metrics(target="example.com"), N // 10)
+
+    print()
+    print(f"{'client._request noop metrics':<40}{results['noop']:>10.0f} ns/op")
+    print(f"{'client._request instrumented':<40}{results['instrumented']:>10.0f} ns/op")
+    print(f"{'instrumentation overhead':<40}{results['instrumented'] - results['noop']:>10.0f} ns/op")
+
+
+if __name__ == "__main__":
+    main()
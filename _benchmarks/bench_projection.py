@@ -0,0 +1,63 @@
+"""
+Router responses with and without `?fields=`.
+
+Calls a rows endpoint through the `/ahrefs` router (FastAPI TestClient, real
+client against the stub with wide `--padding` rows) `--requests` times, once
+returning full rows and once with `--fields`. Reports upstream bytes, router
+response bytes and per-request p50/p99 latency for both.
+
+Run:
+    python -m backend.app.core.landing_page.ahrefs._benchmarks.bench_projection --rows 100 --padding 400
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+from typing import List, Optional, Tuple
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.core.landing_page.ahrefs.api import deps as api_deps
+from backend.app.core.landing_page.ahrefs.api.routes import build_router
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer, StubStats
+
+
+def run(http: TestClient, stats: StubStats, requests: int, fields: Optional[str]) -> Tuple[int, int, List[float]]:
+    url = "/ahrefs/site-explorer/pages-by-traffic" + (f"?fields={fields}" if fields else "")
+    upstream_before = stats.bytes_sent
+    sent = 0
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        resp = http.post(url, json={"target": "example.com"})
+        samples.append(time.perf_counter() - start)
+        sent += len(resp.content)
+    return stats.bytes_sent - upstream_before, sent, samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--padding", type=int, default=400, help="extra bytes per row")
+    parser.add_argument("--fields", default="url_from,traffic")
+    args = parser.parse_args()
+
+    with StubServer(StubConfig(total_rows=args.rows, max_rows=args.rows, row_padding=args.padding)) as stub:
+        client = AhrefsClient(api_key="bench", base_url=stub.base_url, rate_limit_per_min=1_000_000, max_retries=0)
+        app = FastAPI()
+        app.dependency_overrides[api_deps.get_client] = lambda: client
+        app.include_router(build_router(["site-explorer"]))
+        http = TestClient(app)
+        print(f"{'fields':<20}{'upstream KB':>14}{'response KB':>14}{'p50 ms':>10}{'p99 ms':>10}")
+        for fields in (None, args.fields):
+            upstream, sent, samples = run(http, stub.stats, args.requests, fields)
+            q = statistics.quantiles(samples, n=100)
+            print(f"{fields or '(all)':<20}{upstream / 1024:>14.0f}{sent / 1024:>14.0f}{q[49] * 1000:>10.2f}{q[98] * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Decode/processing benchmark on recorded payloads.
+
+Replays every interaction in a cassette through `AhrefsClient` with no network
+and no timing, so the numbers isolate client-side cost (request building,
+decode, accounting). Run it on the same cassette across versions to compare.
+Without --cassette a sample is recorded from the local stub server first.
+
+Run:
+    python -m backend.app.core.landing_page.ahrefs._benchmarks.bench_replay --cassette prod.jsonl.gz
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict
+from urllib.parse import parse_qsl, urlsplit
+
+from backend.app.core.landing_page.ahrefs.cassette import Cassette
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer
+
+
+def record_sample(path: str, rows: int) -> None:
+    with StubServer(StubConfig(total_rows=rows, max_rows=rows)) as stub:
+        client = AhrefsClient(api_key="bench", base_url=stub.base_url, rate_limit_per_min=10**9, cassette_path=path, cassette_mode="record")
+        client.get_backlinks(target="example.com", limit=rows)
+        client.get_refdomains(target="example.com", limit=rows)
+        client.get_serp_overview(query="coffee")
+        client.get_domain_rating_history(target="example.com")
+        client.post_batch_analysis(items=[f"site{i}.com" for i in range(100)])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cassette")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=1000, help="rows per sample response when recording")
+    args = parser.parse_args()
+
+    path = args.cassette
+    if not path:
+        path = os.path.join(tempfile.mkdtemp(), "sample.jsonl.gz")
+        record_sample(path, args.rows)
+
+    cassette = Cassette(path)
+    client = AhrefsClient(api_key="bench", base_url="http://replay.local", rate_limit_per_min=10**9, cassette_path=path)
+
+    print(f"{'request':<60}{'bytes':>10}{'us/req':>10}")
+    for key, entries in sorted(cassette.interactions.items()):
+        method, _, rest = key.partition(" ")
+        target = rest.split("#", 1)[0]
+        parts = urlsplit(target)
+        params = dict(parse_qsl(parts.query))
+        raw_body = entries[0].get("request_body")
+        body: Dict[str, Any] = json.loads(raw_body) if raw_body else {}
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            client._request(method, parts.path, params=params or None, json=body or None)
+        per_req = (time.perf_counter() - start) / args.iterations
+        print(f"{key[:58]:<60}{len(entries[0]['body']):>10,}{per_req * 1e6:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
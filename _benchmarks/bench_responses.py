@@ -0,0 +1,113 @@
+"""
+Typed response rows vs plain dicts vs pydantic on a large backlinks page.
+
+Each strategy decodes the same JSON body and reads `--fields` fields from every
+row. Reports CPU time per page and the peak heap (tracemalloc, separate pass)
+held while the decoded page is alive.
+
+Run:
+    python -m backend.app.core.landing_page.ahrefs._benchmarks.bench_responses --rows 10000
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.app.core.landing_page.ahrefs.responses import BacklinkRow, RowPage
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, build_payload
+
+FIELDS = ("url_from", "domain_rating", "first_seen", "traffic", "anchor", "url_to")
+
+
+def _pydantic_model() -> Any:
+    from pydantic import BaseModel
+
+    class BacklinkModel(BaseModel):
+        url_from: str
+        url_to: Optional[str] = None
+        anchor: Optional[str] = None
+        domain_rating: Optional[float] = None
+        traffic: Optional[int] = None
+        is_dofollow: Optional[bool] = None
+        first_seen: Optional[dt.datetime] = None
+        last_seen: Optional[dt.datetime] = None
+
+    return BacklinkModel
+
+
+def strategies(fields: Tuple[str, ...]) -> Dict[str, Callable[[bytes], Any]]:
+    model = _pydantic_model()
+
+    def dicts(body: bytes) -> Any:
+        rows = json.loads(body)["backlinks"]
+        for row in rows:
+            for name in fields:
+                row.get(name)
+        return rows
+
+    def lazy_rows(body: bytes) -> Any:
+        page = RowPage(BacklinkRow, json.loads(body))
+        rows = list(page)
+        for row in rows:
+            for name in fields:
+                getattr(row, name)
+        return rows
+
+    def strict_rows(body: bytes) -> Any:
+        page = RowPage(BacklinkRow, json.loads(body), strict=True)
+        rows = list(page)
+        for row in rows:
+            for name in fields:
+                getattr(row, name)
+        return rows
+
+    def pydantic(body: bytes) -> Any:
+        rows = [model.model_validate(r) for r in json.loads(body)["backlinks"]]
+        for row in rows:
+            for name in fields:
+                getattr(row, name)
+        return rows
+
+    return {"dict": dicts, "lazy rows": lazy_rows, "strict rows": strict_rows, "pydantic": pydantic}
+
+
+def measure(fn: Callable[[bytes], Any], body: bytes, repeat: int) -> Tuple[float, int]:
+    samples: List[float] = []
+    for _ in range(repeat):
+        start = time.process_time()
+        fn(body)
+        samples.append(time.process_time() - start)
+    tracemalloc.start()
+    try:
+        keep = fn(body)
+        _, peak = tracemalloc.get_traced_memory()
+        del keep
+    finally:
+        tracemalloc.stop()
+    return statistics.median(samples), peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--fields", type=int, default=2, help="fields read per row (1-6)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    payload = build_payload(StubConfig(total_rows=args.rows, max_rows=args.rows), "GET", "/v1/backlinks", {"target": "example.com"}, {})
+    body = json.dumps(payload).encode("utf-8")
+    fields = FIELDS[: max(1, min(args.fields, len(FIELDS)))]
+    print(f"{args.rows:,} rows, {len(body) / 1e6:.1f} MB body, reading {', '.join(fields)}")
+    print(f"{'strategy':<14}{'cpu ms':>10}{'peak MB':>10}")
+    for name, fn in strategies(fields).items():
+        cpu, peak = measure(fn, body, args.repeat)
+        print(f"{name:<14}{cpu * 1000:>10.1f}{peak / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Client and router throughput / latency / memory benchmark against the local stub server.
+
+For each concurrency level it reports requests/s, p50/p99 latency and the peak
+Python heap allocated (tracemalloc). tracemalloc slows the interpreter
+considerably, so memory is measured in a separate, shorter pass.
+
+Run:
+    python -m backend.app.core.landing_page.ahrefs._benchmarks.bench_throughput \
+        --latency lognormal:0.02,0.4 --requests 2000 --concurrency 1,8,32
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer, parse_latency
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def report(label: str, concurrency: int, latencies: List[float], wall_s: float, peak_bytes: int, errors: int) -> None:
+    print(
+        f"{label:<8}{concurrency:>6}{len(latencies) / wall_s:>12,.0f}"
+        f"{percentile(latencies, 0.50) * 1000:>10.2f}{percentile(latencies, 0.99) * 1000:>10.2f}"
+        f"{peak_bytes / 1e6:>12.2f}{errors:>8}"
+    )
+
+
+def _new_client(base_url: str) -> AhrefsClient:
+    return AhrefsClient(api_key="bench", base_url=base_url, rate_limit_per_min=10**9, max_retries=0)
+
+
+def _run(runner: Callable[[], Tuple[List[float], float, int]], traced: bool) -> Tuple[List[float], float, int, int]:
+    if not traced:
+        latencies, wall, errors = runner()
+        return latencies, wall, 0, errors
+    tracemalloc.start()
+    try:
+        latencies, wall, errors = runner()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return latencies, wall, peak, errors
+
+
+def bench_client(base_url: str, requests: int, concurrency: int, limit: int, traced: bool = False) -> Tuple[List[float], float, int, int]:
+    client = _new_client(base_url)
+    errors = 0
+
+    def one(i: int) -> float:
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            client.get_backlinks(target=f"site{i % 50}.com", limit=limit)
+        except Exception:
+            errors += 1
+        return time.perf_counter() - start
+
+    def runner() -> Tuple[List[float], float, int]:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(one, range(requests)))
+        return latencies, time.perf_counter() - start, errors
+
+    return _run(runner, traced)
+
+
+def bench_router(base_url: str, requests: int, concurrency: int, limit: int, traced: bool = False) -> Tuple[List[float], float, int, int]:
+    import httpx
+    from fastapi import FastAPI
+
+    from backend.app.core.landing_page.ahrefs.api import deps as api_deps
+    from backend.app.core.landing_page.ahrefs.api.routes import router
+
+    client = _new_client(base_url)
+    app = FastAPI()
+    app.dependency_overrides[api_deps.get_client] = lambda: client
+    app.include_router(router)
+    errors = 0
+
+    async def run() -> Tuple[List[float], float]:
+        nonlocal errors
+        sem = asyncio.Semaphore(concurrency)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+
+            async def one(i: int) -> float:
+                nonlocal errors
+                async with sem:
+                    start = time.perf_counter()
+                    res = await http.post("/ahrefs/backlinks", json={"target": f"site{i % 50}.com", "limit": limit})
+                    if res.status_code != 200:
+                        errors += 1
+                    return time.perf_counter() - start
+
+            start = time.perf_counter()
+            latencies = await asyncio.gather(*(one(i) for i in range(requests)))
+            return list(latencies), time.perf_counter() - start
+
+    def runner() -> Tuple[List[float], float, int]:
+        latencies, wall = asyncio.run(run())
+        return latencies, wall, errors
+
+    return _run(runner, traced)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--latency", default="fixed:0.005")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--rows", type=int, default=100, help="rows per response (payload size)")
+    parser.add_argument("--row-padding", type=int, default=0)
+    parser.add_argument("--error-429", type=float, default=0.0)
+    parser.add_argument("--error-5xx", type=float, default=0.0)
+    parser.add_argument("--memory-requests", type=int, default=200, help="requests in the traced memory pass")
+    parser.add_argument("--skip-router", action="store_true")
+    args = parser.parse_args()
+
+    config = StubConfig(
+        latency=parse_latency(args.latency),
+        total_rows=args.rows,
+        max_rows=args.rows,
+        row_padding=args.row_padding,
+        error_rate_429=args.error_429,
+        error_rate_5xx=args.error_5xx,
+    )
+    runners: List[Tuple[str, Callable[..., Tuple[List[float], float, int, int]]]] = [("client", bench_client)]
+    if not args.skip_router:
+        runners.append(("router", bench_router))
+
+    with StubServer(config) as stub:
+        print(f"{'target':<8}{'conc':>6}{'req/s':>12}{'p50 ms':>10}{'p99 ms':>10}{'peak MB':>12}{'errors':>8}")
+        for label, runner in runners:
+            for concurrency in (int(c) for c in args.concurrency.split(",")):
+                latencies, wall, _, errors = runner(stub.base_url, args.requests, concurrency, args.rows)
+                _, _, peak, _ = runner(stub.base_url, args.memory_requests, concurrency, args.rows, traced=True)
+                report(label, concurrency, latencies, wall, peak, errors)
+        print(f"stub: {stub.stats.total} requests over {stub.stats.connections} connections")
+
+
+if __name__ == "__main__":
+    main()
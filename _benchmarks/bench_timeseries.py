@@ -0,0 +1,66 @@
+"""
+Memory and CPU of history series: list-of-dict payloads vs `TimeSeries` arrays.
+
+Builds `--domains` daily series of `--days` points from stub payloads, then
+resamples them weekly and aligns them on a shared axis. Memory is the heap
+still held by the result, measured in a separate traced run.
+
+Run:
+    python -m backend.app.core.landing_page.ahrefs._benchmarks.bench_timeseries --domains 500 --days 3650
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, build_payload
+from backend.app.core.landing_page.ahrefs.timeseries import align, series_from_payload
+
+
+def timed(fn: Callable[[], Any], *, memory: bool = False) -> Tuple[Any, float, int]:
+    """Result, wall time and (with memory=True, from a second traced run) bytes still held."""
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    held = 0
+    if memory:
+        tracemalloc.start()
+        try:
+            kept = fn()
+            held, _ = tracemalloc.get_traced_memory()
+            del kept
+        finally:
+            tracemalloc.stop()
+    return result, elapsed, held
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--domains", type=int, default=200)
+    parser.add_argument("--days", type=int, default=3650)
+    args = parser.parse_args()
+
+    config = StubConfig(total_rows=args.days)
+
+    def payloads() -> List[Dict[str, Any]]:
+        return [build_payload(config, "GET", "/site-explorer/domain-rating-history", {"target": f"site{i}.com"}, {}) for i in range(args.domains)]
+
+    raw, build_s, raw_bytes = timed(payloads, memory=True)
+    print(f"list-of-dicts   build {build_s * 1000:>8.0f} ms   held {raw_bytes / 1e6:>8.1f} MB")
+
+    series, convert_s, series_bytes = timed(lambda: {f"site{i}.com": series_from_payload(p) for i, p in enumerate(raw)}, memory=True)
+    del raw
+    print(f"TimeSeries      convert {convert_s * 1000:>6.0f} ms   held {series_bytes / 1e6:>8.1f} MB")
+
+    weekly, resample_s, _ = timed(lambda: {k: s.resample("week", how="mean") for k, s in series.items()})
+    print(f"resample weekly {resample_s * 1000:>14.0f} ms")
+    _, align_s, _ = timed(lambda: align(weekly, how="outer"))
+    print(f"align {len(weekly)} series {align_s * 1000:>12.0f} ms")
+    _, diff_s, _ = timed(lambda: [s.diff() for s in series.values()])
+    print(f"diff daily      {diff_s * 1000:>14.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+from contextlib import ExitStack
+
+import pytest
+from fastapi import HTTPException
+
+from backend.app.core.landing_page.ahrefs import config
+from backend.app.core.landing_page.ahrefs.admission import LIMITER_QUEUES, LimiterQueues
+from backend.app.core.landing_page.ahrefs.api.admission import AdmissionControl, get_admission_control
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.metrics import MetricsRegistry
+from backend.app.core.landing_page.ahrefs.units import key_fingerprint
+
+
+def _queued(stack, queues, key, n, rate=60):
+    for _ in range(n):
+        stack.enter_context(queues.waiting(key, rate))
+
+
+def test_estimate_and_shed_on_deadline():
+    queues = LimiterQueues()
+    control = AdmissionControl(max_wait_s=0, default_keys=("k",), queues=queues, metrics=MetricsRegistry())
+    with ExitStack() as stack:
+        _queued(stack, queues, "k", 30)
+        assert queues.estimate_wait(["k"]) == 30.0 and queues.estimate_wait(["other"]) == 0.0
+        control.check("default", {})  # no deadline header, default deadline disabled
+        control.check("default", {"x-request-deadline-ms": "45000"})
+        control.check("other", {"x-request-deadline-ms": "10"})  # its own key has no queue
+        with pytest.raises(HTTPException) as exc_info:
+            control.check("default", {"x-request-deadline-ms": "5000"})
+    exc = exc_info.value
+    assert exc.status_code == 503 and exc.headers == {"Retry-After": "25", "X-Queue-Depth": "30"}
+    assert queues.estimate_wait(["k"]) == 0.0
+
+
+def test_client_counts_limiter_waiters():
+    client = AhrefsClient(api_key="queued-key", max_retries=0)
+    seen = []
+
+    class _Limiter:
+        def acquire(self):
+            seen.append(LIMITER_QUEUES.depth([key_fingerprint("queued-key")]))
+            raise RuntimeError("stop before sending")
+
+    client._rate_limiter = _Limiter()
+    with pytest.raises(RuntimeError):
+        client.get_domain_rating(domain="a.com")
+    assert seen == [1] and LIMITER_QUEUES.depth([key_fingerprint("queued-key")]) == 0
+
+
+def test_default_clients_share_one_limiter(monkeypatch: pytest.MonkeyPatch):
+    # without lanes or a key pool, the per-request clients must still queue on one
+    # bucket, or the queue admission control measures would never form
+    monkeypatch.delenv("AHREFS_PRIORITY_LANES", raising=False)
+    monkeypatch.delenv("AHREFS_API_KEYS", raising=False)
+    config.get_settings.cache_clear()
+    try:
+        first, second = config.get_client(), config.get_client()
+        assert first is not second and first._rate_limiter is second._rate_limiter
+    finally:
+        config.get_settings.cache_clear()
+
+
+def test_router_returns_fast_503(client, fake_client, monkeypatch):
+    monkeypatch.setattr(fake_client, "get_domain_rating", lambda **kw: {"domain_rating": 50})
+    key = get_admission_control().default_keys[0]
+    with ExitStack() as stack:
+        _queued(stack, LIMITER_QUEUES, key, 20)
+        resp = client.post("/ahrefs/site-explorer/domain-rating", json={"domain": "a.com"}, headers={"X-Request-Deadline-Ms": "1000"})
+        assert resp.status_code == 503 and resp.headers["Retry-After"] == "19" and resp.headers["X-Queue-Depth"] == "20"
+    assert client.post("/ahrefs/site-explorer/domain-rating", json={"domain": "a.com"}).status_code == 200
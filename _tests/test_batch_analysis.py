@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+from backend.app.core.landing_page.ahrefs import batch_analysis
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.errors import AhrefsAPIError, AhrefsBatchError
+from backend.app.core.landing_page.ahrefs.scheduler import BULK, current_lane, lane
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer
+from backend.app.core.landing_page.ahrefs.units import current_tag, tagged
+
+
+def test_canonical_target_and_plan():
+    assert batch_analysis.canonical_target("  Example.COM/ ") == "example.com"
+    assert batch_analysis.canonical_target("HTTPS://Example.com/Path") == "https://example.com/Path"
+    unique, positions, chunks = batch_analysis.plan(["a.com", "b.com", "A.com", "c.com"], 2)
+    assert unique == ["a.com", "b.com", "c.com"]
+    assert positions == [0, 1, 0, 2]
+    assert chunks == [["a.com", "b.com"], ["c.com"]]
+
+
+def test_chunks_run_concurrently_and_merge_in_input_order():
+    items = [f"site{i}.com" for i in range(250)] + ["SITE3.com", "site0.com/"]
+    with StubServer(StubConfig()) as stub:
+        client = AhrefsClient(api_key="k", base_url=stub.base_url, rate_limit_per_min=10_000, max_retries=0)
+        resp = client.post_batch_analysis(items=items, chunk_size=100, max_workers=3)
+        assert stub.stats.requests["/batch-analysis"] == 3
+    targets = resp["targets"]
+    assert len(targets) == len(items)
+    assert [t["target"] for t in targets[:250]] == items[:250]
+    assert targets[250] is targets[3] and targets[251] is targets[0]
+
+
+def test_only_failed_chunks_are_retried():
+    sent = []
+    failed_once = threading.Event()
+
+    def send(chunk):
+        sent.append(chunk[0])
+        if chunk[0] == "c" and not failed_once.is_set():
+            failed_once.set()
+            raise AhrefsAPIError("HTTP 503", status_code=503)
+        return {"targets": [{"target": t} for t in chunk]}
+
+    resp = batch_analysis.run(send, ["a", "b", "c", "d", "e"], chunk_size=2, retry_backoff_s=0)
+    assert sorted(sent) == ["a", "c", "c", "e"]
+    assert [t["target"] for t in resp["targets"]] == ["a", "b", "c", "d", "e"]
+
+
+def test_unrecoverable_chunks_raise_with_partial_result():
+    def send(chunk):
+        if "b" in chunk:
+            raise AhrefsAPIError("HTTP 400", status_code=400)
+        return {"targets": [{"target": t, "dr": 1} for t in chunk]}
+
+    with pytest.raises(AhrefsBatchError) as info:
+        batch_analysis.run(send, ["a", "b", "c"], chunk_size=1, retry_backoff_s=0)
+    err = info.value
+    assert err.failed_items == ["b"] and err.status_code == 400
+    assert err.payload["targets"] == [{"target": "a", "dr": 1}, None, {"target": "c", "dr": 1}]
+
+
+def test_single_chunk_is_sent_unchanged():
+    calls = []
+
+    def send(chunk):
+        calls.append(chunk)
+        return {"results": [1, 2]}
+
+    assert batch_analysis.run(send, ["a.com", "b.com"]) == {"results": [1, 2]}
+    assert calls == [["a.com", "b.com"]]
+
+
+def test_chunks_keep_the_callers_tag_and_lane():
+    seen = []
+
+    def send(chunk):
+        seen.append((current_tag(), current_lane()))
+        return {"targets": [{"target": t} for t in chunk]}
+
+    with tagged("nightly"), lane(BULK):
+        batch_analysis.run(send, ["a", "b", "c"], chunk_size=1, max_workers=3)
+    assert seen == [("nightly", BULK)] * 3
+
+
+def test_labelled_rows_are_matched_by_target_not_position():
+    chunk = ["a.com", "b.com", "c.com"]
+    reordered = {"targets": [{"target": "C.com"}, {"target": "a.com"}, {"target": "b.com"}]}
+    assert [r["target"] for r in batch_analysis.match_results(chunk, reordered)] == ["a.com", "b.com", "C.com"]
+    # b.com dropped and a.com repeated: same count, but b.com has no result
+    wrong = {"targets": [{"target": "a.com", "n": 1}, {"target": "a.com", "n": 2}, {"target": "c.com"}]}
+    assert [r and r["target"] for r in batch_analysis.match_results(chunk, wrong)] == ["a.com", None, "c.com"]
+    assert batch_analysis.match_results(chunk, {"targets": [1, 2, 3]}) == [1, 2, 3]
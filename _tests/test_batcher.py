@@ -0,0 +1,94 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.core.landing_page.ahrefs.api.deps import get_client
+from backend.app.core.landing_page.ahrefs.api.routes import build_router
+from backend.app.core.landing_page.ahrefs.batcher import MicroBatcher
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.errors import AhrefsAPIError
+from backend.app.core.landing_page.ahrefs.metrics import BATCHER_FLUSHES, BATCHER_LOOKUPS, MetricsRegistry
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer
+
+
+class _BatchClient:
+    api_key = "k"
+    base_url = "http://batch"
+
+    def __init__(self, missing=()):
+        self.calls = []
+        self.missing = set(missing)
+        self.lock = threading.Lock()
+
+    def post_batch_analysis(self, *, items):
+        with self.lock:
+            self.calls.append(list(items))
+        return {"targets": [{"target": t, "domain_rating": len(t)} for t in items if t not in self.missing]}
+
+
+def test_concurrent_lookups_share_one_batch():
+    client = _BatchClient()
+    metrics = MetricsRegistry()
+    batcher = MicroBatcher(client, window_s=0.5, max_items=100, metrics=metrics)
+    domains = [f"site{i}.com" for i in range(20)] + ["SITE1.com"]
+    # all threads submit together, so a slow thread start cannot outlast the window
+    start = threading.Barrier(len(domains))
+
+    def lookup(domain):
+        start.wait()
+        return batcher.lookup(domain)
+
+    with ThreadPoolExecutor(len(domains)) as pool:
+        rows = list(pool.map(lookup, domains))
+    batcher.close()
+    assert len(client.calls) == 1 and len(client.calls[0]) == 20
+    assert [r["target"] for r in rows[:20]] == domains[:20]
+    assert rows[20] is rows[1]
+    assert metrics.value(BATCHER_LOOKUPS) == 21 and metrics.value(BATCHER_FLUSHES) == 1
+
+
+def test_max_items_flushes_before_window():
+    client = _BatchClient()
+    batcher = MicroBatcher(client, window_s=10, max_items=3)
+    futures = [batcher.submit(f"d{i}.com") for i in range(3)]
+    assert [f.result(timeout=2)["target"] for f in futures] == ["d0.com", "d1.com", "d2.com"]
+    batcher.close()
+
+
+def test_missing_rows_and_errors_reach_their_callers():
+    batcher = MicroBatcher(_BatchClient(missing={"b.com"}), window_s=0.02)
+    a, b = batcher.submit("a.com"), batcher.submit("b.com")
+    assert a.result(timeout=2)["target"] == "a.com"
+    with pytest.raises(AhrefsAPIError):
+        b.result(timeout=2)
+    batcher.close()
+
+    class Broken(_BatchClient):
+        def post_batch_analysis(self, *, items):
+            raise AhrefsAPIError("HTTP 500", status_code=500)
+
+    batcher = MicroBatcher(Broken(), window_s=0)
+    with pytest.raises(AhrefsAPIError):
+        batcher.lookup("a.com", timeout=2)
+    batcher.close()
+
+
+def test_router_opt_in_batches_domain_rating_route():
+    with StubServer(StubConfig()) as stub:
+        app = FastAPI()
+        app.include_router(build_router(["site-explorer"], microbatch_window_ms=50))
+        sdk = AhrefsClient(api_key="route-batch", base_url=stub.base_url, rate_limit_per_min=10_000, max_retries=0)
+        app.dependency_overrides[get_client] = lambda: sdk
+        http = TestClient(app)
+
+        def call(i):
+            return http.post("/ahrefs/site-explorer/domain-rating", json={"domain": f"d{i}.com"}).json()
+
+        with ThreadPoolExecutor(8) as pool:
+            bodies = list(pool.map(call, range(8)))
+        assert [b["data"]["target"] for b in bodies] == [f"d{i}.com" for i in range(8)]
+        assert stub.stats.requests["/batch-analysis"] < 8
+        assert "/site-explorer/domain-rating" not in stub.stats.requests
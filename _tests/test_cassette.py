@@ -0,0 +1,45 @@
+import time
+
+import pytest
+
+from backend.app.core.landing_page.ahrefs.cassette import canonical_key
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.errors import AhrefsCassetteMissError
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer, fixed
+
+
+def _client(base_url: str, **kwargs) -> AhrefsClient:
+    return AhrefsClient(api_key="secret", base_url=base_url, rate_limit_per_min=10_000, max_retries=0, **kwargs)
+
+
+def test_canonical_key_ignores_param_order_and_auth():
+    a = canonical_key("get", "https://x/v1/backlinks?target=a.com&limit=5&token=t1", None)
+    b = canonical_key("GET", "https://x/v1/backlinks?limit=5&target=a.com", None)
+    assert a == b == "GET /v1/backlinks?limit=5&target=a.com"
+    assert canonical_key("POST", "https://x/batch-analysis", b'{"b":1,"a":2}') == canonical_key(
+        "POST", "https://x/batch-analysis", b'{"a": 2, "b": 1}'
+    )
+
+
+def test_record_then_replay_offline(tmp_path):
+    path = str(tmp_path / "session.jsonl.gz")
+    with StubServer(StubConfig(latency=fixed(0.05))) as stub:
+        recorder = _client(stub.base_url, cassette_path=path, cassette_mode="record")
+        recorded = recorder.get_backlinks(target="example.com", limit=20)
+        recorder.post_batch_analysis(items=["a.com", "b.com"])
+        base_url = stub.base_url
+
+    assert b"secret" not in open(path, "rb").read()
+
+    player = _client(base_url, cassette_path=path)
+    start = time.perf_counter()
+    assert player.get_backlinks(limit=20, target="example.com") == recorded
+    assert time.perf_counter() - start < 0.05
+    assert player.post_batch_analysis(items=["a.com", "b.com"])["targets"][0]["target"] == "a.com"
+    with pytest.raises(AhrefsCassetteMissError):
+        player.get_backlinks(target="other.com")
+
+    timed = _client(base_url, cassette_path=path, cassette_timing=True)
+    start = time.perf_counter()
+    timed.get_backlinks(target="example.com", limit=20)
+    assert time.perf_counter() - start >= 0.05
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from backend.app.core.landing_page.ahrefs.cli import completed_pairs, main, read_targets
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer
+
+
+@pytest.fixture()
+def stub():
+    with StubServer(StubConfig()) as server:
+        yield server
+
+
+def _client(base_url: str) -> AhrefsClient:
+    return AhrefsClient(api_key="k", base_url=base_url, rate_limit_per_min=10_000, max_retries=0)
+
+
+def _records(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_reads_csv_ndjson_and_text(tmp_path):
+    (tmp_path / "t.csv").write_text("id,domain\n1,a.com\n2,\n3,b.com\n")
+    (tmp_path / "t.ndjson").write_text('{"target": "a.com"}\n\n"b.com"\n')
+    (tmp_path / "t.txt").write_text("a.com\n  b.com \n\n")
+    assert list(read_targets(str(tmp_path / "t.csv"), column="domain")) == ["a.com", "b.com"]
+    assert list(read_targets(str(tmp_path / "t.ndjson"))) == ["a.com", "b.com"]
+    assert list(read_targets(str(tmp_path / "t.txt"))) == ["a.com", "b.com"]
+
+
+def test_runs_every_op_for_every_target(stub: StubServer, tmp_path, capsys: pytest.CaptureFixture):
+    targets = tmp_path / "targets.csv"
+    targets.write_text("target\n" + "".join(f"site{i}.com\n" for i in range(20)))
+    out = tmp_path / "out.ndjson"
+    code = main([str(targets), "-o", str(out), "--op", "domain_rating", "--op", "get_metrics", "--concurrency", "4"], client=_client(stub.base_url))
+    assert code == 0
+    records = _records(out)
+    assert len(records) == 40 and all(r["ok"] for r in records)
+    assert {(r["target"], r["op"]) for r in records} == {(f"site{i}.com", op) for i in range(20) for op in ("domain_rating", "metrics")}
+    assert "40/40 (100.0%) done, 0 failed" in capsys.readouterr().err
+
+
+def test_resumes_from_existing_output(stub: StubServer, tmp_path):
+    targets = tmp_path / "targets.txt"
+    targets.write_text("a.com\nb.com\nc.com\n")
+    out = tmp_path / "out.ndjson"
+    out.write_text(
+        '{"target":"a.com","op":"domain_rating","ok":true,"data":{}}\n'
+        '{"target":"b.com","op":"domain_rating","ok":false,"error":"AhrefsAPIError","message":"boom"}\n'
+        '{"target":"c.com","op":"domain_ra'  # torn by a crash mid-write
+    )
+    assert completed_pairs(str(out)) == {("a.com", "domain_rating")}
+    assert main([str(targets), "-o", str(out), "--op", "domain_rating"], client=_client(stub.base_url)) == 0
+    assert stub.stats.total == 2  # b.com retried, c.com run, a.com skipped
+    records = _records(out)
+    assert len(records) == 4  # the torn line is gone, the old failure kept
+    assert {r["target"] for r in records if r["ok"]} == {"a.com", "b.com", "c.com"}
+
+
+def test_failures_are_recorded_and_set_the_exit_code(tmp_path):
+    targets = tmp_path / "targets.txt"
+    targets.write_text("a.com\n")
+    out = tmp_path / "out.ndjson"
+    with StubServer(StubConfig(error_rate_5xx=1.0)) as server:
+        assert main([str(targets), "-o", str(out), "--op", "domain_rating"], client=_client(server.base_url)) == 1
+    [record] = _records(out)
+    assert record["ok"] is False and record["error"] == "AhrefsAPIError"
+
+
+def test_rejects_operations_needing_more_than_a_target(tmp_path):
+    targets = tmp_path / "targets.txt"
+    targets.write_text("a.com\n")
+    with pytest.raises(SystemExit) as exc:
+        main([str(targets), "-o", str(tmp_path / "out.ndjson"), "--op", "create_project"], client=AhrefsClient(api_key="k"))
+    assert exc.value.code == 2
@@ -0,0 +1,82 @@
+import ipaddress
+import time
+
+import pytest
+
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.crawler_ips import CrawlerIPIndex, CrawlerIPVerifier, networks_from_payload
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer
+
+RANGES = {"prefixes": [{"ipv4Prefix": "54.36.148.0/23"}, {"ipv4Prefix": "54.36.150.0/24"}, {"ipv6Prefix": "2a02:2b0::/32"}]}
+ADDRESSES = {"ips": [{"ip_address": "168.119.65.10"}, {"ip_address": "not-an-ip"}]}
+
+
+def test_index_merges_and_looks_up():
+    index = CrawlerIPIndex.from_payloads(RANGES, ADDRESSES)
+    assert list(index.v4_starts) == [int(ipaddress.ip_address("54.36.148.0")), int(ipaddress.ip_address("168.119.65.10"))]
+    assert len(index) == 3  # the adjacent /23 and /24 coalesce
+    for ip in ("54.36.148.1", "54.36.150.255", "168.119.65.10", "2a02:2b0::1", "::ffff:54.36.149.7"):
+        assert index.is_ahrefs_crawler(ip), ip
+    for ip in ("54.36.151.0", "54.36.147.255", "168.119.65.11", "2a02:2b1::1", "0.0.0.0", "garbage", ""):
+        assert not index.is_ahrefs_crawler(ip), ip
+    assert ipaddress.ip_address("54.36.148.9") in index
+    assert int(ipaddress.ip_address("54.36.148.9")) in index
+    assert ipaddress.ip_address("2a02:2b0:ffff::") in index
+
+
+def test_networks_from_payload_skips_non_ip_values():
+    assert [str(n) for n in networks_from_payload(ADDRESSES)] == ["168.119.65.10/32"]
+
+
+def test_snapshot_roundtrip(tmp_path):
+    path = str(tmp_path / "ips.json")
+    index = CrawlerIPIndex.from_payloads(RANGES, ADDRESSES)
+    index.save(path)
+    loaded = CrawlerIPIndex.load(path)
+    assert list(loaded.v4_starts) == list(index.v4_starts) and loaded.v6_ends == index.v6_ends
+    assert loaded.built_at == index.built_at
+
+
+def test_verifier_refreshes_from_stub_and_persists(tmp_path):
+    path = str(tmp_path / "ips.json")
+    with StubServer(StubConfig()) as stub:
+        client = AhrefsClient(api_key="k", base_url=stub.base_url, rate_limit_per_min=10_000, max_retries=0)
+        verifier = CrawlerIPVerifier(client, snapshot_path=path)
+        assert not verifier.is_ahrefs_crawler("54.36.148.5")
+        old = verifier.index
+        verifier.refresh_once()
+        assert verifier.index is not old and verifier.is_ahrefs_crawler("54.36.148.5")
+
+    # a new process starts from the snapshot, before any refresh
+    restarted = CrawlerIPVerifier(client, snapshot_path=path)
+    assert restarted.is_ahrefs_crawler("202.8.41.1") and not restarted.stale
+
+
+def test_verifier_without_snapshot_refreshes_on_start():
+    with StubServer(StubConfig()) as stub:
+        client = AhrefsClient(api_key="k", base_url=stub.base_url, rate_limit_per_min=10_000, max_retries=0)
+        verifier = CrawlerIPVerifier(client)
+        assert verifier.stale
+        verifier.start()
+        try:
+            deadline = time.monotonic() + 2
+            while not verifier.is_ahrefs_crawler("54.36.148.5") and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert verifier.is_ahrefs_crawler("54.36.148.5")
+        finally:
+            verifier.stop()
+
+
+def test_failed_refresh_keeps_previous_index():
+    class Failing:
+        def get_crawler_ip_ranges(self):
+            raise RuntimeError("upstream down")
+
+    verifier = CrawlerIPVerifier(Failing(), refresh_interval_s=0.01)
+    verifier.index = CrawlerIPIndex.from_payloads(RANGES)
+    with pytest.raises(RuntimeError):
+        verifier.refresh_once()
+    verifier.start()
+    time.sleep(0.05)
+    verifier.stop()
+    assert verifier.is_ahrefs_crawler("54.36.148.1")
@@ -0,0 +1,73 @@
+import inspect
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.endpoints import BY_NAME, ENDPOINTS, get_spec
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer
+
+
+def test_spec_builders_match_wire_format():
+    path, params = BY_NAME["get_domain_metrics"].build({"domain": "a.com", "metrics": ["dr", "ur"], "mode": "exact"})
+    assert path == "/v1/domain/metrics"
+    assert params == {"domain": "a.com", "metrics": "dr,ur", "mode": "exact"}
+
+    path, params = BY_NAME["get_organic_keywords"].build({"target": "a.com"})
+    assert params == {"target": "a.com", "limit": 100, "offset": 0}
+
+    path, params = BY_NAME["get_refdomains"].build({"target": "a.com", "path": "/v3/site-explorer/refdomains"})
+    assert path == "/v3/site-explorer/refdomains" and params == {"target": "a.com"}
+
+    with pytest.raises(TypeError, match="domain"):
+        BY_NAME["get_domain_rating"].build({})
+
+
+def test_generated_client_methods():
+    for spec in ENDPOINTS:
+        method = getattr(AhrefsClient, spec.name)
+        assert method.endpoint is spec
+    sig = inspect.signature(AhrefsClient.get_backlinks)
+    assert [p.name for p in sig.parameters.values()] == ["self", "target", "limit", "offset", "fields", "priority", "extra"]
+    assert get_spec("keywords_put") is BY_NAME["put_keywords"]
+
+
+def test_paginate_and_retry_policy():
+    with StubServer(StubConfig(total_rows=250)) as stub:
+        client = AhrefsClient(api_key="k", base_url=stub.base_url, rate_limit_per_min=10_000, max_retries=0)
+        rows = list(client.paginate("get_backlinks", target="example.com", page_size=100))
+        assert len(rows) == 250 and rows[-1]["url_from"] == "https://ref249.example/page"
+        assert stub.stats.requests["/v1/backlinks"] == 3
+        assert len(list(client.paginate("refdomains", target="example.com", page_size=100, max_rows=120))) == 120
+        with pytest.raises(ValueError):
+            next(client.paginate("get_overview", target="example.com"))
+
+    with StubServer(StubConfig(error_rate_5xx=1.0)) as stub:
+        client = AhrefsClient(api_key="k", base_url=stub.base_url, rate_limit_per_min=10_000, max_retries=2, backoff_factor=0)
+        with pytest.raises(Exception):
+            client.get_metrics(target="example.com")
+        with pytest.raises(Exception):
+            client.create_project(name="Demo", target="example.com")
+        assert stub.stats.requests["/site-explorer/metrics"] == 3
+        with pytest.raises(Exception):
+            client.create_project(name="Demo", target="example.com", path="/management/projects-v2")
+        # non-idempotent endpoints are never replayed, even under another path
+        assert stub.stats.requests["/management/projects"] == 1
+        assert stub.stats.requests["/management/projects-v2"] == 1
+
+
+def test_generated_routes(client: TestClient, fake_client: AhrefsClient, monkeypatch):
+    seen = {}
+
+    def stub_refdomains(**kwargs):
+        seen.update(kwargs)
+        return {"refdomains": []}
+
+    monkeypatch.setattr(fake_client, "get_refdomains", stub_refdomains)
+    res = client.post("/ahrefs/backlinks/refdomains", json={"target": "a.com", "limit": 5, "extra": {"mode": "domain"}})
+    assert res.status_code == 200
+    assert seen == {"target": "a.com", "limit": 5, "offset": 0, "mode": "domain"}
+
+    monkeypatch.setattr(fake_client, "get_keyword_lists", lambda **kw: {"lists": sorted(kw)})
+    assert client.get("/ahrefs/management/keyword-lists").json()["data"] == {"lists": []}
+    assert client.get("/ahrefs/overview/overview").status_code == 422
@@ -0,0 +1,93 @@
+import datetime as dt
+
+import pytest
+
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.history_store import HistoryStore, HistorySync
+from backend.app.core.landing_page.ahrefs.metrics import CACHE_HITS, CACHE_MISSES, MetricsRegistry
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer, build_payload
+from backend.app.core.landing_page.ahrefs.timeseries import to_epoch_day
+
+
+class _RecordingClient:
+    def __init__(self, rows=30):
+        self.config = StubConfig(total_rows=rows)
+        self.calls = []
+
+    def get_domain_rating_history(self, **params):
+        self.calls.append(params)
+        return build_payload(self.config, "GET", "/site-explorer/domain-rating-history", params, {})
+
+
+def test_second_sync_requests_only_missing_range(tmp_path):
+    client = _RecordingClient(rows=30)
+    metrics = MetricsRegistry()
+    sync = HistorySync(client, HistoryStore(str(tmp_path / "h.sqlite3")), refresh_interval_s=0, metrics=metrics)
+
+    first = sync.get("get_domain_rating_history", "example.com")
+    assert len(first) == 30 and first.start == dt.date(2015, 1, 1)
+    assert "date_from" not in client.calls[0]
+
+    sync.get("get_domain_rating_history", "example.com", date_to="2015-02-05")
+    assert client.calls[1]["date_from"] == "2015-01-28"  # last stored day (01-30) minus the overlap
+    assert client.calls[1]["target"] == "example.com"
+    series = sync.get("domain_rating_history", "example.com", start="2015-01-29", end="2015-02-05", date_to="2015-02-05")
+    assert [d for d, _ in series] == [dt.date(2015, 1, 29) + dt.timedelta(days=i) for i in range(8)]
+    assert sync.store.state("get_domain_rating_history", "example.com")[0] == to_epoch_day("2015-02-05")
+    assert metrics.value(CACHE_MISSES, (("cache", "history_store"),)) == 3
+
+
+def test_reads_within_refresh_interval_are_served_from_store():
+    client = _RecordingClient(rows=10)
+    metrics = MetricsRegistry()
+    sync = HistorySync(client, HistoryStore(), refresh_interval_s=3600, metrics=metrics)
+    a = sync.get("get_domain_rating_history", "a.com")
+    b = sync.get("get_domain_rating_history", "a.com")
+    assert len(client.calls) == 1
+    assert list(a.values) == list(b.values)
+    assert metrics.value(CACHE_HITS, (("cache", "history_store"),)) == 1
+    sync.sync("get_domain_rating_history", "a.com", force=True)
+    assert len(client.calls) == 2
+
+
+def test_series_with_different_extra_params_sync_separately():
+    client = _RecordingClient(rows=10)
+    sync = HistorySync(client, HistoryStore(), refresh_interval_s=0)
+    sync.get("get_domain_rating_history", "a.com", country="us")
+    sync.get("get_domain_rating_history", "a.com", country="de")
+    # the second country is a new series: downloaded in full, not from the first one's last day
+    assert "date_from" not in client.calls[1]
+    sync.get("get_domain_rating_history", "a.com", country="us", date_to="2015-01-20")
+    assert client.calls[2]["date_from"] == "2015-01-08"
+    assert sync.store.state("get_domain_rating_history", "a.com") is None
+    assert sync.store.state('get_domain_rating_history?{"country":"de"}', "a.com") is not None
+
+
+def test_history_before_the_first_date_from_is_backfilled():
+    client = _RecordingClient(rows=10)
+    sync = HistorySync(client, HistoryStore(), refresh_interval_s=3600)
+    assert sync.get("get_domain_rating_history", "a.com", date_from="2015-01-10").start == dt.date(2015, 1, 10)
+    # a wider read fetches only the missing head, the tail is still fresh
+    series = sync.get("get_domain_rating_history", "a.com")
+    assert len(client.calls) == 2
+    assert "date_from" not in client.calls[1] and client.calls[1]["date_to"] == "2015-01-10"
+    assert series.start == dt.date(2015, 1, 1) and series.end == dt.date(2015, 1, 19)
+    assert sync.store.state("get_domain_rating_history", "a.com")[2] is None
+    sync.get("get_domain_rating_history", "a.com", date_from="2015-01-05")
+    assert len(client.calls) == 2
+
+
+def test_non_history_endpoint_rejected():
+    sync = HistorySync(_RecordingClient(), HistoryStore())
+    with pytest.raises(ValueError):
+        sync.get("get_backlinks", "a.com")
+
+
+def test_incremental_sync_against_stub():
+    with StubServer(StubConfig(total_rows=20)) as stub:
+        client = AhrefsClient(api_key="k", base_url=stub.base_url, rate_limit_per_min=10_000, max_retries=0)
+        sync = HistorySync(client, HistoryStore(), refresh_interval_s=0)
+        sync.get("get_domain_rating_history", "example.com", date_from="2024-01-01", date_to="2024-01-20")
+        s = sync.get("get_domain_rating_history", "example.com", date_from="2024-01-01", date_to="2024-01-25")
+    assert len(s) == 25 and s.end == dt.date(2024, 1, 25)
+    assert stub.stats.total == 2
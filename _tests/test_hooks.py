@@ -0,0 +1,69 @@
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.errors import AhrefsAPIError
+from backend.app.core.landing_page.ahrefs.hooks import PHASES, SlowRequestLogger
+
+
+def _resp(status: int, payload: dict):
+    return SimpleNamespace(status_code=status, content=b"{}", text="{}", json=lambda: payload)
+
+
+def test_hooks_fire_in_order_with_monotonic_marks(monkeypatch):
+    client = AhrefsClient()
+    seen = []
+    for phase in PHASES:
+        client.hooks.register(phase, lambda p, trace: seen.append(p))
+
+    sent = {}
+
+    def fake_request(**kw):
+        sent.update(kw)
+        return _resp(200, {"domain_rating": 50})
+
+    monkeypatch.setattr(client.session, "request", fake_request)
+    traces = []
+    client.hooks.register("after_decode", lambda p, trace: traces.append(trace))
+
+    assert client.get_overview(target="example.com") == {"domain_rating": 50}
+    assert seen == ["before_acquire", "after_acquire", "before_send", "after_headers", "after_body", "after_decode"]
+    assert sent["stream"] is True
+    marks = [traces[0].marks[p] for p in seen]
+    assert marks == sorted(marks)
+    assert set(traces[0].breakdown()) == {"acquire", "ttfb", "body", "decode", "total"}
+
+
+def test_no_hooks_keeps_plain_request(monkeypatch):
+    client = AhrefsClient()
+    sent = {}
+
+    def fake_request(**kw):
+        sent.update(kw)
+        return _resp(200, {})
+
+    monkeypatch.setattr(client.session, "request", fake_request)
+    client.get_overview(target="example.com")
+    assert "stream" not in sent
+
+
+def test_unknown_phase_rejected():
+    with pytest.raises(ValueError):
+        AhrefsClient().hooks.register("after_lunch", lambda p, t: None)
+
+
+def test_slow_request_logger_reports_errors(monkeypatch, caplog):
+    client = AhrefsClient()
+    SlowRequestLogger(threshold_s=0.0).install(client)
+    monkeypatch.setattr(client.session, "request", lambda **kw: _resp(500, {"error": "boom"}))
+
+    with caplog.at_level(logging.WARNING, logger="ahrefs.slow_requests"):
+        with pytest.raises(AhrefsAPIError):
+            client.get_overview(target="example.com")
+
+    # a decoded error response terminates with after_decode only
+    assert len(caplog.records) == 1
+    assert "status=500" in caplog.records[0].getMessage()
+    assert "ttfb=" in caplog.records[0].getMessage()
@@ -0,0 +1,110 @@
+import json
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.core.landing_page.ahrefs.api import deps as api_deps
+from backend.app.core.landing_page.ahrefs.api.jobs import get_job_runner
+from backend.app.core.landing_page.ahrefs.api.routes import build_router
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.jobs import CANCELLED, DONE, RUNNING, JobRunner, JobStore
+from backend.app.core.landing_page.ahrefs.metrics import MetricsRegistry
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer, fixed
+
+
+@pytest.fixture()
+def stub():
+    with StubServer(StubConfig(total_rows=250)) as server:
+        yield server
+
+
+def _client(base_url: str) -> AhrefsClient:
+    return AhrefsClient(api_key="k", base_url=base_url, rate_limit_per_min=10_000, max_retries=0)
+
+
+def _wait(store: JobStore, job_id: str, timeout_s: float = 5.0):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        job = store.get(job_id)
+        if job.status not in ("queued", "running"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} still {job.status}")
+
+
+def test_export_pages_through_the_paginator(stub: StubServer):
+    runner = JobRunner(JobStore(), max_workers=1, metrics=MetricsRegistry())
+    job = runner.submit(_client(stub.base_url), "default", "get_backlinks", {"target": "example.com"}, page_size=100)
+    done = _wait(runner.store, job.id)
+    assert (done.status, done.rows, done.next_offset) == (DONE, 250, 250)
+    rows = list(runner.store.iter_rows(job.id, chunk=64))
+    assert len(rows) == 250 and rows[0] != rows[-1]
+    assert stub.stats.requests["/v1/backlinks"] == 3
+
+
+def test_interrupted_job_resumes_from_its_last_page(stub: StubServer, tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(path)
+    job = store.create("default", "backlinks", {"target": "example.com"}, page_size=100, max_rows=220)
+    # the previous process stored one page, then died mid-export
+    store.transition(job.id, ("queued",), RUNNING)
+    store.append_rows(job.id, [{"n": i} for i in range(100)], 100)
+    store.close()
+
+    runner = JobRunner(JobStore(path), max_workers=1, metrics=MetricsRegistry())
+    assert runner.recover(lambda tenant: _client(stub.base_url) if tenant == "default" else None) == 1
+    done = _wait(runner.store, job.id)
+    assert (done.status, done.rows) == (DONE, 220)
+    assert stub.stats.requests["/v1/backlinks"] == 2  # offsets 100 and 200 only
+    assert list(runner.store.iter_rows(job.id))[99] == {"n": 99}
+
+
+def test_cancelled_job_stops_storing_rows():
+    with StubServer(StubConfig(total_rows=10_000, latency=fixed(0.05))) as server:
+        runner = JobRunner(JobStore(), max_workers=1, metrics=MetricsRegistry())
+        job = runner.submit(_client(server.base_url), "default", "backlinks", {"target": "example.com"}, page_size=10)
+        while runner.store.get(job.id).rows == 0:
+            time.sleep(0.01)
+        assert runner.cancel(job.id)
+        time.sleep(0.2)
+        cancelled = runner.store.get(job.id)
+        assert cancelled.status == CANCELLED and cancelled.rows < 10_000
+        runner.shutdown()
+
+
+def test_submit_rejects_unpaginated_operations_and_missing_params():
+    runner = JobRunner(JobStore(), metrics=MetricsRegistry())
+    with pytest.raises(ValueError, match="not paginated"):
+        runner.submit(AhrefsClient(api_key="k"), "default", "get_domain_rating", {"target": "example.com"})
+    with pytest.raises(ValueError, match="requires target"):
+        runner.submit(AhrefsClient(api_key="k"), "default", "backlinks", {})
+
+
+def test_job_routes(stub: StubServer):
+    runner = JobRunner(JobStore(), max_workers=1, metrics=MetricsRegistry())
+    app = FastAPI()
+    app.include_router(build_router(["site-explorer"]))
+    app.dependency_overrides[api_deps.get_client] = lambda: _client(stub.base_url)
+    app.dependency_overrides[get_job_runner] = lambda: runner
+    http = TestClient(app)
+
+    resp = http.post("/ahrefs/jobs", json={"op": "backlinks", "params": {"target": "example.com"}, "page_size": 100})
+    assert resp.status_code == 202
+    job_id = resp.json()["data"]["id"]
+    assert http.get(f"/ahrefs/jobs/{job_id}", headers={"Authorization": "Bearer someone-else"}).status_code == 404
+
+    _wait(runner.store, job_id)
+    status = http.get(f"/ahrefs/jobs/{job_id}").json()["data"]
+    assert (status["status"], status["rows"]) == ("done", 250)
+    assert [job["id"] for job in http.get("/ahrefs/jobs").json()["data"]] == [job_id]
+
+    result = http.get(f"/ahrefs/jobs/{job_id}/result")
+    assert result.headers["content-type"] == "application/x-ndjson"
+    assert len([json.loads(line) for line in result.text.splitlines()]) == 250
+
+    assert http.post("/ahrefs/jobs", json={"op": "nope"}).status_code == 404
+    assert http.post("/ahrefs/jobs", json={"op": "domain_rating", "params": {"target": "a.com"}}).status_code == 422
+    assert http.delete(f"/ahrefs/jobs/{job_id}").json()["data"]["deleted"] is True
+    assert http.get(f"/ahrefs/jobs/{job_id}/result").status_code == 404
@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+from backend.app.core.landing_page.ahrefs import config
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.errors import AhrefsKeyPoolExhaustedError
+from backend.app.core.landing_page.ahrefs.key_pool import KeyPool, KeySpec, parse_keys, shared_key_pool
+from backend.app.core.landing_page.ahrefs.metrics import SCHEDULER_GRANTS, MetricsRegistry
+from backend.app.core.landing_page.ahrefs.scheduler import BULK, PriorityScheduler, lane
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer
+from backend.app.core.landing_page.ahrefs.units import UnitLedger
+
+
+def _client(stub, pool):
+    return AhrefsClient(base_url=stub.base_url, max_retries=0, key_pool=pool, ledger=pool.ledger, metrics=pool.metrics)
+
+
+def test_parse_keys():
+    assert parse_keys("a, b:600,c::5000,") == [KeySpec("a"), KeySpec("b", 600), KeySpec("c", None, 5000.0)]
+
+
+def test_requests_spread_across_keys_and_throughput_scales():
+    # each key allows 5 requests per minute; three keys serve 15 without waiting
+    pool = KeyPool(["k1", "k2", "k3"], rate_limit_per_min=5, ledger=UnitLedger(), metrics=MetricsRegistry())
+    with StubServer(StubConfig()) as stub:
+        client = _client(stub, pool)
+        start = time.perf_counter()
+        for i in range(15):
+            client.get_domain_rating(domain=f"site{i}.com")
+        assert time.perf_counter() - start < 2
+        assert stub.stats.keys == {"k1": 5, "k2": 5, "k3": 5}
+    assert [u["requests"] for u in pool.usage()] == [5, 5, 5]
+
+
+def test_rejected_keys_leave_the_rotation():
+    pool = KeyPool(["bad", "spent", "busy", "good"], cooldown_s=60, ledger=UnitLedger(), metrics=MetricsRegistry())
+    with StubServer(StubConfig(key_errors={"bad": 401, "spent": 402, "busy": 429})) as stub:
+        client = _client(stub, pool)
+        for _ in range(3):
+            assert client.get_domain_rating(domain="a.com")
+        assert stub.stats.keys == {"bad": 1, "spent": 1, "busy": 1, "good": 3}
+        usage = {u["key"]: u for u in pool.usage()}
+        assert [usage[k.fingerprint]["reason"] for k in pool.keys] == ["auth", "quota", "rate_limited", None]
+
+        pool.eject(pool.keys[3], "auth")
+        with pytest.raises(AhrefsKeyPoolExhaustedError) as exc_info:
+            client.get_domain_rating(domain="a.com")
+        assert exc_info.value.status_code == 503 and len(exc_info.value.reasons) == 4
+        pool.restore(pool.keys[3])
+        assert client.get_domain_rating(domain="a.com")
+
+
+def test_local_budget_skips_spent_keys():
+    ledger = UnitLedger()
+    pool = KeyPool([KeySpec("k1", monthly_units=1), KeySpec("k2")], ledger=ledger, metrics=MetricsRegistry())
+    with StubServer(StubConfig()) as stub:
+        client = _client(stub, pool)
+        for _ in range(4):
+            client.get_backlinks(target="a.com", limit=10)
+        assert stub.stats.keys["k2"] >= 3
+    assert pool.usage()[0]["healthy"] is False and pool.usage()[0]["reason"] == "quota"
+
+
+def test_shared_pools_are_per_limits(monkeypatch: pytest.MonkeyPatch):
+    specs = [KeySpec("shared-1"), KeySpec("shared-2", 600)]
+    pool = shared_key_pool(specs, rate_limit_per_min=60)
+    assert shared_key_pool(specs, rate_limit_per_min=60) is pool
+    faster = shared_key_pool(specs, rate_limit_per_min=300)
+    budgeted = shared_key_pool(specs, rate_limit_per_min=60, monthly_units=1000)
+    assert len({id(pool), id(faster), id(budgeted)}) == 3
+    assert [k.rate_limit_per_min for k in faster.keys] == [300, 600]
+    assert [k.monthly_units for k in budgeted.keys] == [1000, 1000]
+
+    monkeypatch.setenv("AHREFS_API_KEYS", "env-1,env-2::50")
+    monkeypatch.setenv("AHREFS_MONTHLY_UNIT_BUDGET", "2000")
+    config.get_settings.cache_clear()
+    try:
+        assert [k.monthly_units for k in config.get_client().key_pool.keys] == [2000, 50]
+    finally:
+        config.get_settings.cache_clear()
+
+
+def test_pooled_keys_honour_priority_lanes():
+    metrics = MetricsRegistry()
+    pool = KeyPool(["k1", "k2"], priority_lanes=True, ledger=UnitLedger(), metrics=metrics)
+    assert all(k.scheduler is not None and k.scheduler.limiter is k.limiter for k in pool.keys)
+    with StubServer(StubConfig()) as stub:
+        client = _client(stub, pool)
+        with lane(BULK):
+            client.get_domain_rating(domain="a.com")
+        client.get_domain_rating(domain="b.com")
+    assert metrics.value(SCHEDULER_GRANTS, (("lane", BULK),)) == 1
+    assert metrics.value(SCHEDULER_GRANTS, (("lane", "normal"),)) == 1
+    with pytest.raises(ValueError):
+        AhrefsClient(key_pool=pool, scheduler=PriorityScheduler(capacity=60))
@@ -0,0 +1,29 @@
+import subprocess
+import sys
+
+PKG = "backend.app.core.landing_page.ahrefs"
+
+
+def _modules_after(code: str) -> set:
+    probe = f"import sys\n{code}\nprint(' '.join(sys.modules))"
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+    return set(out.stdout.split())
+
+
+def test_package_and_client_import_stay_light():
+    loaded = _modules_after(f"import {PKG}")
+    assert f"{PKG}.client" not in loaded
+
+    loaded = _modules_after(f"from {PKG} import AhrefsClient\nAhrefsClient(api_key='x')")
+    assert "requests" not in loaded and "urllib3" not in loaded
+
+    loaded = _modules_after(f"import {PKG}.api")
+    assert "fastapi" not in loaded and f"{PKG}.api._requests" not in loaded
+
+
+def test_router_groups():
+    from backend.app.core.landing_page.ahrefs.api.routes import build_router
+
+    paths = {route.path for route in build_router(["site-explorer"]).routes}
+    assert "/ahrefs/site-explorer/domain-rating" in paths
+    assert "/ahrefs/backlinks" not in paths and "/ahrefs/metrics" in paths
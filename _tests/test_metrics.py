@@ -0,0 +1,66 @@
+import threading
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.metrics import (
+    CLIENT_IN_FLIGHT,
+    CLIENT_REQUESTS,
+    CLIENT_RETRIES,
+    MetricsRegistry,
+)
+
+
+def test_registry_merges_thread_shards_and_renders():
+    reg = MetricsRegistry(buckets=(0.1, 1.0))
+    reg.describe("jobs_total", "counter", "Jobs.")
+    reg.describe("latency_seconds", "histogram", "Latency.")
+
+    def work():
+        for _ in range(1000):
+            reg.inc("jobs_total", (("kind", "a"),))
+        reg.observe("latency_seconds", (), 0.5)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert reg.value("jobs_total", (("kind", "a"),)) == 4000
+    text = reg.render()
+    assert "# TYPE jobs_total counter" in text
+    assert 'jobs_total{kind="a"} 4000' in text
+    assert 'latency_seconds_bucket{le="0.1"} 0' in text
+    assert 'latency_seconds_bucket{le="1"} 4' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+    assert "latency_seconds_count 4" in text
+
+
+def test_client_records_request_metrics(monkeypatch):
+    reg = MetricsRegistry()
+    client = AhrefsClient(metrics=reg)
+    raw = SimpleNamespace(retries=SimpleNamespace(history=("r1", "r2")))
+    monkeypatch.setattr(
+        client.session,
+        "request",
+        lambda **kw: SimpleNamespace(status_code=200, content=b"{}", text="{}", raw=raw, json=lambda: {}),
+    )
+
+    client.get_overview(target="example.com")
+
+    endpoint = (("endpoint", "/overview/overview"),)
+    assert reg.value(CLIENT_REQUESTS, endpoint + (("method", "GET"), ("status", "2xx"))) == 1
+    assert reg.value(CLIENT_RETRIES, endpoint) == 2
+    assert reg.value(CLIENT_IN_FLIGHT) == 0
+
+
+def test_metrics_route_exposes_router_metrics(client: TestClient, fake_client: AhrefsClient, monkeypatch):
+    monkeypatch.setattr(fake_client, "get_overview", lambda **kw: {"dr": 75})
+    assert client.get("/ahrefs/overview/overview", params={"target": "example.com"}).status_code == 200
+
+    res = client.get("/ahrefs/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    assert 'ahrefs_router_requests_total{route="/ahrefs/overview/overview",method="GET",status="2xx"}' in res.text
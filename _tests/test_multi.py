@@ -0,0 +1,89 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.core.landing_page.ahrefs.api import multi
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.errors import AhrefsAPIError
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    multi.CACHE.clear()
+    yield
+    multi.CACHE.clear()
+
+
+def test_multi_runs_operations_concurrently(client: TestClient, fake_client: AhrefsClient, monkeypatch):
+    barrier = threading.Barrier(3, timeout=2)
+
+    def slow(name):
+        def call(**kwargs):
+            barrier.wait()  # all three must be in flight at once
+            return {"op": name, "target": kwargs.get("target") or kwargs.get("domain")}
+
+        return call
+
+    monkeypatch.setattr(fake_client, "get_overview", slow("overview"))
+    monkeypatch.setattr(fake_client, "get_domain_rating", slow("domain_rating"))
+    monkeypatch.setattr(fake_client, "get_metrics", slow("metrics"))
+
+    def broken(**kwargs):
+        raise AhrefsAPIError("HTTP 503", status_code=503)
+
+    monkeypatch.setattr(fake_client, "get_backlinks_stats", broken)
+    body = client.post("/ahrefs/multi", json={"operations": [
+        {"op": "overview", "payload": {"target": "a.com"}},
+        {"op": "get_domain_rating", "id": "dr", "payload": {"domain": "a.com"}},
+        {"op": "metrics", "payload": {"target": "a.com"}},
+        {"op": "backlinks_stats", "payload": {"target": "a.com"}},
+        {"op": "no_such_op"},
+        {"op": "overview", "payload": {}},
+    ]}).json()
+    data = body["data"]
+    assert body["ok"] is False
+    assert list(data) == ["overview", "dr", "metrics", "backlinks_stats", "no_such_op", "overview#2"]
+    assert data["dr"] == {"ok": True, "data": {"op": "domain_rating", "target": "a.com"}}
+    assert data["backlinks_stats"]["error"] == "ahrefs_api_error" and data["backlinks_stats"]["status_code"] == 503
+    assert data["no_such_op"]["error"] == "unknown_operation"
+    assert data["overview#2"]["error"] == "invalid_payload"
+
+
+def test_multi_singleflight_and_cache(client: TestClient, fake_client: AhrefsClient, monkeypatch):
+    calls = []
+
+    def overview(**kwargs):
+        calls.append(kwargs)
+        time.sleep(0.05)
+        return {"target": kwargs["target"]}
+
+    monkeypatch.setattr(fake_client, "get_overview", overview)
+    ops = [{"op": "overview", "payload": {"target": "a.com"}}] * 3
+    assert client.post("/ahrefs/multi", json={"operations": ops}).json()["ok"] is True
+    assert client.post("/ahrefs/multi", json={"operations": ops[:1]}).json()["data"]["overview"]["data"] == {"target": "a.com"}
+    assert len(calls) == 1
+
+
+def test_multi_deadline_returns_partial_results(client: TestClient, fake_client: AhrefsClient, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(fake_client, "get_overview", lambda **kw: {"fast": True})
+
+    def stuck(**kwargs):
+        release.wait(2)
+        return {"slow": True}
+
+    monkeypatch.setattr(fake_client, "get_metrics", stuck)
+    body = client.post("/ahrefs/multi", json={"deadline_ms": 50, "operations": [
+        {"op": "overview", "payload": {"target": "a.com"}},
+        {"op": "metrics", "payload": {"target": "a.com"}},
+    ]}).json()
+    release.set()
+    assert body["data"]["overview"] == {"ok": True, "data": {"fast": True}}
+    assert body["data"]["metrics"]["error"] == "deadline_exceeded"
+
+
+def test_multi_limits_operation_count(client: TestClient):
+    ops = [{"op": "overview", "payload": {"target": "a.com"}}] * (multi.MAX_OPERATIONS + 1)
+    assert client.post("/ahrefs/multi", json={"operations": ops}).status_code == 422
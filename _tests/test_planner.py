@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from backend.app.core.landing_page.ahrefs.cli import main
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.metrics import CLIENT_LATENCY, MetricsRegistry
+from backend.app.core.landing_page.ahrefs.planner import BATCH, PAGINATED, SINGLE, Operation, operations, plan
+from backend.app.core.landing_page.ahrefs.scheduler import BULK
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer
+
+
+def _plan(ops, **kw):
+    kw.setdefault("metrics", MetricsRegistry())
+    return plan(ops, **kw)
+
+
+def test_duplicate_calls_collapse_and_fields_merge():
+    p = _plan([
+        Operation("get_metrics", {"target": "Example.com"}),
+        Operation("metrics", {"target": "example.com."}),
+        Operation("get_backlinks_stats", {"target": "example.com", "fields": ["live"]}),
+        Operation("get_backlinks_stats", {"target": "example.com", "fields": "live,all_time"}),
+    ])
+    assert (p.operations, p.naive_requests, p.requests) == (4, 4, 2)
+    metrics, stats = p.steps
+    assert (metrics.kind, metrics.params, metrics.covers) == (SINGLE, {"target": "example.com"}, 2)
+    assert stats.params == {"target": "example.com", "fields": ["live", "all_time"]}
+
+
+def test_only_targets_are_canonicalised():
+    p = _plan([Operation("get_serp_overview", {"query": "New York Pizza"}), Operation("get_serp_overview", {"query": "new york pizza"})])
+    assert [s.params["query"] for s in p.steps] == ["New York Pizza", "new york pizza"]
+    [step] = _plan([Operation("create_project", {"name": "My Brand Project", "target": "Example.com"})]).steps
+    assert step.params == {"name": "My Brand Project", "target": "Example.com"}
+
+
+def test_non_idempotent_calls_are_never_merged():
+    create = Operation("create_project", {"name": "Brand", "target": "example.com"})
+    p = _plan([create, create])
+    assert [s.covers for s in p.steps] == [1, 1] and p.requests == 2
+
+
+def test_overlapping_page_ranges_merge():
+    p = _plan([
+        Operation("get_backlinks", {"target": "a.com"}, rows=250),
+        Operation("get_backlinks", {"target": "a.com", "offset": 200}, rows=100),  # overlaps: 0..300
+        Operation("get_backlinks", {"target": "a.com", "offset": 1000}, rows=50),  # separate range
+        Operation("get_backlinks", {"target": "b.com"}, rows=100),
+    ])
+    assert p.naive_requests == 3 + 1 + 1 + 1
+    assert [(s.params["target"], s.params["offset"], s.rows, s.requests) for s in p.steps] == [
+        ("a.com", 0, 300, 3),
+        ("a.com", 1000, 50, 1),
+        ("b.com", 0, 100, 1),
+    ]
+    assert all(s.kind == PAGINATED and s.lane == BULK and s.page_size == 100 for s in p.steps)
+    # backlinks cost 1 unit per row on top of the per-request charge
+    per_request = p.steps[2].units - 100
+    assert p.units == 5 * per_request + 450
+
+
+def test_single_domain_lookups_fold_into_batches():
+    domains = [f"site{i}.com" for i in range(150)]
+    ops = operations("get_domain_rating", domains) + operations("get_domain_metrics", domains[:10])
+    p = _plan(ops, batch_size=100)
+    assert [(s.kind, s.rows, s.covers) for s in p.steps] == [(BATCH, 100, 110), (BATCH, 50, 50)]
+    assert p.steps[0].params["items"][:2] == ["site0.com", "site1.com"]
+    assert p.requests == 2 and p.naive_requests == 160
+    assert _plan(ops, batch=False).requests == 160
+
+
+def test_wall_time_from_rate_limit_concurrency_and_observed_latency():
+    metrics = MetricsRegistry()
+    for _ in range(4):
+        metrics.observe(CLIENT_LATENCY, (("endpoint", "/site-explorer/metrics"),), 2.0)
+    ops = operations("get_metrics", [f"s{i}.com" for i in range(120)])
+    # 60 requests fit the bucket, the other 60 wait a minute for tokens
+    limited = plan(ops, rate_limit_per_min=60, concurrency=100, metrics=metrics)
+    assert limited.token_wait_s == 60.0 and limited.wall_time_s == pytest.approx(62.0)
+    # plenty of tokens: 120 requests of 2s over 4 workers
+    busy = plan(ops, rate_limit_per_min=10_000, concurrency=4, metrics=metrics)
+    assert busy.token_wait_s == 0 and busy.wall_time_s == pytest.approx(60.0)
+    # an export's pages are sequential whatever the worker count
+    export = _plan([Operation("get_backlinks", {"target": "a.com"}, rows=1000)], rate_limit_per_min=10_000, concurrency=8)
+    assert export.wall_time_s == pytest.approx(10 * 0.5)
+
+
+def test_plan_rejects_missing_targets():
+    with pytest.raises(ValueError, match="requires target"):
+        _plan([Operation("get_backlinks", {})])
+
+
+def test_cli_dry_run_makes_no_requests(tmp_path, capsys: pytest.CaptureFixture):
+    targets = tmp_path / "targets.txt"
+    targets.write_text("a.com\nA.com\nb.com\n")
+    with StubServer(StubConfig()) as server:
+        client = AhrefsClient(api_key="k", base_url=server.base_url, rate_limit_per_min=60, metrics=MetricsRegistry())
+        code = main([str(targets), "-o", str(tmp_path / "out.ndjson"), "--op", "domain_rating", "--dry-run"], client=client)
+        assert code == 0 and server.stats.total == 0
+    summary = json.loads(capsys.readouterr().out)
+    assert (summary["operations"], summary["requests"]) == (3, 2)
+    assert not (tmp_path / "out.ndjson").exists()
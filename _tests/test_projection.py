@@ -0,0 +1,38 @@
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.projection import normalize_fields, project
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer
+
+
+def test_project_shapes():
+    assert normalize_fields(" a, b,,a ") == ("a", "b") and normalize_fields("") is None
+    rows = {"backlinks": [{"url_from": "u", "traffic": 1, "anchor": "x"}], "total": 1}
+    assert project(rows, "url_from") == {"backlinks": [{"url_from": "u"}], "total": 1}
+    assert project({"data": [{"a": 1, "b": 2}]}, ["b"]) == {"data": [{"b": 2}]}
+    assert project({"domain_rating": 50, "ahrefs_rank": 9}, "domain_rating") == {"domain_rating": 50}
+    assert project({"metrics": {"org_traffic": 1, "paid": 2}}, "org_traffic") == {"metrics": {"org_traffic": 1}}
+    assert project(rows, None) is rows and rows["backlinks"][0]["anchor"] == "x"
+
+
+def test_client_forwards_select_and_projects():
+    with StubServer(StubConfig(total_rows=20, row_padding=200)) as stub:
+        client = AhrefsClient(api_key="k", base_url=stub.base_url, rate_limit_per_min=10_000, max_retries=0)
+        full = client.get_pages_by_traffic(target="a.com")
+        full_bytes = stub.stats.bytes_sent
+        slim = client.get_pages_by_traffic(target="a.com", fields="url_from,traffic")
+        rows = full["pages_by_traffic"]
+        assert slim["pages_by_traffic"] == [{"url_from": r["url_from"], "traffic": r["traffic"]} for r in rows]
+        assert stub.stats.bytes_sent - full_bytes < full_bytes / 5
+        # no native selection upstream: projected after decoding
+        batch = client.post_batch_analysis(items=["a.com", "b.com"], fields=["domain_rating"])
+        assert [set(row) for row in batch["targets"]] == [{"domain_rating"}] * 2
+
+
+def test_routes_accept_fields(client, fake_client, monkeypatch):
+    monkeypatch.setattr(fake_client, "_request", lambda method, path, **kw: {"rows": [{"url_from": "u", "anchor": "x", "sent": kw["params"]}]})
+    body = client.post("/ahrefs/site-explorer/pages-by-traffic?fields=url_from,sent", json={"target": "a.com"}).json()
+    assert body["data"]["rows"] == [{"url_from": "u", "sent": {"target": "a.com", "select": "url_from,sent"}}]
+    # /v1 endpoints take no `select`: projected locally
+    body = client.post("/ahrefs/backlinks?fields=sent", json={"target": "a.com"}).json()
+    assert body["data"]["rows"] == [{"sent": {"target": "a.com", "limit": 100, "offset": 0}}]
+    body = client.post("/ahrefs/multi", json={"operations": [{"op": "backlinks", "payload": {"target": "a.com"}, "fields": ["anchor"]}]}).json()
+    assert body["data"]["backlinks"]["data"]["rows"] == [{"anchor": "x"}]
@@ -0,0 +1,93 @@
+import threading
+
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.errors import AhrefsAPIError
+from backend.app.core.landing_page.ahrefs.rank_sync import diff, keyword_key, sync
+from backend.app.core.landing_page.ahrefs.scheduler import BULK, current_lane, lane
+from backend.app.core.landing_page.ahrefs.units import current_tag, tagged
+
+
+class _Project:
+    """In-memory Rank Tracker project standing in for the management endpoints."""
+
+    def __init__(self, keywords=(), competitors=()):
+        self.keywords = list(keywords)
+        self.competitors = list(competitors)
+        self.calls = []
+        self.lock = threading.Lock()
+        self.fail_on = None
+
+    def _log(self, name, items):
+        with self.lock:
+            self.calls.append((name, len(items)))
+        if self.fail_on and self.fail_on in items:
+            raise AhrefsAPIError("HTTP 500", status_code=500)
+
+    def get_keywords(self, *, project_id):
+        return {"keywords": [{"keyword": k, "volume": 10} for k in self.keywords]}
+
+    def put_keywords(self, *, project_id, keywords):
+        self._log("put_keywords", keywords)
+        with self.lock:
+            self.keywords.extend(keywords)
+
+    def delete_keywords(self, *, project_id, keywords):
+        self._log("delete_keywords", keywords)
+        gone = set(keywords)
+        with self.lock:
+            self.keywords = [k for k in self.keywords if k not in gone]
+
+    def get_competitors(self, *, project_id):
+        return {"competitors": [{"domain": c} for c in self.competitors]}
+
+    def add_competitors(self, *, project_id, competitors):
+        self._log("add_competitors", competitors)
+        self.competitors.extend(competitors)
+
+    def delete_competitors(self, *, project_id, competitors):
+        self._log("delete_competitors", competitors)
+        self.competitors = [c for c in self.competitors if c not in competitors]
+
+
+def test_diff_uses_canonical_keys():
+    to_add, to_remove, unchanged = diff(["Coffee  Beans", "tea"], ["coffee beans", "espresso"], keyword_key)
+    assert (to_add, to_remove, unchanged) == (["espresso"], ["tea"], 1)
+
+
+def test_sync_keywords_sends_only_the_delta_in_chunks():
+    project = _Project(keywords=[f"kw {i}" for i in range(5000)])
+    desired = [f"KW {i}" for i in range(1000, 6200)]
+    report = AhrefsClient.sync_keywords(project, "p_1", desired, chunk_size=500)
+    assert len(report.removed) == 1000 and len(report.added) == 1200 and report.unchanged == 4000
+    assert report.ok and report.requests == 2 + 3
+    assert sorted(project.calls) == [("delete_keywords", 500)] * 2 + [("put_keywords", 200)] + [("put_keywords", 500)] * 2
+    # a second sync with the same desired state sends nothing
+    project.calls.clear()
+    again = AhrefsClient.sync_keywords(project, "p_1", desired)
+    assert not again.changed and again.requests == 0 and project.calls == []
+
+
+def test_sync_competitors_prune_dry_run_and_failures():
+    project = _Project(competitors=["a.com", "https://B.com/"])
+    report = AhrefsClient.sync_competitors(project, "p_1", ["b.com", "https://b.com", "c.com"], dry_run=True)
+    assert report.added == ["b.com", "c.com"] and report.removed == ["a.com"] and report.unchanged == 1
+    assert project.calls == []
+
+    report = AhrefsClient.sync_competitors(project, "p_1", ["c.com"], prune=False)
+    assert report.added == ["c.com"] and report.removed == []
+
+    project.fail_on = "d.com"
+    report = AhrefsClient.sync_competitors(project, "p_1", ["a.com", "d.com", "e.com"], chunk_size=1, prune=False)
+    assert report.added == ["e.com"] and not report.ok
+    assert report.failed[0].action == "add" and report.failed[0].items == ["d.com"]
+
+
+def test_chunks_keep_the_callers_tag_and_lane():
+    seen = []
+
+    def record(chunk):
+        seen.append((current_tag(), current_lane()))
+
+    with tagged("rank-sync"), lane(BULK):
+        sync(current=["x", "y"], desired=["a", "b", "c"], key=str, add=record, remove=record, chunk_size=1, max_workers=4)
+    assert seen == [("rank-sync", BULK)] * 5
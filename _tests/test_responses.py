@@ -0,0 +1,40 @@
+import datetime as dt
+
+import pytest
+
+from backend.app.core.landing_page.ahrefs.errors import AhrefsResponseValidationError
+from backend.app.core.landing_page.ahrefs.responses import BacklinkRow, HistoryPoint, RowPage, parse
+
+
+def test_rows_decode_lazily_and_cache():
+    raw = {"url_from": "https://a.example/", "domain_rating": "71", "first_seen": "2024-01-01T00:00:00Z", "traffic": "oops"}
+    row = BacklinkRow(raw)
+    assert row.domain_rating == 71.0
+    assert row.first_seen == dt.datetime(2024, 1, 1, tzinfo=dt.timezone.utc)
+    raw["first_seen"] = "2020-01-01T00:00:00Z"
+    assert row.first_seen.year == 2024  # parsed once, then cached
+    assert row.anchor is None
+    with pytest.raises(AhrefsResponseValidationError):
+        row.traffic
+    assert not hasattr(row, "__dict__")
+
+
+def test_page_access_and_strict_mode():
+    payload = {"backlinks": [{"url_from": f"https://r{i}.example/", "domain_rating": i} for i in range(5)]}
+    page = parse("get_backlinks", payload)
+    assert isinstance(page, RowPage) and len(page) == 5
+    assert page[2].url_from == "https://r2.example/"
+    assert [r.domain_rating for r in page[-2:]] == [3.0, 4.0]
+    assert page.column("domain_rating") == [0.0, 1.0, 2.0, 3.0, 4.0]
+
+    parse("backlinks", payload, strict=True)
+    with pytest.raises(AhrefsResponseValidationError) as exc:
+        parse("get_backlinks", {"backlinks": [{"domain_rating": 1}]}, strict=True)
+    assert exc.value.field == "url_from"
+
+
+def test_history_points():
+    page = parse("get_domain_rating_history", {"domain_ratings": [{"date": "2024-01-02", "domain_rating": 55}]})
+    point = page[0]
+    assert isinstance(point, HistoryPoint)
+    assert (point.date, point.value) == (dt.date(2024, 1, 2), 55.0)
@@ -0,0 +1,131 @@
+import threading
+import time
+
+import pytest
+
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.metrics import SCHEDULER_GRANTS, MetricsRegistry
+from backend.app.core.landing_page.ahrefs.scheduler import PriorityScheduler, lane
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer
+from backend.app.core.landing_page.ahrefs.units import BudgetGuard, UnitLedger
+
+
+class _GateLimiter:
+    """Limiter whose first token is held until `gate` is set; records who got each token."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.order = []
+
+    def acquire(self):
+        if not self.order:
+            self.order.append("first")
+            self.gate.wait(2)
+            return
+        self.order.append(threading.current_thread().name)
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_weighted_fair_share_across_lanes():
+    limiter = _GateLimiter()
+    scheduler = PriorityScheduler(capacity=1000, weights={"interactive": 3, "bulk": 1}, reserved=0, limiter=limiter, metrics=MetricsRegistry())
+    holder = threading.Thread(target=scheduler.acquire, args=("bulk",))
+    holder.start()
+    _wait_for(lambda: limiter.order)
+    threads = [threading.Thread(target=scheduler.acquire, args=(name,), name=name) for name in ["bulk"] * 8 + ["interactive"] * 8]
+    for t in threads:
+        t.start()
+    _wait_for(lambda: sum(scheduler.queued().values()) == 16)
+    limiter.gate.set()
+    for t in threads + [holder]:
+        t.join(2)
+    # 3:1 shares; bulk already had the held token, so interactive catches up first
+    assert limiter.order[1:10] == ["interactive"] * 4 + ["bulk"] + ["interactive"] * 3 + ["bulk"]
+    assert limiter.order[1:].count("bulk") == 8
+
+
+def test_reserved_capacity_keeps_tokens_for_the_top_lane():
+    limiter = _GateLimiter()
+    limiter.gate.set()
+    scheduler = PriorityScheduler(capacity=10, window_s=0.3, reserved=0.3, limiter=limiter, metrics=MetricsRegistry())
+    for _ in range(7):
+        scheduler.acquire("bulk")
+    blocked = threading.Thread(target=scheduler.acquire, args=("normal",))
+    blocked.start()
+    blocked.join(0.05)
+    assert blocked.is_alive()  # the other lanes used their 7 of 10 tokens this window
+    assert scheduler.acquire("interactive") < 0.05
+    blocked.join(1)
+    assert not blocked.is_alive()
+    with pytest.raises(ValueError):
+        scheduler.acquire("urgent")
+
+
+def test_waiter_interrupted_after_its_turn_hands_it_on(monkeypatch: pytest.MonkeyPatch):
+    limiter = _GateLimiter()
+    scheduler = PriorityScheduler(capacity=1000, reserved=0, limiter=limiter, metrics=MetricsRegistry())
+    real_wait = scheduler._cond.wait
+
+    def wait(timeout=None):
+        woken = real_wait(timeout)
+        if threading.current_thread().name == "victim" and scheduler._turn is not None:
+            raise KeyboardInterrupt  # the turn was just handed to the only waiter
+        return woken
+
+    monkeypatch.setattr(scheduler._cond, "wait", wait)
+    interrupted = []
+
+    def victim():
+        try:
+            scheduler.acquire("bulk")
+        except KeyboardInterrupt:
+            interrupted.append(True)
+
+    holder = threading.Thread(target=scheduler.acquire, args=("bulk",))
+    holder.start()
+    _wait_for(lambda: limiter.order)
+    waiter = threading.Thread(target=victim, name="victim")
+    waiter.start()
+    _wait_for(lambda: scheduler.queued()["bulk"] == 1)
+    limiter.gate.set()
+    for t in (holder, waiter):
+        t.join(2)
+    assert interrupted == [True]
+    later = threading.Thread(target=scheduler.acquire, args=("normal",), name="later")
+    later.start()
+    later.join(2)
+    assert not later.is_alive() and limiter.order == ["first", "later"]
+    assert scheduler.queued() == {"interactive": 0, "normal": 0, "bulk": 0}
+
+
+def test_client_lane_from_kwarg_context_and_soft_budget():
+    metrics = MetricsRegistry()
+    with StubServer(StubConfig()) as stub:
+        scheduler = PriorityScheduler(capacity=1000, metrics=metrics)
+        client = AhrefsClient(api_key="k", base_url=stub.base_url, max_retries=0, scheduler=scheduler)
+        client.get_domain_rating(domain="a.com", priority="interactive")
+        client.get_domain_rating(domain="a.com")
+        with lane("bulk"):
+            client.get_domain_rating(domain="a.com")
+            client.get_domain_rating(domain="a.com", priority="interactive")
+        # past the soft budget threshold, requests queue in the bottom lane instead of sleeping
+        estimate = client.cost_table.estimate("/site-explorer/domain-rating")
+        guard = BudgetGuard(monthly_units=estimate / 0.95, mode="soft", soft_delay_s=30)
+        tight = AhrefsClient(api_key="k", base_url=stub.base_url, max_retries=0, scheduler=scheduler, budget_guard=guard, ledger=UnitLedger())
+        start = time.monotonic()
+        tight.get_domain_rating(domain="a.com", priority="interactive")
+        assert time.monotonic() - start < 5
+        # without lanes the delay is the fallback
+        guard.soft_delay_s = 0.2
+        unlaned = AhrefsClient(api_key="k", base_url=stub.base_url, max_retries=0, budget_guard=guard, ledger=UnitLedger())
+        start = time.monotonic()
+        unlaned.get_domain_rating(domain="a.com")
+        assert time.monotonic() - start >= 0.2
+    grants = {name: metrics.value(SCHEDULER_GRANTS, (("lane", name),)) for name in ("interactive", "normal", "bulk")}
+    assert grants == {"interactive": 2, "normal": 1, "bulk": 2}
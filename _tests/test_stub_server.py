@@ -0,0 +1,49 @@
+import pytest
+
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.errors import AhrefsAPIError, AhrefsAuthError, AhrefsRateLimitError
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer, fixed
+
+
+@pytest.fixture()
+def stub():
+    with StubServer(StubConfig(total_rows=250, require_auth=True)) as server:
+        yield server
+
+
+def _client(base_url: str, **kwargs) -> AhrefsClient:
+    return AhrefsClient(api_key="k", base_url=base_url, rate_limit_per_min=10_000, max_retries=0, **kwargs)
+
+
+def test_real_http_roundtrip(stub: StubServer):
+    client = _client(stub.base_url)
+    page = client.get_backlinks(target="example.com", limit=100, offset=200)
+    assert len(page["backlinks"]) == 50
+    assert client.post_batch_analysis(items=["a.com", "b.com"])["targets"][1]["target"] == "b.com"
+    assert client.get_domain_rating_history(target="example.com", date_from="2024-01-01", date_to="2024-01-10")["domain_ratings"][0]["date"] == "2024-01-01"
+    assert stub.stats.requests["/v1/backlinks"] == 1
+
+
+def test_auth_required(stub: StubServer):
+    client = _client(stub.base_url, auth_in_header=False, api_key_query_param="apikey")
+    with pytest.raises(AhrefsAuthError):
+        client.get_overview(target="example.com")
+
+
+@pytest.mark.parametrize("config, error", [
+    (StubConfig(error_rate_429=1.0), AhrefsRateLimitError),
+    (StubConfig(error_rate_5xx=1.0), AhrefsAPIError),
+])
+def test_injected_failures(config, error):
+    with StubServer(config) as server:
+        with pytest.raises(error):
+            _client(server.base_url).get_metrics(target="example.com")
+
+
+def test_latency_distribution_applies():
+    with StubServer(StubConfig(latency=fixed(0.05))) as server:
+        client = _client(server.base_url)
+        traces = []
+        client.hooks.register("after_headers", lambda p, t: traces.append(t))
+        client.get_metrics(target="example.com")
+    assert traces[0].breakdown()["ttfb"] >= 0.05
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from backend.app.core.landing_page.ahrefs.api import deps as api_deps
+from backend.app.core.landing_page.ahrefs.api.tenancy import DEFAULT_TENANT, TenantScheduler, tenant_of
+from backend.app.core.landing_page.ahrefs.metrics import REGISTRY, TENANT_REQUESTS, MetricsRegistry
+
+
+def test_deficit_round_robin_across_tenants():
+    async def scenario():
+        scheduler = TenantScheduler(max_concurrent=1, metrics=MetricsRegistry())
+        order = []
+
+        async def request(tenant):
+            async with scheduler.slot(tenant):
+                order.append(tenant)
+                await asyncio.sleep(0)
+
+        holder = await scheduler.acquire("noisy")
+        tasks = [asyncio.ensure_future(request("noisy")) for _ in range(6)]
+        tasks += [asyncio.ensure_future(request("quiet")) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        assert scheduler.stats()["noisy"] == {"queued": 6, "active": 1}
+        scheduler.release(holder)
+        await asyncio.gather(*tasks)
+        return order
+
+    order = asyncio.run(scenario())
+    # the quiet tenant alternates with the noisy one instead of waiting behind its backlog
+    assert order == ["noisy", "quiet", "noisy", "quiet"] + ["noisy"] * 4
+
+
+def test_per_tenant_concurrency_and_rate_caps():
+    async def scenario():
+        scheduler = TenantScheduler(max_concurrent=10, tenant_concurrency=2, tenant_rate_per_min=3, metrics=MetricsRegistry())
+        held = [await scheduler.acquire("t1"), await scheduler.acquire("t1")]
+        third = asyncio.ensure_future(scheduler.acquire("t1"))
+        await asyncio.sleep(0.01)
+        assert not third.done()  # at its concurrency cap
+        for _ in range(4):  # the default tenant is only bound by max_concurrent
+            await scheduler.acquire(DEFAULT_TENANT)
+        scheduler.release(held[0])
+        await asyncio.wait_for(third, 1)
+        with pytest.raises(HTTPException) as exc_info:  # 4th request within the minute
+            await scheduler.acquire("t1")
+        return exc_info.value
+
+    exc = asyncio.run(scenario())
+    assert exc.status_code == 429 and int(exc.headers["Retry-After"]) >= 1
+
+
+def test_tenant_clients_are_reused_and_routes_are_metered(client, fake_client, monkeypatch):
+    monkeypatch.setattr(fake_client, "get_domain_rating", lambda **kw: {"domain_rating": 50})
+    labels = (("tenant", tenant_of("Bearer token-a")),)
+    before = REGISTRY.value(TENANT_REQUESTS, labels)
+    resp = client.post("/ahrefs/site-explorer/domain-rating", json={"domain": "a.com"}, headers={"Authorization": "Bearer token-a"})
+    assert resp.status_code == 200 and REGISTRY.value(TENANT_REQUESTS, labels) == before + 1
+
+    first = api_deps.get_client("Bearer token-a")
+    assert api_deps.get_client("Bearer token-a") is first
+    assert api_deps.get_client("Bearer token-b") is not first
+    assert tenant_of("Bearer token-a") != tenant_of("Bearer token-b") and tenant_of(None) == DEFAULT_TENANT
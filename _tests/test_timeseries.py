@@ -0,0 +1,97 @@
+import datetime as dt
+import math
+
+import pytest
+
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.timeseries import TimeSeries, align, fetch_series, series_from_payload, to_epoch_day
+
+
+def _series(points, name=""):
+    return TimeSeries.from_points(points, name=name)
+
+
+def test_from_payload_sorts_and_dedupes():
+    payload = {"domain_ratings": [
+        {"date": "2024-01-03", "domain_rating": 3},
+        {"date": "2024-01-01", "domain_rating": 1},
+        {"date": "2024-01-03", "domain_rating": 4},
+    ]}
+    s = series_from_payload(payload)
+    assert s.days.typecode == "q" and s.values.typecode == "d"
+    assert list(s) == [(dt.date(2024, 1, 1), 1.0), (dt.date(2024, 1, 3), 4.0)]
+    assert list(series_from_payload({"metrics": [{"date": "2024-01-01", "org": 1, "paid": 9}]}, field="paid").values) == [9.0]
+
+
+@pytest.fixture(params=["python", "numpy"])
+def backend(request, monkeypatch):
+    from backend.app.core.landing_page.ahrefs import timeseries
+
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+        monkeypatch.setattr(timeseries, "_numpy", None)
+    else:
+        monkeypatch.setattr(timeseries, "_numpy", False)
+    return request.param
+
+
+def test_resample_diff_between(backend):
+    s = _series([(f"2024-01-{d:02d}", d) for d in range(1, 32)])
+    weekly = s.resample("week", how="last")
+    assert weekly.start == dt.date(2024, 1, 1)  # a Monday
+    assert list(weekly.values)[:2] == [7.0, 14.0]
+    assert list(s.resample("month", how="sum").values) == [sum(range(1, 32))]
+    assert list(s.diff().values) == [1.0] * 30
+    assert len(s.between("2024-01-10", "2024-01-12")) == 3
+    gappy = _series([("2024-01-01", 1), ("2024-01-02", None), ("2024-02-05", 4), ("2024-02-06", 6)])
+    assert list(gappy.resample("month", how="mean").values) == [1.0, 5.0]
+    assert list(gappy.resample(7, how="max").values) == [1.0, 6.0]
+
+
+def test_align_outer_and_inner(backend):
+    a = _series([("2024-01-01", 1), ("2024-01-02", 2)])
+    b = _series([("2024-01-02", 20), ("2024-01-03", 30)])
+    days, cols = align({"a": a, "b": b})
+    assert list(days) == [to_epoch_day("2024-01-01") + i for i in range(3)]
+    assert math.isnan(cols["a"][2]) and list(cols["b"])[1:] == [20.0, 30.0]
+    days, cols = align({"a": a, "b": b}, how="inner")
+    assert len(days) == 1 and cols["a"][0] == 2.0 and cols["b"][0] == 20.0
+
+
+def test_align_scales_to_many_long_series(backend):
+    # 200 series of 1000 days over a 3000-day span, each starting and stepping differently
+    start = to_epoch_day("2020-01-01")
+    series = {
+        f"s{k}": TimeSeries.from_points([(start + k * 10 + i * (1 + k % 3), float(k * 100_000 + i)) for i in range(1000)])
+        for k in range(200)
+    }
+    days, cols = align(series)
+    expected = sorted({d for s in series.values() for d in s.days})
+    assert list(days) == expected
+    position = {d: i for i, d in enumerate(expected)}
+    for name, s in series.items():
+        col = cols[name]
+        assert [col[position[d]] for d in s.days] == list(s.values)
+        assert sum(1 for v in col if not math.isnan(v)) == len(s)
+    # the daily series starting within the first 500 days share 520 of them
+    daily = {name: s for name, s in series.items() if int(name[1:]) % 3 == 0 and int(name[1:]) < 50}
+    days, cols = align(daily, how="inner")
+    assert list(days) == list(range(start + 480, start + 1000))
+    assert all(list(cols[name]) == list(s.between(days[0], days[-1]).values) for name, s in daily.items())
+
+
+def test_to_numpy_is_zero_copy():
+    np = pytest.importorskip("numpy")
+    s = _series([("2024-01-01", 1), ("2024-01-02", 2)])
+    days, values = s.to_numpy()
+    s.values[0] = 42.0
+    assert values[0] == 42.0
+    assert days[0] == np.datetime64("2024-01-01")
+
+
+def test_fetch_series_from_stub():
+    with StubServer(StubConfig(total_rows=10)) as stub:
+        client = AhrefsClient(api_key="k", base_url=stub.base_url, rate_limit_per_min=10_000, max_retries=0)
+        s = fetch_series(client, "get_domain_rating_history", target="example.com", date_from="2024-01-01", date_to="2024-01-31")
+    assert len(s) == 31 and s.name == "example.com"
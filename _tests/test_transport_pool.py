@@ -0,0 +1,81 @@
+import logging
+import ssl
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from backend.app.core.landing_page.ahrefs import config
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer, fixed
+from backend.app.core.landing_page.ahrefs.transport import DEFAULT_CA_BUNDLE_PATH, HTTP2Adapter, _ssl_verify
+
+
+def test_200_concurrent_callers_reuse_the_pool(caplog: pytest.LogCaptureFixture):
+    with StubServer(StubConfig(latency=fixed(0.01))) as stub:
+        client = AhrefsClient(api_key="k", base_url=stub.base_url, rate_limit_per_min=100_000, max_retries=0, pool_maxsize=16)
+        with caplog.at_level(logging.WARNING, logger="urllib3"):
+            with ThreadPoolExecutor(max_workers=200) as pool:
+                results = list(pool.map(lambda i: client.get_metrics(target=f"site{i}.com"), range(400)))
+        assert len(results) == 400
+        # blocking pool: no connection is opened beyond pool_maxsize, none is thrown away
+        assert stub.stats.connections <= 16
+    assert not [r for r in caplog.records if "pool is full" in r.getMessage()]
+
+
+def test_pool_options_reach_the_adapter():
+    adapter = AhrefsClient(api_key="k", pool_connections=3, pool_maxsize=4, pool_timeout_s=5).session.get_adapter("https://api.ahrefs.com")
+    assert (adapter._pool_connections, adapter._pool_maxsize, adapter._pool_block, adapter.pool_timeout_s) == (3, 4, True, 5)
+
+
+def test_exhausted_pool_fails_after_the_pool_timeout():
+    with StubServer(StubConfig(latency=fixed(1.0))) as stub:
+        client = AhrefsClient(api_key="k", base_url=stub.base_url, max_retries=0, pool_maxsize=1, pool_timeout_s=0.2)
+        holder = threading.Thread(target=client.get_metrics, kwargs={"target": "a.com"})
+        holder.start()
+        deadline = time.monotonic() + 2
+        while not stub.stats.connections and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with pytest.raises(requests.ConnectionError, match="No free connection"):
+            client.get_metrics(target="b.com")
+        holder.join()
+
+
+def test_default_clients_share_one_session(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("AHREFS_POOL_MAXSIZE", "8")
+    monkeypatch.setenv("AHREFS_POOL_CONNECTIONS", "2")
+    config.get_settings.cache_clear()
+    try:
+        first, second = config.get_client(), config.get_client()
+        assert first is not second and first.session is second.session
+        adapter = first.session.get_adapter("https://api.ahrefs.com")
+        assert (adapter._pool_connections, adapter._pool_maxsize) == (2, 8)
+    finally:
+        config.get_settings.cache_clear()
+
+
+def test_http2_transport():
+    pytest.importorskip("h2", reason="needs httpx[http2]")
+    with StubServer(StubConfig()) as stub:
+        client = AhrefsClient(api_key="k", base_url=stub.base_url, http2=True, max_retries=0)
+        assert client.get_metrics(target="example.com")
+        assert stub.stats.connections == 1
+
+
+def test_http2_tls_settings_follow_requests():
+    assert _ssl_verify(True, None) is True
+    assert _ssl_verify(False, None).verify_mode == ssl.CERT_NONE
+    context = _ssl_verify(DEFAULT_CA_BUNDLE_PATH, None)
+    assert context.verify_mode == ssl.CERT_REQUIRED and context.get_ca_certs()
+
+    pytest.importorskip("h2", reason="needs httpx[http2]")
+    adapter = HTTP2Adapter()
+    try:
+        default = adapter._client_for(True, None, None)
+        assert default is adapter._client
+        assert adapter._client_for(False, None, "http://proxy.local:3128") is not default
+        assert adapter._client_for(False, None, "http://proxy.local:3128") is adapter._client_for(False, None, "http://proxy.local:3128")
+    finally:
+        adapter.close()
@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.errors import AhrefsBudgetExceededError
+from backend.app.core.landing_page.ahrefs.key_pool import KeyPool
+from backend.app.core.landing_page.ahrefs.metrics import MetricsRegistry
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer
+from backend.app.core.landing_page.ahrefs.units import (
+    BudgetGuard,
+    CostTable,
+    EndpointCost,
+    UnitLedger,
+    UnitReconciler,
+    key_fingerprint,
+    parse_limits_and_usage,
+    tagged,
+)
+
+
+def _client(monkeypatch, payload, **kwargs) -> AhrefsClient:
+    client = AhrefsClient(api_key="k1", ledger=UnitLedger(), **kwargs)
+    monkeypatch.setattr(
+        client.session,
+        "request",
+        lambda **kw: SimpleNamespace(status_code=200, content=b"{}", text="{}", json=lambda: payload),
+    )
+    return client
+
+
+def test_cost_table_prefix_and_estimate():
+    table = CostTable({"/v1/backlinks": EndpointCost(10, 2)})
+    assert table.cost_for("/management/projects") == EndpointCost(0)
+    assert table.cost_for("/site-explorer/metrics") == EndpointCost(50, 1)
+    assert table.estimate("/v1/backlinks", params={"limit": 5}) == 20
+    assert table.estimate("/batch-analysis", json={"items": ["a", "b"]}) == 52
+
+
+def test_ledger_records_per_key_and_tag(monkeypatch):
+    client = _client(monkeypatch, {"backlinks": [{}, {}, {}]})
+    with tagged("export"):
+        client.get_backlinks(target="example.com", limit=3)
+    client.get_crawler_ip_ranges()  # free endpoint, not recorded
+
+    totals = client.ledger.totals()
+    assert totals == {(key_fingerprint("k1"), "export", "/v1/backlinks"): {"units": 53.0, "rows": 3.0, "requests": 1.0}}
+
+
+def test_hard_guard_rejects_before_sending(monkeypatch):
+    client = _client(monkeypatch, {}, budget_guard=BudgetGuard(monthly_units=100))
+    client.ledger.record(key_fingerprint("k1"), "default", "/v1/pages", 90)
+    monkeypatch.setattr(client.session, "request", lambda **kw: pytest.fail("request must not be sent"))
+
+    with pytest.raises(AhrefsBudgetExceededError) as exc_info:
+        client.get_pages(target="example.com", limit=10)
+    assert exc_info.value.used == 90
+    # free endpoints are never blocked
+    monkeypatch.setattr(client.session, "request", lambda **kw: SimpleNamespace(status_code=200, content=b"", text="", json=lambda: {}))
+    client.get_limits_and_usage()
+
+
+def test_soft_guard_deprioritises_background_tags():
+    ledger = UnitLedger()
+    ledger.reconcile("k", used=950, limit=1000)
+    guard = BudgetGuard(mode="soft", soft_ratio=0.9, priority_tags=("interactive",))
+    assert guard.check(ledger, "k", 10, "nightly") is True
+    assert guard.check(ledger, "k", 10, "interactive") is False
+    with pytest.raises(AhrefsBudgetExceededError):
+        guard.check(ledger, "k", 100, "nightly")
+    assert guard.check(ledger, "k", 100, "interactive") is False
+
+
+def test_reconciler_anchors_ledger_to_upstream(monkeypatch):
+    client = _client(monkeypatch, {"limits_and_usage": {"units_usage_api_key": 400, "units_limit_api_key": 1000}})
+    client.ledger.record(key_fingerprint("k1"), "default", "/v1/pages", 75)
+
+    assert UnitReconciler(client).reconcile_once() == (400.0, 1000.0)
+    assert client.ledger.used(key_fingerprint("k1")) == 400
+    assert client.ledger.limit(key_fingerprint("k1")) == 1000
+    assert parse_limits_and_usage({"data": {"units_usage_workspace": 5, "units_limit_workspace": 9}}) == (5.0, 9.0)
+
+
+def test_reconciler_covers_every_pooled_key():
+    ledger = UnitLedger()
+    pool = KeyPool(["k1", "k2", "bad"], ledger=ledger, metrics=MetricsRegistry())
+    with StubServer(StubConfig(key_errors={"bad": 401})) as stub:
+        client = AhrefsClient(base_url=stub.base_url, max_retries=0, key_pool=pool, ledger=ledger, metrics=pool.metrics)
+        assert UnitReconciler(client).reconcile_once() == (2000.0, 2_000_000.0)
+        assert stub.stats.keys == {"k1": 1, "k2": 1, "bad": 1}
+    assert [ledger.used(k.fingerprint) for k in pool.keys] == [1000, 1000, 0]
+    assert ledger.limit(pool.keys[1].fingerprint) == 1_000_000
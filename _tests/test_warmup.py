@@ -0,0 +1,114 @@
+import socket
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.app.core.landing_page.ahrefs import config, warmup
+from backend.app.core.landing_page.ahrefs.client import AhrefsClient
+from backend.app.core.landing_page.ahrefs.metrics import CACHE_HITS, WARMUP_CONNECTIONS, MetricsRegistry
+from backend.app.core.landing_page.ahrefs.stub_server import StubConfig, StubServer
+from backend.app.core.landing_page.ahrefs.warmup import DnsCache, warm_up
+
+
+def _connections(stub: StubServer, expected: int, timeout_s: float = 2.0) -> int:
+    # the stub counts a connection once its handler thread starts
+    deadline = time.monotonic() + timeout_s
+    while stub.stats.connections < expected and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return stub.stats.connections
+
+
+@pytest.fixture()
+def resolver(monkeypatch: pytest.MonkeyPatch):
+    calls = []
+
+    def fake_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+        calls.append(host)
+        if host == "down.example":
+            raise socket.gaierror("no such host")
+        return [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", ("10.0.0.1", port)),
+            (socket.AF_INET6, socket.SOCK_STREAM, 6, "", ("fd00::1", port, 0, 0)),
+        ]
+
+    monkeypatch.setattr(socket, "getaddrinfo", fake_getaddrinfo)
+    return calls
+
+
+def test_dns_cache_serves_hosts_until_the_ttl(resolver, monkeypatch: pytest.MonkeyPatch):
+    metrics = MetricsRegistry()
+    cache = DnsCache(ttl_s=60, metrics=metrics)
+    cache.resolve("api.example", 443)
+    infos = cache.resolve("api.example", 443, socket.AF_INET)
+    assert [info[4][0] for info in infos] == ["10.0.0.1"]
+    assert resolver == ["api.example"]
+    assert metrics.value(CACHE_HITS, (("cache", "dns"),)) == 1
+
+    now = warmup.time.monotonic()
+    monkeypatch.setattr(warmup.time, "monotonic", lambda: now + 61)
+    cache.resolve("api.example", 443)
+    assert resolver == ["api.example", "api.example"]
+
+
+def test_dns_cache_serves_stale_entries_when_refresh_fails(resolver, monkeypatch: pytest.MonkeyPatch):
+    cache = DnsCache(ttl_s=0, metrics=MetricsRegistry())
+    with pytest.raises(OSError):
+        cache.resolve("down.example", 443)
+    first = cache.resolve("api.example", 443)
+    monkeypatch.setattr(cache, "_upstream", lambda *args: (_ for _ in ()).throw(socket.gaierror("timeout")))
+    assert cache.resolve("api.example", 443) == first
+
+
+def test_warm_up_opens_connections_requests_reuse():
+    metrics = MetricsRegistry()
+    cache = DnsCache(metrics=metrics)
+    with StubServer(StubConfig()) as stub:
+        client = AhrefsClient(api_key="k", base_url=stub.base_url, max_retries=0, metrics=metrics)
+        report = warm_up(client, connections=3, dns_cache=cache)
+        assert report.connections == 3 and report.failed == 0 and report.addresses == ["127.0.0.1"]
+        assert _connections(stub, 3) == 3 and stub.stats.total == 0
+        for _ in range(3):
+            client.get_metrics(target="example.com")
+        assert _connections(stub, 4, timeout_s=0.2) == 3
+        client.session.close()
+    assert metrics.value(WARMUP_CONNECTIONS, (("result", "ok"),)) == 3
+
+
+def test_dns_cache_is_scoped_to_the_clients_pools(monkeypatch: pytest.MonkeyPatch):
+    real = socket.getaddrinfo
+    known = {"ahrefs.test": True}
+
+    def fake_getaddrinfo(host, port, *args):
+        if host == "ahrefs.test":
+            if not known["ahrefs.test"]:
+                raise socket.gaierror("no such host")
+            host = "127.0.0.1"
+        return real(host, port, *args)
+
+    monkeypatch.setattr(socket, "getaddrinfo", fake_getaddrinfo)
+    cache = DnsCache(metrics=MetricsRegistry())
+    with StubServer(StubConfig()) as stub:
+        client = AhrefsClient(api_key="k", base_url=stub.base_url.replace("127.0.0.1", "ahrefs.test"), max_retries=0)
+        assert warm_up(client, connections=0, dns_cache=cache).addresses == ["127.0.0.1"]
+        assert socket.getaddrinfo is fake_getaddrinfo  # nothing patched process-wide
+        known["ahrefs.test"] = False  # the host is gone from "DNS": only the cache knows it
+        with pytest.raises(socket.gaierror):
+            socket.getaddrinfo("ahrefs.test", 80)
+        assert client.get_metrics(target="example.com") is not None
+        assert stub.stats.total == 1
+        client.session.close()
+
+
+def test_lifespan_warms_the_default_session(monkeypatch: pytest.MonkeyPatch):
+    with StubServer(StubConfig()) as stub:
+        monkeypatch.setenv("AHREFS_BASE_URL", stub.base_url)
+        monkeypatch.setenv("AHREFS_WARMUP_CONNECTIONS", "2")
+        monkeypatch.setenv("AHREFS_DNS_TTL_S", "0")
+        config.get_settings.cache_clear()
+        try:
+            with TestClient(FastAPI(lifespan=warmup.lifespan)):
+                assert _connections(stub, 2) == 2
+        finally:
+            config.get_settings.cache_clear()
@@ -0,0 +1,57 @@
+"""
+Rate limiter queue depth, for admission control.
+
+Every client request that waits for a rate limiter token is counted here per
+key (`LIMITER_QUEUES.waiting(key_id, rate_per_min)` around the acquire), along
+with that key's rate. `estimate_wait` turns that into the time a new request
+would spend in the limiter: callers already waiting divided by the refill rate.
+The router's admission check (api/admission.py) sheds requests whose estimate
+exceeds their deadline instead of letting them block in `acquire()`.
+"""
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator
+
+from .metrics import CLIENT_LIMITER_QUEUE, REGISTRY
+
+
+class LimiterQueues:
+    """Callers currently waiting for a limiter token, and the limiter's rate, per key."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._depth: Dict[str, int] = {}
+        self._rate: Dict[str, float] = {}
+
+    @contextmanager
+    def waiting(self, key_id: str, rate_per_min: float) -> Iterator[None]:
+        labels = (("key", key_id),)
+        with self._lock:
+            self._depth[key_id] = self._depth.get(key_id, 0) + 1
+            self._rate[key_id] = rate_per_min
+        REGISTRY.gauge_add(CLIENT_LIMITER_QUEUE, labels, 1)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._depth[key_id] -= 1
+            REGISTRY.gauge_add(CLIENT_LIMITER_QUEUE, labels, -1)
+
+    def depth(self, key_ids: Iterable[str]) -> int:
+        with self._lock:
+            return sum(self._depth.get(k, 0) for k in key_ids)
+
+    def estimate_wait(self, key_ids: Iterable[str]) -> float:
+        """Seconds a new request for these keys would wait for a token (0 when nobody is waiting)."""
+        keys = tuple(key_ids)
+        with self._lock:
+            depth = sum(self._depth.get(k, 0) for k in keys)
+            rate = sum(self._rate.get(k, 0.0) for k in keys)
+        if not depth:
+            return 0.0
+        return depth * 60.0 / rate if rate else float("inf")
+
+
+LIMITER_QUEUES = LimiterQueues()
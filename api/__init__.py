@@ -1,5 +1,20 @@
 from __future__ import annotations
 
-from .routes import router
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from fastapi import APIRouter
+
+    router: APIRouter
 
 __all__ = ["router"]
+
+
+def __getattr__(name: str) -> Any:
+    # Building the router imports FastAPI, the request models and every route;
+    # defer that until the router is actually used.
+    if name == "router":
+        from .routes import router
+
+        return router
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -337,3 +337,29 @@ class CrawlerIpAddressesRequest(BaseModel):
 
 class CrawlerIpRangesRequest(BaseModel):
     extra: Dict[str, Any] | None = None
+
+
+# -----------------------------
+# Multi-operation models
+# -----------------------------
+class MultiOperation(BaseModel):
+    op: str = Field(description="Operation or client method name, e.g. 'overview' or 'get_domain_rating'")
+    id: Optional[str] = Field(default=None, description="Key of this result in the response (default: op)")
+    payload: Dict[str, Any] = Field(default_factory=dict, description="Fields of the operation's request model")
+    fields: Optional[List[str]] = Field(default=None, description="Keep only these fields of the result")
+
+
+class MultiRequest(BaseModel):
+    operations: List[MultiOperation]
+    deadline_ms: Optional[int] = Field(default=None, description="Return whatever finished after this many ms")
+
+
+# -----------------------------
+# Export job models
+# -----------------------------
+class JobRequest(BaseModel):
+    op: str = Field(description="Offset-paginated operation or client method name, e.g. 'backlinks'")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Parameters of the operation (limit/offset are managed by the job)")
+    fields: Optional[List[str]] = Field(default=None, description="Keep only these fields of each row")
+    page_size: int = Field(default=1000, ge=1, le=10000, description="Rows per upstream request")
+    max_rows: Optional[int] = Field(default=None, ge=1, description="Stop after this many rows")
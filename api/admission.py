@@ -0,0 +1,73 @@
+"""
+Load shedding for the `/ahrefs` router.
+
+Before a request runs, `AdmissionControl.check` estimates how long it would
+wait for a rate limiter token (`admission.LIMITER_QUEUES`: callers already
+waiting on the keys it would use, divided by their refill rate). If that is
+longer than the request's deadline, it is rejected at once with a 503 and a
+`Retry-After` of the excess, instead of blocking a worker until the caller has
+given up. The deadline is the `X-Request-Deadline-Ms` header, or
+`AHREFS_ADMISSION_MAX_WAIT_S` when absent (0 disables the default deadline).
+"""
+from __future__ import annotations
+
+import math
+from functools import lru_cache
+from typing import Mapping, Optional, Tuple
+
+from fastapi import HTTPException
+
+from ..admission import LIMITER_QUEUES, LimiterQueues
+from ..config import get_settings
+from ..metrics import REGISTRY, ROUTER_SHED, Labels, MetricsRegistry
+from ..units import key_fingerprint
+from .tenancy import DEFAULT_TENANT
+
+DEADLINE_HEADER = "x-request-deadline-ms"
+
+
+class AdmissionControl:
+    """Reject requests whose estimated limiter wait exceeds their deadline."""
+
+    def __init__(
+        self,
+        *,
+        max_wait_s: float,
+        default_keys: Tuple[str, ...],
+        queues: Optional[LimiterQueues] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        self.max_wait_s = max_wait_s
+        self.default_keys = default_keys  # fingerprints the default tenant's requests use
+        self.queues = queues or LIMITER_QUEUES
+        self.metrics = metrics or REGISTRY
+
+    def check(self, tenant: str, headers: Mapping[str, str], route: Labels = ()) -> None:
+        raw = headers.get(DEADLINE_HEADER)
+        deadline_s = int(raw) / 1000 if raw and raw.isdigit() else self.max_wait_s
+        if deadline_s <= 0 and not raw:
+            return
+        keys = self.default_keys if tenant == DEFAULT_TENANT else (tenant,)
+        wait = self.queues.estimate_wait(keys)
+        if wait <= deadline_s:
+            return
+        self.metrics.inc(ROUTER_SHED, route)
+        depth = self.queues.depth(keys)
+        retry_after = "3600" if math.isinf(wait) else str(max(1, math.ceil(wait - deadline_s)))
+        raise HTTPException(
+            status_code=503,
+            detail=f"Upstream queue is saturated: estimated wait {wait:.1f}s exceeds the {deadline_s:g}s deadline",
+            headers={"Retry-After": retry_after, "X-Queue-Depth": str(depth)},
+        )
+
+
+@lru_cache(maxsize=1)
+def get_admission_control() -> AdmissionControl:
+    s = get_settings()
+    if s.api_keys:
+        from ..key_pool import parse_keys
+
+        keys = tuple(key_fingerprint(spec.api_key) for spec in parse_keys(s.api_keys))
+    else:
+        keys = (key_fingerprint(s.api_key),)
+    return AdmissionControl(max_wait_s=s.admission_max_wait_s, default_keys=keys)
@@ -6,11 +6,13 @@ from fastapi import Header, HTTPException, status
 from backend.app.core.landing_page.ahrefs import AhrefsClient
 from backend.app.core.landing_page.ahrefs.config import get_client as get_default_client
 
+from .tenancy import tenant_client
+
 
 def get_client(authorization: Optional[str] = Header(None)) -> AhrefsClient:
     """
     Provide an AhrefsClient.
-    - If Authorization: Bearer <token> is provided, build a per-request client using that token.
+    - If Authorization: Bearer <token> is provided, use that token's client (cached per token).
     - Otherwise, return the default client configured from env via config.get_client().
     """
     if not authorization:
@@ -23,5 +25,5 @@ def get_client(authorization: Optional[str] = Header(None)) -> AhrefsClient:
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Empty bearer token")
 
-    # Use header-based auth by default for bearer tokens
-    return AhrefsClient(api_key=token, auth_in_header=True, api_key_header="Authorization", api_key_prefix="Bearer ")
+    # One client per token, reused across requests (see tenancy.py)
+    return tenant_client(token)
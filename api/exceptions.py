@@ -8,6 +8,7 @@ from backend.app.core.landing_page.ahrefs import (
     AhrefsAuthError,
     AhrefsRateLimitError,
 )
+from backend.app.core.landing_page.ahrefs.errors import AhrefsBudgetExceededError
 
 
 def register_exception_handlers(app: FastAPI) -> None:
@@ -31,6 +32,17 @@ def register_exception_handlers(app: FastAPI) -> None:
             },
         )
 
+    @app.exception_handler(AhrefsBudgetExceededError)
+    async def handle_budget_error(_: Request, exc: AhrefsBudgetExceededError):
+        return JSONResponse(
+            status_code=429,
+            content={
+                "error": "ahrefs_budget_exceeded",
+                "message": str(exc),
+                "details": {"estimate": exc.estimate, "used": exc.used, "limit": exc.limit},
+            },
+        )
+
     @app.exception_handler(AhrefsAPIError)
     async def handle_api_error(_: Request, exc: AhrefsAPIError):
         return JSONResponse(
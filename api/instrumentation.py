@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Coroutine
+
+from fastapi import HTTPException, Request, Response
+from fastapi.routing import APIRoute
+
+from ..metrics import (
+    REGISTRY,
+    ROUTER_IN_FLIGHT,
+    ROUTER_LATENCY,
+    ROUTER_REQUESTS,
+    status_class,
+)
+from .admission import get_admission_control
+from .tenancy import get_tenant_scheduler, tenant_of
+
+
+class InstrumentedRoute(APIRoute):
+    """
+    APIRoute that records request counts, status classes, latency and in-flight
+    requests for every route on the router, labelled by the route template.
+
+    Requests are first checked against the limiter queue (admission.py) and then
+    wait for their tenant's turn (tenancy.py); routes hidden from the schema,
+    like the metrics exposition, skip both. Routes that never wait for the rate
+    limiter themselves (`uses_limiter = False`, e.g. export jobs) skip the first.
+    """
+
+    uses_limiter = True
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        route = (("route", self.path_format),)
+        method = next(iter(sorted(self.methods or {"GET"})))
+        tenants = get_tenant_scheduler() if self.include_in_schema else None
+        admission = get_admission_control() if self.include_in_schema and self.uses_limiter else None
+
+        async def instrumented_handler(request: Request) -> Response:
+            REGISTRY.gauge_add(ROUTER_IN_FLIGHT, (), 1)
+            start = time.perf_counter()
+            status = "error"
+            try:
+                if tenants is None:
+                    response = await handler(request)
+                else:
+                    tenant = tenant_of(request.headers.get("authorization"))
+                    if admission is not None:
+                        admission.check(tenant, request.headers, route)
+                    async with tenants.slot(tenant):
+                        response = await handler(request)
+                status = status_class(response.status_code)
+                return response
+            except HTTPException as exc:
+                status = status_class(exc.status_code)
+                raise
+            except Exception as exc:
+                # Ahrefs errors carry the upstream status and are mapped by api/exceptions.py
+                status = status_class(getattr(exc, "status_code", None) or 500)
+                raise
+            finally:
+                REGISTRY.gauge_add(ROUTER_IN_FLIGHT, (), -1)
+                REGISTRY.observe(ROUTER_LATENCY, route, time.perf_counter() - start)
+                REGISTRY.inc(ROUTER_REQUESTS, route + (("method", method), ("status", status)))
+
+        return instrumented_handler
+
+
+class JobRoute(InstrumentedRoute):
+    """Route that only touches the job store: tenant fairness but no load shedding."""
+
+    uses_limiter = False
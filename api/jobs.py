@@ -0,0 +1,123 @@
+"""
+Export jobs on the `/ahrefs` router (see jobs.py).
+
+- `POST /ahrefs/jobs` queues an export of an offset-paginated operation (202)
+- `GET /ahrefs/jobs` lists the caller's jobs
+- `GET /ahrefs/jobs/{job_id}` reports status and progress (`rows` stored so far)
+- `GET /ahrefs/jobs/{job_id}/result` streams the rows as NDJSON once the job is done
+- `DELETE /ahrefs/jobs/{job_id}` cancels the job and deletes its rows
+
+Jobs belong to the tenant that submitted them (tenancy.py); other tenants get
+a 404. They run on the caller's client in the bulk lane, at most
+`AHREFS_JOBS_MAX_WORKERS` at once, and are kept in `AHREFS_JOBS_DB`. After a
+restart, jobs of the default tenant resume straight away and Bearer-token
+jobs resume on their owner's next call to these routes (tokens are never stored).
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Iterator, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import StreamingResponse
+
+from ..client import AhrefsClient
+from ..config import get_client as get_default_client
+from ..config import get_settings
+from ..jobs import DONE, Job, JobRunner, JobStore
+from ._requests import JobRequest
+from ._responses import GenericResponse
+from .deps import get_client
+from .instrumentation import JobRoute
+from .tenancy import DEFAULT_TENANT, tenant_of
+
+
+@lru_cache(maxsize=1)
+def get_job_runner() -> JobRunner:
+    s = get_settings()
+    runner = JobRunner(JobStore(s.jobs_db), max_workers=s.jobs_max_workers)
+    runner.recover(lambda tenant: get_default_client() if tenant == DEFAULT_TENANT else None)
+    return runner
+
+
+def _tenant(authorization: Optional[str] = Header(None)) -> str:
+    return tenant_of(authorization)
+
+
+def _owned(runner: JobRunner, job_id: str, tenant: str) -> Job:
+    job = runner.store.get(job_id)
+    if job is None or job.tenant != tenant:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+def submit_job(
+    payload: JobRequest,
+    tenant: str = Depends(_tenant),
+    client: AhrefsClient = Depends(get_client),
+    runner: JobRunner = Depends(get_job_runner),
+) -> GenericResponse:
+    """Queue an export; poll `GET /ahrefs/jobs/{id}` for progress."""
+    params = dict(payload.params)
+    if payload.fields:
+        params["fields"] = ",".join(payload.fields)
+    try:
+        job = runner.submit(client, tenant, payload.op, params, page_size=payload.page_size, max_rows=payload.max_rows)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=exc.args[0])
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return GenericResponse(ok=True, data=job.to_dict())
+
+
+def list_jobs(
+    tenant: str = Depends(_tenant),
+    client: AhrefsClient = Depends(get_client),
+    runner: JobRunner = Depends(get_job_runner),
+) -> GenericResponse:
+    """The caller's jobs, oldest first."""
+    runner.resume(tenant, client)
+    return GenericResponse(ok=True, data=[job.to_dict() for job in runner.store.list(tenant)])
+
+
+def job_status(
+    job_id: str,
+    tenant: str = Depends(_tenant),
+    client: AhrefsClient = Depends(get_client),
+    runner: JobRunner = Depends(get_job_runner),
+) -> GenericResponse:
+    """Status and progress of one job."""
+    job = _owned(runner, job_id, tenant)
+    runner.resume(tenant, client)
+    return GenericResponse(ok=True, data=job.to_dict())
+
+
+def job_result(job_id: str, tenant: str = Depends(_tenant), runner: JobRunner = Depends(get_job_runner)) -> StreamingResponse:
+    """The job's rows, one JSON document per line, streamed from the store."""
+    job = _owned(runner, job_id, tenant)
+    if job.status != DONE:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status}")
+
+    def lines() -> Iterator[str]:
+        for line in runner.store.iter_lines(job.id):
+            yield line + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson", headers={"X-Job-Rows": str(job.rows)})
+
+
+def delete_job(job_id: str, tenant: str = Depends(_tenant), runner: JobRunner = Depends(get_job_runner)) -> GenericResponse:
+    """Cancel the job if it is still running and delete it with its rows."""
+    job = _owned(runner, job_id, tenant)
+    runner.cancel(job.id)
+    runner.store.delete(job.id)
+    return GenericResponse(ok=True, data={"id": job.id, "deleted": True})
+
+
+def add_job_routes(router: APIRouter) -> None:
+    # Job routes only touch the store, so they are never shed by admission control
+    route = {"route_class_override": JobRoute}
+    router.add_api_route("/jobs", submit_job, methods=["POST"], response_model=GenericResponse, status_code=202, **route)
+    router.add_api_route("/jobs", list_jobs, methods=["GET"], response_model=GenericResponse, **route)
+    router.add_api_route("/jobs/{job_id}", job_status, methods=["GET"], response_model=GenericResponse, **route)
+    router.add_api_route("/jobs/{job_id}/result", job_result, methods=["GET"], response_class=StreamingResponse, **route)
+    router.add_api_route("/jobs/{job_id}", delete_job, methods=["DELETE"], response_model=GenericResponse, **route)
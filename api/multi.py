@@ -0,0 +1,172 @@
+"""
+`POST /ahrefs/multi`: several operations in one round trip.
+
+Operations are looked up by name in the endpoint table, validated with their
+route's request model and run concurrently through the regular handlers on a
+shared pool. Read-only (cacheable) operations go through `ResponseCache`:
+identical calls made while one is in flight wait for it (singleflight), and
+results are reused for `ttl_s`, across operations and across requests. Every
+operation gets its own result or error; with `deadline_ms`, operations still
+running when it expires are reported as `deadline_exceeded` and left to finish
+in the background, so their results land in the cache for the next call.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from pydantic import ValidationError
+
+from ..client import AhrefsClient
+from ..endpoints import EndpointSpec, get_spec
+from ..errors import AhrefsAPIError, AhrefsAuthError, AhrefsBudgetExceededError, AhrefsRateLimitError
+from ..metrics import REGISTRY
+from ..scheduler import INTERACTIVE, lane
+from ..units import key_fingerprint
+from . import _requests
+from ._requests import MultiOperation, MultiRequest
+from ._responses import GenericResponse
+from .handlers import HANDLERS
+
+MAX_OPERATIONS = 20
+
+CacheKey = Tuple[str, str, str]
+
+
+class ResponseCache:
+    """TTL + LRU cache of operation results with singleflight for in-flight calls."""
+
+    def __init__(self, *, ttl_s: float = 60.0, max_entries: int = 1024) -> None:
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[CacheKey, Tuple[float, Any]]" = OrderedDict()
+        self._in_flight: Dict[CacheKey, "Future[Any]"] = {}
+
+    def get_or_call(self, key: CacheKey, call: Callable[[], Any]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                REGISTRY.record_cache("multi", True)
+                return entry[1]
+            leader = self._in_flight.get(key)
+            if leader is None:
+                future: "Future[Any]" = Future()
+                self._in_flight[key] = future
+        if leader is not None:
+            REGISTRY.record_cache("multi", True)
+            return leader.result()
+        REGISTRY.record_cache("multi", False)
+        try:
+            value = call()
+        except BaseException as exc:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            del self._in_flight[key]
+            self._entries[key] = (time.monotonic() + self.ttl_s, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        future.set_result(value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+CACHE = ResponseCache()
+_POOL = ThreadPoolExecutor(max_workers=32, thread_name_prefix="ahrefs-multi")
+
+
+def _error(exc: BaseException) -> Dict[str, Any]:
+    """Per-operation error body, using the same codes as api/exceptions.py."""
+    if isinstance(exc, AhrefsAuthError):
+        code, status_code = "ahrefs_auth_error", exc.status_code or 401
+    elif isinstance(exc, (AhrefsRateLimitError, AhrefsBudgetExceededError)):
+        code = "ahrefs_budget_exceeded" if isinstance(exc, AhrefsBudgetExceededError) else "ahrefs_rate_limited"
+        status_code = 429
+    elif isinstance(exc, AhrefsAPIError):
+        code, status_code = "ahrefs_api_error", exc.status_code or 500
+    elif isinstance(exc, (ValidationError, TypeError)):
+        code, status_code = "invalid_payload", 422
+    elif isinstance(exc, KeyError):
+        code, status_code = "unknown_operation", 404
+    else:
+        code, status_code = "internal_error", 500
+    message = exc.args[0] if isinstance(exc, KeyError) and exc.args else str(exc)
+    return {"ok": False, "error": code, "message": message, "status_code": status_code}
+
+
+def _resolve(op: str) -> EndpointSpec:
+    spec = get_spec(op)
+    if not spec.model or spec.op not in HANDLERS:
+        raise KeyError(f"Operation {op!r} is not exposed by the router")
+    return spec
+
+
+def _call(spec: EndpointSpec, operation: MultiOperation, client: AhrefsClient, cache: ResponseCache) -> Any:
+    model = getattr(_requests, spec.model)(**operation.payload)
+    handler = HANDLERS[spec.op]
+    fields = ",".join(operation.fields) if operation.fields else None
+    with lane(INTERACTIVE):  # pool threads don't inherit the route's context
+        if not spec.cacheable:
+            return handler(model, client, fields)
+        request = json.dumps([model.model_dump(), fields], sort_keys=True, default=str)
+        return cache.get_or_call((key_fingerprint(client.api_key), spec.name, request), lambda: handler(model, client, fields))
+
+
+def run_operations(
+    client: AhrefsClient,
+    operations: List[MultiOperation],
+    *,
+    deadline_s: Optional[float] = None,
+    cache: Optional[ResponseCache] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Run `operations` concurrently; returns {id: {"ok": True, "data": ...} | error body}."""
+    cache = cache or CACHE
+    slots: List[Tuple[str, Any]] = []  # (id, future or finished result), in request order
+    seen: Dict[str, int] = {}
+    for operation in operations:
+        op_id = operation.id or operation.op
+        seen[op_id] = seen.get(op_id, 0) + 1
+        if seen[op_id] > 1:
+            op_id = f"{op_id}#{seen[op_id]}"
+        try:
+            spec = _resolve(operation.op)
+        except KeyError as exc:
+            slots.append((op_id, _error(exc)))
+            continue
+        slots.append((op_id, _POOL.submit(_call, spec, operation, client, cache)))
+
+    pending = [slot for _, slot in slots if isinstance(slot, Future)]
+    done, _ = wait_futures(pending, timeout=deadline_s)
+    results: Dict[str, Dict[str, Any]] = {}
+    for op_id, slot in slots:
+        if not isinstance(slot, Future):
+            results[op_id] = slot
+        elif slot not in done:
+            results[op_id] = {"ok": False, "error": "deadline_exceeded", "message": "Operation did not finish before the deadline", "status_code": 504}
+        else:
+            exc = slot.exception()
+            results[op_id] = _error(exc) if exc is not None else {"ok": True, "data": slot.result()}
+    return results
+
+
+def multi(*, payload: MultiRequest, client: AhrefsClient) -> GenericResponse:
+    """Run several operations concurrently; `data` maps each operation id to its result or error."""
+    if len(payload.operations) > MAX_OPERATIONS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_OPERATIONS} operations per request")
+    deadline_s = payload.deadline_ms / 1000 if payload.deadline_ms is not None else None
+    results = run_operations(client, payload.operations, deadline_s=deadline_s)
+    return GenericResponse(ok=all(r["ok"] for r in results.values()), data=results)
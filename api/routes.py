@@ -1,314 +1,130 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+import inspect
+from typing import Any, Callable, Iterable, Optional
 
-from backend.app.core.landing_page.ahrefs import AhrefsClient
-from .deps import get_client
-from ._requests import (
-    DomainMetricsRequest,
-    BacklinksRequest,
-    ReferringDomainsRequest,
-    OrganicKeywordsRequest,
-    PagesRequest,
-    DomainRatingRequest,
-    BacklinksStatsRequest,
-    OutlinksStatsRequest,
-    MetricsRequest,
-    RefdomainsHistoryRequest,
-    DomainRatingHistoryRequest,
-    UrlRatingHistoryRequest,
-    PagesHistoryRequest,
-    MetricsHistoryRequest,
-    KeywordsHistoryRequest,
-    MetricsByCountryRequest,
-    PagesByTrafficRequest,
-    TotalSearchVolumeHistoryRequest,
-    # New groups
-    OverviewRequest,
-    CompetitorsOverviewRequest,
-    CompetitorsPagesRequest,
-    SerpOverviewRequest,
-    BatchAnalysisRequest,
-    LimitsAndUsageRequest,
-    # Management
-    ProjectsRequest,
-    CreateProjectRequest,
-    KeywordsGetRequest,
-    KeywordsPutRequest,
-    KeywordsDeleteRequest,
-    CompetitorsGetRequest,
-    CompetitorsAddRequest,
-    CompetitorsDeleteRequest,
-    LocationsAndLanguagesRequest,
-    KeywordListsRequest,
-    CrawlerIpAddressesRequest,
-    CrawlerIpRangesRequest,
-)
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from ..batcher import BATCHABLE_ENDPOINTS
+from ..client import AhrefsClient
+from ..config import get_settings
+from ..endpoints import ENDPOINTS, EndpointSpec
+from ..metrics import CONTENT_TYPE, REGISTRY
+from ..scheduler import INTERACTIVE, lane
+from . import _requests
 from ._responses import GenericResponse
-from .handlers import (
-    handle_domain_metrics,
-    handle_backlinks,
-    handle_referring_domains,
-    handle_organic_keywords,
-    handle_pages,
-    handle_domain_rating,
-    handle_backlinks_stats,
-    handle_outlinks_stats,
-    handle_metrics,
-    handle_refdomains_history,
-    handle_domain_rating_history,
-    handle_url_rating_history,
-    handle_pages_history,
-    handle_metrics_history,
-    handle_keywords_history,
-    handle_metrics_by_country,
-    handle_pages_by_traffic,
-    handle_total_search_volume_history,
-    # New group handlers
-    handle_overview,
-    handle_competitors_overview,
-    handle_competitors_pages,
-    handle_serp_overview,
-    handle_batch_analysis,
-    handle_limits_and_usage,
-    # Management
-    handle_projects,
-    handle_create_project,
-    handle_keywords_get,
-    handle_keywords_put,
-    handle_keywords_delete,
-    handle_competitors_get,
-    handle_competitors_add,
-    handle_competitors_delete,
-    handle_locations_and_languages,
-    handle_keyword_lists,
-    handle_crawler_ip_addresses,
-    handle_crawler_ip_ranges,
-)
-
-router = APIRouter(prefix="/ahrefs", tags=["ahrefs"])
-
-
-@router.post("/domain/metrics", response_model=GenericResponse)
-async def domain_metrics(payload: DomainMetricsRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_domain_metrics(payload, client))
-
-
-@router.post("/backlinks", response_model=GenericResponse)
-async def backlinks(payload: BacklinksRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_backlinks(payload, client))
-
-
-@router.post("/referring-domains", response_model=GenericResponse)
-async def referring_domains(payload: ReferringDomainsRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_referring_domains(payload, client))
-
-
-@router.post("/organic-keywords", response_model=GenericResponse)
-async def organic_keywords(payload: OrganicKeywordsRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_organic_keywords(payload, client))
-
-
-@router.post("/pages", response_model=GenericResponse)
-async def pages(payload: PagesRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_pages(payload, client))
-
-
-# ----------------------------------
-# Site Explorer operation routes
-# ----------------------------------
-@router.post("/site-explorer/domain-rating", response_model=GenericResponse)
-async def domain_rating(payload: DomainRatingRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_domain_rating(payload, client))
-
-
-@router.post("/site-explorer/backlinks-stats", response_model=GenericResponse)
-async def backlinks_stats(payload: BacklinksStatsRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_backlinks_stats(payload, client))
-
-
-@router.post("/site-explorer/outlinks-stats", response_model=GenericResponse)
-async def outlinks_stats(payload: OutlinksStatsRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_outlinks_stats(payload, client))
-
-
-@router.post("/site-explorer/metrics", response_model=GenericResponse)
-async def metrics(payload: MetricsRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_metrics(payload, client))
-
-
-@router.post("/site-explorer/refdomains-history", response_model=GenericResponse)
-async def refdomains_history(payload: RefdomainsHistoryRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_refdomains_history(payload, client))
-
-
-@router.post("/site-explorer/domain-rating-history", response_model=GenericResponse)
-async def domain_rating_history(payload: DomainRatingHistoryRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_domain_rating_history(payload, client))
-
-
-@router.post("/site-explorer/url-rating-history", response_model=GenericResponse)
-async def url_rating_history(payload: UrlRatingHistoryRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_url_rating_history(payload, client))
-
-
-@router.post("/site-explorer/pages-history", response_model=GenericResponse)
-async def pages_history(payload: PagesHistoryRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_pages_history(payload, client))
-
-
-@router.post("/site-explorer/metrics-history", response_model=GenericResponse)
-async def metrics_history(payload: MetricsHistoryRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_metrics_history(payload, client))
-
-
-@router.post("/site-explorer/keywords-history", response_model=GenericResponse)
-async def keywords_history(payload: KeywordsHistoryRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_keywords_history(payload, client))
-
-
-@router.post("/site-explorer/metrics-by-country", response_model=GenericResponse)
-async def metrics_by_country(payload: MetricsByCountryRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_metrics_by_country(payload, client))
-
-
-@router.post("/site-explorer/pages-by-traffic", response_model=GenericResponse)
-async def pages_by_traffic(payload: PagesByTrafficRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_pages_by_traffic(payload, client))
-
-
-@router.post("/site-explorer/total-search-volume-history", response_model=GenericResponse)
-async def total_search_volume_history(payload: TotalSearchVolumeHistoryRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_total_search_volume_history(payload, client))
-
-
-# ----------------------------------
-# Overview group (GET)
-# ----------------------------------
-@router.get("/overview/overview", response_model=GenericResponse)
-async def overview(target: str, client: AhrefsClient = Depends(get_client)):
-    payload = OverviewRequest(target=target)
-    return GenericResponse(ok=True, data=handle_overview(payload, client))
-
-
-@router.get("/overview/competitors-overview", response_model=GenericResponse)
-async def competitors_overview(target: str, client: AhrefsClient = Depends(get_client)):
-    payload = CompetitorsOverviewRequest(target=target)
-    return GenericResponse(ok=True, data=handle_competitors_overview(payload, client))
-
-
-@router.get("/overview/competitors-pages", response_model=GenericResponse)
-async def competitors_pages(target: str, limit: int = 100, offset: int = 0, client: AhrefsClient = Depends(get_client)):
-    payload = CompetitorsPagesRequest(target=target, limit=limit, offset=offset)
-    return GenericResponse(ok=True, data=handle_competitors_pages(payload, client))
-
-
-# ----------------------------------
-# SERP Overview (GET)
-# ----------------------------------
-@router.get("/serp/overview", response_model=GenericResponse)
-async def serp_overview(query: str, client: AhrefsClient = Depends(get_client)):
-    payload = SerpOverviewRequest(query=query)
-    return GenericResponse(ok=True, data=handle_serp_overview(payload, client))
-
-
-# ----------------------------------
-# Batch Analysis (POST)
-# ----------------------------------
-@router.post("/batch-analysis", response_model=GenericResponse)
-async def batch_analysis(payload: BatchAnalysisRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_batch_analysis(payload, client))
-
+from .deps import get_client
+from .handlers import HANDLERS, Handler, make_batched_handler
+from .instrumentation import InstrumentedRoute
+from .jobs import add_job_routes
 
 # ----------------------------------
-# Subscription Information (GET)
+# Endpoint routes, generated from endpoints.ENDPOINTS
 # ----------------------------------
-@router.get("/subscription/limits-and-usage", response_model=GenericResponse)
-async def limits_and_usage(client: AhrefsClient = Depends(get_client)):
-    payload = LimitsAndUsageRequest()
-    return GenericResponse(ok=True, data=handle_limits_and_usage(payload, client))
+# Endpoints are plain `def` so FastAPI runs the blocking client call in its
+# threadpool instead of on the event loop. Router calls serve users, so they
+# use the interactive lane when the client has priority lanes (scheduler.py).
+_KW = inspect.Parameter.KEYWORD_ONLY
 
 
-# ----------------------------------
-# Management: Projects
-# ----------------------------------
-@router.get("/management/projects", response_model=GenericResponse)
-async def projects(client: AhrefsClient = Depends(get_client)):
-    payload = ProjectsRequest()
-    return GenericResponse(ok=True, data=handle_projects(payload, client))
+def _client_param() -> inspect.Parameter:
+    return inspect.Parameter("client", _KW, default=Depends(get_client), annotation=AhrefsClient)
 
 
-@router.post("/management/projects", response_model=GenericResponse)
-async def create_project(payload: CreateProjectRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_create_project(payload, client))
+def _fields_param() -> inspect.Parameter:
+    # `?fields=a,b` keeps only those fields of the response (see projection.py)
+    return inspect.Parameter("fields", _KW, default=None, annotation=Optional[str])
 
 
-# ----------------------------------
-# Management: Keywords
-# ----------------------------------
-@router.get("/management/keywords", response_model=GenericResponse)
-async def keywords_get(project_id: str, client: AhrefsClient = Depends(get_client)):
-    payload = KeywordsGetRequest(project_id=project_id)
-    return GenericResponse(ok=True, data=handle_keywords_get(payload, client))
+def _make_endpoint(spec: EndpointSpec, handler: Optional[Handler] = None) -> Callable[..., GenericResponse]:
+    model = getattr(_requests, spec.model)
+    handler = handler or HANDLERS[spec.op]
+    verb, _ = spec.route.split(" ", 1)
 
+    if verb == "GET":
+        # GET routes take the request model's fields (except `extra`) as query params
+        fields = {name: field for name, field in model.model_fields.items() if name != "extra"}
 
-@router.put("/management/keywords", response_model=GenericResponse)
-async def keywords_put(payload: KeywordsPutRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_keywords_put(payload, client))
+        def endpoint(*, client: AhrefsClient, fields: Optional[str] = None, **query: Any) -> GenericResponse:
+            with lane(INTERACTIVE):
+                return GenericResponse(ok=True, data=handler(model(**query), client, fields))
 
+        params = [
+            inspect.Parameter(
+                name,
+                _KW,
+                default=inspect.Parameter.empty if field.is_required() else field.default,
+                annotation=field.annotation,
+            )
+            for name, field in fields.items()
+        ]
+    else:
 
-@router.put("/management/keywords/delete", response_model=GenericResponse)
-async def keywords_delete(payload: KeywordsDeleteRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_keywords_delete(payload, client))
+        def endpoint(*, payload: Any, client: AhrefsClient, fields: Optional[str] = None) -> GenericResponse:
+            with lane(INTERACTIVE):
+                return GenericResponse(ok=True, data=handler(payload, client, fields))
 
+        params = [inspect.Parameter("payload", _KW, annotation=model)]
 
-# ----------------------------------
-# Management: Competitors
-# ----------------------------------
-@router.get("/management/competitors", response_model=GenericResponse)
-async def competitors_get(project_id: str, client: AhrefsClient = Depends(get_client)):
-    payload = CompetitorsGetRequest(project_id=project_id)
-    return GenericResponse(ok=True, data=handle_competitors_get(payload, client))
+    endpoint.__name__ = endpoint.__qualname__ = spec.op
+    endpoint.__doc__ = f"Proxy for `{spec.method} {spec.path}` (AhrefsClient.{spec.name})."
+    endpoint.__signature__ = inspect.Signature(params + [_fields_param(), _client_param()])  # type: ignore[attr-defined]
+    return endpoint
 
 
-@router.post("/management/competitors", response_model=GenericResponse)
-async def competitors_add(payload: CompetitorsAddRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_competitors_add(payload, client))
+async def _metrics_exposition() -> PlainTextResponse:
+    """Prometheus text exposition of the process-wide registry."""
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
 
 
-@router.post("/management/competitors/delete", response_model=GenericResponse)
-async def competitors_delete(payload: CompetitorsDeleteRequest, client: AhrefsClient = Depends(get_client)):
-    return GenericResponse(ok=True, data=handle_competitors_delete(payload, client))
+def _multi_endpoint() -> Callable[..., GenericResponse]:
+    from .multi import multi
 
+    def endpoint(*, payload: _requests.MultiRequest, client: AhrefsClient) -> GenericResponse:
+        return multi(payload=payload, client=client)
 
-# ----------------------------------
-# Management: Locations and languages
-# ----------------------------------
-@router.get("/management/locations-and-languages", response_model=GenericResponse)
-async def locations_and_languages(client: AhrefsClient = Depends(get_client)):
-    payload = LocationsAndLanguagesRequest()
-    return GenericResponse(ok=True, data=handle_locations_and_languages(payload, client))
+    endpoint.__name__ = endpoint.__qualname__ = "multi"
+    endpoint.__doc__ = multi.__doc__
+    endpoint.__signature__ = inspect.Signature(  # type: ignore[attr-defined]
+        [inspect.Parameter("payload", _KW, annotation=_requests.MultiRequest), _client_param()]
+    )
+    return endpoint
 
 
-# ----------------------------------
-# Management: Keyword lists
-# ----------------------------------
-@router.get("/management/keyword-lists", response_model=GenericResponse)
-async def keyword_lists(project_id: str | None = None, client: AhrefsClient = Depends(get_client)):
-    payload = KeywordListsRequest(project_id=project_id)
-    return GenericResponse(ok=True, data=handle_keyword_lists(payload, client))
+def route_group(spec: EndpointSpec) -> str:
+    """Group of a routed spec: the first segment of its route path ("site-explorer", "management", ...)."""
+    return spec.route.split(" ", 1)[1].lstrip("/").split("/", 1)[0]
 
 
-# ----------------------------------
-# Public: Crawler
-# ----------------------------------
-@router.get("/public/crawler-ip-addresses", response_model=GenericResponse)
-async def crawler_ip_addresses(client: AhrefsClient = Depends(get_client)):
-    payload = CrawlerIpAddressesRequest()
-    return GenericResponse(ok=True, data=handle_crawler_ip_addresses(payload, client))
+def build_router(groups: Optional[Iterable[str]] = None, *, microbatch_window_ms: Optional[float] = None) -> APIRouter:
+    """
+    Router with the `/ahrefs` routes, optionally limited to some route groups so
+    short-lived processes only pay for the endpoints they serve.
+
+    With a positive `microbatch_window_ms` (default: `AHREFS_MICROBATCH_WINDOW_MS`)
+    single-domain metric routes are served through batch-analysis micro-batches.
+    """
+    wanted = set(groups) if groups is not None else None
+    settings = get_settings()
+    window_ms = settings.microbatch_window_ms if microbatch_window_ms is None else microbatch_window_ms
+    router = APIRouter(prefix="/ahrefs", tags=["ahrefs"], route_class=InstrumentedRoute)
+    router.add_api_route("/metrics", _metrics_exposition, methods=["GET"], response_class=PlainTextResponse, include_in_schema=False)
+    router.add_api_route("/multi", _multi_endpoint(), methods=["POST"], response_model=GenericResponse)
+    add_job_routes(router)
+    for spec in ENDPOINTS:
+        if spec.route and (wanted is None or route_group(spec) in wanted):
+            verb, path = spec.route.split(" ", 1)
+            handler = None
+            if window_ms > 0 and spec.name in BATCHABLE_ENDPOINTS:
+                handler = make_batched_handler(spec, window_s=window_ms / 1000, max_items=settings.microbatch_max_items)
+            router.add_api_route(path, _make_endpoint(spec, handler), methods=[verb], response_model=GenericResponse)
+    return router
 
 
-@router.get("/public/crawler-ip-ranges", response_model=GenericResponse)
-async def crawler_ip_ranges(client: AhrefsClient = Depends(get_client)):
-    payload = CrawlerIpRangesRequest()
-    return GenericResponse(ok=True, data=handle_crawler_ip_ranges(payload, client))
+def __getattr__(name: str) -> Any:
+    # The full router is built on first access (`from .routes import router`)
+    if name == "router":
+        router = globals()["router"] = build_router()
+        return router
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,248 @@
+"""
+Per-tenant fair queuing for the `/ahrefs` router.
+
+A tenant is the hash of the caller's Bearer token (`units.key_fingerprint`);
+callers without one share the "default" tenant, which uses the service's own
+key. `TenantScheduler` admits at most `max_concurrent` requests to the
+threadpool at once and picks the next waiting request by deficit round-robin
+across tenants, so a tenant with hundreds of queued requests gets the same
+share as one with a single request. Waiting happens on the event loop, so a
+queued request holds no worker thread.
+
+Each token tenant is also capped at `tenant_concurrency` requests in flight
+and, optionally, `tenant_rate_per_min` requests per minute (over the cap:
+429 with `Retry-After`). The default tenant is only bound by `max_concurrent`.
+Clients for token tenants are kept in a small LRU (`tenant_client`) so their
+sessions, connection pools and rate limiters survive between requests.
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from fastapi import HTTPException
+
+from ..client import AhrefsClient
+from ..config import get_settings
+from ..metrics import (
+    REGISTRY,
+    TENANT_IN_FLIGHT,
+    TENANT_QUEUE_WAIT,
+    TENANT_REJECTED,
+    TENANT_REQUESTS,
+    MetricsRegistry,
+)
+from ..units import key_fingerprint
+
+DEFAULT_TENANT = "default"
+
+
+def tenant_of(authorization: Optional[str]) -> str:
+    """Tenant id for an Authorization header value: the token's fingerprint, or "default"."""
+    if not authorization:
+        return DEFAULT_TENANT
+    parts = authorization.split()
+    if len(parts) != 2 or parts[0].lower() != "bearer" or not parts[1]:
+        return DEFAULT_TENANT  # deps.get_client rejects it with a 401
+    return key_fingerprint(parts[1])
+
+
+class _Waiter:
+    __slots__ = ("future", "loop", "cost")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, cost: float) -> None:
+        self.loop = loop
+        self.future: "asyncio.Future[None]" = loop.create_future()
+        self.cost = cost
+
+    def grant(self) -> None:
+        self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class _Tenant:
+    __slots__ = ("id", "labels", "waiters", "deficit", "active", "queued", "tokens", "refilled")
+
+    def __init__(self, tenant_id: str, rate_per_min: Optional[int]) -> None:
+        self.id = tenant_id
+        self.labels = (("tenant", tenant_id),)
+        self.waiters: Deque[_Waiter] = deque()
+        self.deficit = 0.0
+        self.active = 0
+        self.queued = False  # in the round-robin ring
+        self.tokens = float(rate_per_min or 0)
+        self.refilled = time.monotonic()
+
+
+class TenantScheduler:
+    """Deficit round-robin admission across tenants, with per-tenant concurrency and rate caps."""
+
+    def __init__(
+        self,
+        *,
+        max_concurrent: int = 32,
+        tenant_concurrency: int = 8,
+        tenant_rate_per_min: Optional[int] = None,
+        quantum: float = 1.0,
+        max_tenants: int = 1024,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        self.max_concurrent = max(max_concurrent, 1)
+        self.tenant_concurrency = max(tenant_concurrency, 1)
+        self.tenant_rate_per_min = tenant_rate_per_min or None
+        self.quantum = quantum
+        self.max_tenants = max_tenants
+        self.metrics = metrics or REGISTRY
+        self._lock = threading.Lock()
+        self._tenants: "OrderedDict[str, _Tenant]" = OrderedDict()
+        self._ring: Deque[_Tenant] = deque()
+        self._in_use = 0
+
+    @asynccontextmanager
+    async def slot(self, tenant_id: str, cost: float = 1.0) -> AsyncIterator[None]:
+        """Hold one of the router's slots for `tenant_id` while the block runs."""
+        tenant = await self.acquire(tenant_id, cost)
+        try:
+            yield
+        finally:
+            self.release(tenant)
+
+    async def acquire(self, tenant_id: str, cost: float = 1.0) -> _Tenant:
+        start = time.perf_counter()
+        waiter = _Waiter(asyncio.get_running_loop(), cost)
+        with self._lock:
+            tenant = self._tenant(tenant_id)
+            self._take_rate_token(tenant)
+            tenant.waiters.append(waiter)
+            if not tenant.queued:
+                tenant.queued = True
+                self._ring.append(tenant)
+            self._dispatch()
+        try:
+            await waiter.future
+        except BaseException:  # cancelled or interrupted
+            with self._lock:
+                if waiter in tenant.waiters:
+                    tenant.waiters.remove(waiter)
+                    waiter = None  # type: ignore[assignment]
+            if waiter is not None:  # granted while being cancelled: give the slot back
+                self.release(tenant)
+            raise
+        self.metrics.observe(TENANT_QUEUE_WAIT, tenant.labels, time.perf_counter() - start)
+        self.metrics.inc(TENANT_REQUESTS, tenant.labels)
+        self.metrics.gauge_add(TENANT_IN_FLIGHT, tenant.labels, 1)
+        return tenant
+
+    def release(self, tenant: _Tenant) -> None:
+        self.metrics.gauge_add(TENANT_IN_FLIGHT, tenant.labels, -1)
+        with self._lock:
+            tenant.active -= 1
+            self._in_use -= 1
+            self._dispatch()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Waiting and running requests per known tenant."""
+        with self._lock:
+            return {t.id: {"queued": len(t.waiters), "active": t.active} for t in self._tenants.values()}
+
+    def _tenant(self, tenant_id: str) -> _Tenant:
+        tenant = self._tenants.get(tenant_id)
+        if tenant is None:
+            rate = None if tenant_id == DEFAULT_TENANT else self.tenant_rate_per_min
+            tenant = self._tenants[tenant_id] = _Tenant(tenant_id, rate)
+            if len(self._tenants) > self.max_tenants:
+                # forget the least recently seen idle tenant
+                for old_id, old in self._tenants.items():
+                    if not old.active and not old.waiters:
+                        del self._tenants[old_id]
+                        break
+        else:
+            self._tenants.move_to_end(tenant_id)
+        return tenant
+
+    def _take_rate_token(self, tenant: _Tenant) -> None:
+        rate = self.tenant_rate_per_min
+        if rate is None or tenant.id == DEFAULT_TENANT:
+            return
+        now = time.monotonic()
+        tenant.tokens = min(rate, tenant.tokens + (now - tenant.refilled) * rate / 60.0)
+        tenant.refilled = now
+        if tenant.tokens < 1:
+            retry_after = math.ceil((1 - tenant.tokens) * 60.0 / rate)
+            self.metrics.inc(TENANT_REJECTED, tenant.labels + (("reason", "rate"),))
+            raise HTTPException(status_code=429, detail="Tenant request rate exceeded", headers={"Retry-After": str(retry_after)})
+        tenant.tokens -= 1
+
+    def _cap(self, tenant: _Tenant) -> int:
+        return self.max_concurrent if tenant.id == DEFAULT_TENANT else self.tenant_concurrency
+
+    def _dispatch(self) -> None:
+        # Called with the lock held. Deficit round-robin: the tenant at the head of
+        # the ring is served while its deficit covers its next request, then earns
+        # `quantum` and moves to the back.
+        ring = self._ring
+        idle = 0  # consecutive tenants skipped for being at their concurrency cap
+        while self._in_use < self.max_concurrent and ring and idle < len(ring):
+            tenant = ring[0]
+            if not tenant.waiters:
+                ring.popleft()
+                tenant.queued, tenant.deficit = False, 0.0
+                idle = 0
+                continue
+            if tenant.active >= self._cap(tenant):
+                ring.rotate(-1)
+                idle += 1
+                continue
+            head = tenant.waiters[0]
+            if tenant.deficit >= head.cost:
+                tenant.waiters.popleft()
+                tenant.deficit -= head.cost
+                tenant.active += 1
+                self._in_use += 1
+                head.grant()
+            else:
+                tenant.deficit += self.quantum
+                ring.rotate(-1)
+            idle = 0
+
+
+@lru_cache(maxsize=1)
+def get_tenant_scheduler() -> TenantScheduler:
+    s = get_settings()
+    return TenantScheduler(
+        max_concurrent=s.router_max_concurrency,
+        tenant_concurrency=s.tenant_max_concurrency,
+        tenant_rate_per_min=s.tenant_rate_per_min,
+    )
+
+
+_CLIENTS: "OrderedDict[str, AhrefsClient]" = OrderedDict()
+_CLIENTS_LOCK = threading.Lock()
+MAX_TENANT_CLIENTS = 256
+
+
+def tenant_client(token: str) -> AhrefsClient:
+    """Client for a Bearer token, reused across requests (LRU of `MAX_TENANT_CLIENTS`)."""
+    tenant_id = key_fingerprint(token)
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(tenant_id)
+        if client is not None and client.api_key == token:
+            _CLIENTS.move_to_end(tenant_id)
+            return client
+    # Use header-based auth by default for bearer tokens
+    client = AhrefsClient(api_key=token, auth_in_header=True, api_key_header="Authorization", api_key_prefix="Bearer ")
+    with _CLIENTS_LOCK:
+        _CLIENTS[tenant_id] = client
+        while len(_CLIENTS) > MAX_TENANT_CLIENTS:
+            _CLIENTS.popitem(last=False)
+    return client
@@ -0,0 +1,195 @@
+"""
+Chunked, concurrent `post_batch_analysis`.
+
+Targets are canonicalised (trimmed, lower-cased scheme and host, bare trailing
+slash dropped) and de-duplicated, split into upstream-sized chunks and sent on
+a small thread pool; every chunk still goes through the client's rate limiter
+and budget guard. Results are merged back into input order, duplicates sharing
+one result. Chunks that fail with a retryable error (429, 5xx, connection
+errors) are retried on their own; the chunks that succeeded are not re-sent.
+
+A list that fits in one chunk and has no duplicates is sent as a single request;
+its response (or error) is returned unchanged.
+"""
+from __future__ import annotations
+
+import contextvars
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from .endpoints import extract_rows
+from .errors import AhrefsAPIError, AhrefsAuthError, AhrefsBatchError, AhrefsRateLimitError
+
+# Largest number of targets sent in one batch-analysis request
+DEFAULT_CHUNK_SIZE = 100
+DEFAULT_MAX_WORKERS = 4
+
+SendChunk = Callable[[List[Any]], Dict[str, Any]]
+
+
+def canonical_target(item: Any) -> Any:
+    """Normalise a target string so spelling variants of one target collapse; other values pass through."""
+    if not isinstance(item, str):
+        return item
+    text = item.strip()
+    scheme, sep, rest = text.partition("://")
+    if not sep:
+        scheme, rest = "", text
+    host, slash, path = rest.partition("/")
+    host = host.lower().rstrip(".")
+    if not path:
+        slash = ""
+    return f"{scheme.lower()}{sep}{host}{slash}{path}"
+
+
+def _key(item: Any) -> Hashable:
+    if isinstance(item, (dict, list)):
+        return json.dumps(item, sort_keys=True, separators=(",", ":"))
+    return item
+
+
+def plan(items: Sequence[Any], chunk_size: int) -> Tuple[List[Any], List[int], List[List[Any]]]:
+    """(unique canonical targets, input position -> unique index, chunks of unique targets)."""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+    unique: List[Any] = []
+    index: Dict[Hashable, int] = {}
+    positions: List[int] = []
+    for item in items:
+        canonical = canonical_target(item)
+        key = _key(canonical)
+        slot = index.get(key)
+        if slot is None:
+            slot = index[key] = len(unique)
+            unique.append(canonical)
+        positions.append(slot)
+    chunks = [unique[i : i + chunk_size] for i in range(0, len(unique), chunk_size)]
+    return unique, positions, chunks
+
+
+def _retryable(exc: BaseException) -> bool:
+    if isinstance(exc, AhrefsAuthError):
+        return False
+    if isinstance(exc, AhrefsRateLimitError):
+        return True
+    if isinstance(exc, AhrefsAPIError):
+        return exc.status_code is None or exc.status_code >= 500
+    return isinstance(exc, OSError)  # requests' ConnectionError / Timeout derive from it
+
+
+def _rows_key(payload: Dict[str, Any]) -> Optional[str]:
+    if isinstance(payload.get("targets"), list):
+        return "targets"
+    lists = [k for k, v in payload.items() if isinstance(v, list)]
+    return max(lists, key=lambda k: len(payload[k])) if lists else None
+
+
+def match_results(chunk: List[Any], payload: Dict[str, Any]) -> List[Any]:
+    """Result row for each target of `chunk`, in chunk order (None where upstream returned nothing)."""
+    rows = extract_rows(payload)
+    if rows and all(isinstance(r, dict) and isinstance(r.get("index"), int) for r in rows):
+        out: List[Any] = [None] * len(chunk)
+        for row in rows:
+            if 0 <= row["index"] < len(chunk):
+                out[row["index"]] = row
+        return out
+    by_target = {}
+    for row in rows:
+        if isinstance(row, dict):
+            label = row.get("target", row.get("url"))
+            if label is not None:
+                by_target[_key(canonical_target(label))] = row
+    if by_target:
+        # labels win over position: reordered, dropped or repeated rows land on the right target
+        return [by_target.get(_key(t)) for t in chunk]
+    if len(rows) == len(chunk):
+        return list(rows)
+    return [None] * len(chunk)
+
+
+def run(
+    send: SendChunk,
+    items: Sequence[Any],
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    chunk_retries: int = 2,
+    retry_backoff_s: float = 0.5,
+) -> Dict[str, Any]:
+    """Send `items` through `send(chunk)` in chunks and merge the responses into input order."""
+    unique, positions, chunks = plan(items, chunk_size)
+    single = len(chunks) <= 1 and len(unique) == len(positions)
+
+    def attempt(i: int) -> Tuple[int, Optional[Dict[str, Any]], Optional[Exception]]:
+        try:
+            return i, send(chunks[i]), None
+        except Exception as exc:
+            return i, None, exc
+
+    responses: Dict[int, Dict[str, Any]] = {}
+    errors: Dict[int, Exception] = {}
+    pending = list(range(len(chunks)))
+    # pool threads don't inherit the caller's context: run each chunk in a copy so
+    # its unit tag and priority lane still apply
+    ctx = contextvars.copy_context()
+
+    def attempt_in_context(i: int) -> Tuple[int, Optional[Dict[str, Any]], Optional[Exception]]:
+        return ctx.copy().run(attempt, i)
+
+    # one chunk runs on the calling thread; a pool is only worth it for several
+    pool = ThreadPoolExecutor(max_workers=min(max_workers, len(chunks)), thread_name_prefix="ahrefs-batch") if len(chunks) > 1 and max_workers > 1 else None
+    try:
+        for round_ in range(chunk_retries + 1):
+            if round_:
+                time.sleep(retry_backoff_s * 2 ** (round_ - 1))
+            outcomes = pool.map(attempt_in_context, pending) if pool is not None else map(attempt, pending)
+            pending = []
+            for i, payload, exc in outcomes:
+                if exc is None:
+                    responses[i] = payload  # type: ignore[assignment]
+                    errors.pop(i, None)
+                else:
+                    errors[i] = exc
+                    if _retryable(exc):
+                        pending.append(i)
+            if not pending:
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    if single:
+        if not chunks:
+            return send([])
+        if errors:
+            raise errors[0]
+        return responses[0]
+
+    results: List[Any] = [None] * len(unique)
+    merged: Dict[str, Any] = {}
+    key: Optional[str] = None
+    for i, chunk in enumerate(chunks):
+        payload = responses.get(i)
+        if payload is None:
+            continue
+        if key is None:
+            # top-level fields other than the result list come from the first response
+            key = _rows_key(payload) or "targets"
+            merged = {k: v for k, v in payload.items() if k != key}
+        start = i * chunk_size
+        results[start : start + len(chunk)] = match_results(chunk, payload)
+    merged[key or "targets"] = [results[slot] for slot in positions]
+
+    if errors:
+        failed = [t for i in sorted(errors) for t in chunks[i]]
+        first = errors[min(errors)]
+        raise AhrefsBatchError(
+            f"{len(errors)} of {len(chunks)} batch-analysis chunks failed: {first}",
+            status_code=getattr(first, "status_code", None) or 502,
+            payload=merged,
+            failed_items=failed,
+            errors=[errors[i] for i in sorted(errors)],
+        ) from first
+    return merged
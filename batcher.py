@@ -0,0 +1,155 @@
+"""
+Micro-batching of single-target lookups into `post_batch_analysis` calls.
+
+Concurrent callers asking for metrics of different domains each cost an
+upstream request. A `MicroBatcher` holds lookups for at most `window_s` (or
+until `max_items` distinct targets are waiting), sends them as one batch-analysis
+call and hands every caller the row for its own target. Callers asking for the
+same target in one window share a row. The cost is at most one window of extra
+latency per lookup.
+
+    batcher = MicroBatcher(client, window_s=0.01, max_items=50)
+    row = batcher.lookup("example.com")  # {"target": "example.com", "domain_rating": ..., ...}
+
+Batches are sent from the batcher's own threads, so `units.tagged()` tags of the
+callers do not apply to them.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .batch_analysis import canonical_target, match_results
+from .errors import AhrefsAPIError, AhrefsBatchError
+from .metrics import BATCHER_FLUSHES, BATCHER_LOOKUPS, BATCHER_WAIT, REGISTRY, MetricsRegistry
+from .units import key_fingerprint
+
+# Client methods whose single-target result can be served from a batch-analysis row
+BATCHABLE_ENDPOINTS = ("get_domain_metrics", "get_domain_rating")
+
+_Waiter = Tuple["Future[Dict[str, Any]]", float]
+
+
+class MicroBatcher:
+    """Collects single-target lookups and sends them as one batch-analysis call per window."""
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        window_s: float = 0.01,
+        max_items: int = 50,
+        max_in_flight: int = 4,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        if window_s < 0 or max_items < 1:
+            raise ValueError("window_s must be >= 0 and max_items >= 1")
+        self.client = client
+        self.window_s = window_s
+        self.max_items = max_items
+        self.metrics = metrics or REGISTRY
+        self._cond = threading.Condition()
+        self._pending: Dict[Any, List[_Waiter]] = {}
+        self._first_at = 0.0
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self._senders = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="ahrefs-microbatch")
+
+    def submit(self, target: str) -> "Future[Dict[str, Any]]":
+        """Queue a lookup; the future resolves to the batch-analysis row for `target`."""
+        future: "Future[Dict[str, Any]]" = Future()
+        key = canonical_target(target)
+        now = time.perf_counter()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed")
+            waiters = self._pending.get(key)
+            if waiters is None:
+                waiters = self._pending[key] = []
+                if len(self._pending) == 1:
+                    self._first_at = now
+                    self._cond.notify()
+                elif len(self._pending) >= self.max_items:
+                    self._cond.notify()
+            waiters.append((future, now))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="ahrefs-microbatcher", daemon=True)
+                self._thread.start()
+        self.metrics.inc(BATCHER_LOOKUPS)
+        return future
+
+    def lookup(self, target: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        return self.submit(target).result(timeout)
+
+    def close(self) -> None:
+        """Flush what is queued, then stop accepting lookups."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=5)
+        self._senders.shutdown(wait=True)
+
+    def _run(self) -> None:
+        cond = self._cond
+        while True:
+            with cond:
+                while not self._pending and not self._closed:
+                    cond.wait()
+                if not self._pending:
+                    return
+                deadline = self._first_at + self.window_s
+                while len(self._pending) < self.max_items and not self._closed:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    cond.wait(remaining)
+                batch, self._pending = self._pending, {}
+            self._senders.submit(self._flush, batch)
+
+    def _flush(self, batch: Dict[Any, List[_Waiter]]) -> None:
+        targets = list(batch)
+        sent_at = time.perf_counter()
+        metrics = self.metrics
+        for waiters in batch.values():
+            for _, queued_at in waiters:
+                metrics.observe(BATCHER_WAIT, (), sent_at - queued_at)
+        metrics.inc(BATCHER_FLUSHES)
+        error: Optional[BaseException] = None
+        try:
+            payload = self.client.post_batch_analysis(items=targets)
+        except AhrefsBatchError as exc:  # some chunks failed; serve the rows that came back
+            payload, error = exc.payload, exc
+        except BaseException as exc:
+            for waiters in batch.values():
+                for future, _ in waiters:
+                    future.set_exception(exc)
+            return
+        for target, row in zip(targets, match_results(targets, payload)):
+            for future, _ in batch[target]:
+                if row is not None:
+                    future.set_result(row)
+                else:
+                    future.set_exception(error or AhrefsAPIError(f"No batch-analysis result for {target!r}", status_code=502))
+
+
+_BATCHERS: Dict[Tuple[str, str], MicroBatcher] = {}
+_BATCHERS_LOCK = threading.Lock()
+
+
+def batcher_for(client: Any, *, window_s: float = 0.01, max_items: int = 50) -> MicroBatcher:
+    """
+    Process-wide batcher for the client's API key and base URL. Routes build a
+    client per request, so batching has to be shared across client instances.
+    """
+    key = (key_fingerprint(client.api_key), client.base_url)
+    batcher = _BATCHERS.get(key)
+    if batcher is None:
+        with _BATCHERS_LOCK:
+            batcher = _BATCHERS.get(key)
+            if batcher is None:
+                batcher = _BATCHERS[key] = MicroBatcher(client, window_s=window_s, max_items=max_items)
+    return batcher
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from requests import PreparedRequest, Response
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from .errors import AhrefsCassetteMissError
+
+# Response headers worth keeping; everything else is dropped to keep cassettes small
+_KEPT_HEADERS = ("Content-Type", "Retry-After")
+DEFAULT_IGNORED_PARAMS = ("token",)
+
+
+def canonical_key(method: str, url: str, body: Optional[bytes], *, ignored_params: Iterable[str] = DEFAULT_IGNORED_PARAMS) -> str:
+    """
+    Canonical request identity: method, path and sorted query (auth params removed),
+    plus a digest of the canonicalised JSON body when there is one.
+    """
+    parts = urlsplit(url)
+    ignored = set(ignored_params)
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in ignored))
+    key = f"{method.upper()} {parts.path}" + (f"?{query}" if query else "")
+    if body:
+        try:
+            body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+        except ValueError:
+            pass
+        key += "#" + hashlib.sha256(body).hexdigest()[:16]
+    return key
+
+
+class Cassette:
+    """
+    Gzip-compressed NDJSON file of recorded interactions, grouped by canonical key.
+
+    Recording appends one gzip member per interaction, so a crash mid-run keeps
+    everything recorded so far. Request headers (and therefore credentials) are
+    never stored.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self.interactions: Dict[str, List[Dict[str, Any]]] = {}
+        if os.path.exists(path):
+            with gzip.open(path, "rt", encoding="utf-8") as fh:
+                for line in fh:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.interactions.setdefault(entry["key"], []).append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(v) for v in self.interactions.values())
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            self.interactions.setdefault(entry["key"], []).append(entry)
+            with gzip.open(self.path, "at", encoding="utf-8") as fh:
+                fh.write(line)
+
+
+class RecordingAdapter(BaseAdapter):
+    """Transport adapter that forwards to `inner` and records every response into a cassette."""
+
+    def __init__(self, cassette: Cassette, inner: BaseAdapter, *, ignored_params: Iterable[str] = DEFAULT_IGNORED_PARAMS) -> None:
+        super().__init__()
+        self.cassette = cassette
+        self.inner = inner
+        self.ignored_params = tuple(ignored_params)
+
+    def send(self, request: PreparedRequest, stream: bool = False, timeout: Any = None, verify: Any = True, cert: Any = None, proxies: Any = None) -> Response:
+        start = time.perf_counter()
+        resp = self.inner.send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        content = resp.content  # consumes streamed bodies; cached on the response
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+        self.cassette.append(
+            {
+                "key": canonical_key(request.method or "GET", request.url or "", body, ignored_params=self.ignored_params),
+                "request_body": body.decode("utf-8", errors="replace") if body else None,
+                "status": resp.status_code,
+                "headers": {h: resp.headers[h] for h in _KEPT_HEADERS if h in resp.headers},
+                "body": content.decode("utf-8", errors="replace"),
+                "elapsed": round(time.perf_counter() - start, 6),
+            }
+        )
+        return resp
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Transport adapter serving responses from a cassette, with no network access.
+
+    Repeated requests with the same key replay their recordings in order and wrap
+    around. With `timing=True` each response is delayed by its recorded duration.
+    """
+
+    def __init__(self, cassette: Cassette, *, timing: bool = False, ignored_params: Iterable[str] = DEFAULT_IGNORED_PARAMS) -> None:
+        super().__init__()
+        self.cassette = cassette
+        self.timing = timing
+        self.ignored_params = tuple(ignored_params)
+        self._cursor: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def send(self, request: PreparedRequest, stream: bool = False, timeout: Any = None, verify: Any = True, cert: Any = None, proxies: Any = None) -> Response:
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+        key = canonical_key(request.method or "GET", request.url or "", body, ignored_params=self.ignored_params)
+        entries = self.cassette.interactions.get(key)
+        if not entries:
+            raise AhrefsCassetteMissError(f"No recorded interaction for {key}", key=key)
+        with self._lock:
+            index = self._cursor.get(key, 0)
+            self._cursor[key] = index + 1
+        entry = entries[index % len(entries)]
+        if self.timing and entry.get("elapsed"):
+            time.sleep(entry["elapsed"])
+
+        resp = Response()
+        resp.status_code = entry["status"]
+        resp.headers = CaseInsensitiveDict(entry.get("headers") or {})
+        resp._content = entry["body"].encode("utf-8")
+        resp._content_consumed = True
+        resp.encoding = "utf-8"
+        resp.url = request.url or ""
+        resp.request = request
+        resp.elapsed = timedelta(seconds=entry.get("elapsed") or 0.0)
+        return resp
+
+    def close(self) -> None:
+        pass
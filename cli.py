@@ -0,0 +1,293 @@
+"""
+Batch runs over target lists: `python -m backend.app.core.landing_page.ahrefs`.
+
+    python -m backend.app.core.landing_page.ahrefs domains.csv -o results.ndjson \\
+        --op domain_rating --op refdomains --concurrency 8
+
+Targets come from a CSV (column `--column`, default "target", else the first
+column), NDJSON/JSONL (that key, or bare JSON strings) or plain text (one per
+line); "-" reads stdin. Every (target, operation) pair runs on a pool of
+`--concurrency` threads through one client, so requests stay within its rate
+limiter (`AHREFS_RATE_LIMIT_PER_MIN`) and, with priority lanes, in the bulk
+lane. Results are appended to the output as NDJSON as they complete:
+
+    {"target": "a.com", "op": "domain_rating", "ok": true, "data": {...}}
+    {"target": "b.com", "op": "domain_rating", "ok": false, "error": "AhrefsAPIError", "message": "..."}
+
+The output doubles as the checkpoint: rerunning the same command skips the
+pairs that already have a successful line and retries the rest (`--fresh`
+starts over); a target listed twice (in any spelling `canonical_target`
+folds together) runs once. Throughput and ETA are reported on stderr.
+`--dry-run` prints the plan instead (planner.py): requests, units and the
+estimated wall time at the client's rate limit.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import IO, TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from .batch_analysis import canonical_target
+from .endpoints import EndpointSpec, get_spec
+from .scheduler import BULK, lane
+from .units import tagged
+
+if TYPE_CHECKING:
+    from .client import AhrefsClient
+
+Pair = Tuple[str, str]  # (target, op)
+
+
+def read_targets(path: str, *, column: str = "target") -> Iterator[str]:
+    """Targets from a CSV, NDJSON/JSONL or plain-text file ("-" for stdin), blanks skipped."""
+    stream: TextIO = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+    try:
+        suffix = os.path.splitext(path)[1].lower()
+        if suffix == ".csv":
+            reader = csv.reader(stream)
+            header = next(reader, [])
+            index = header.index(column) if column in header else 0
+            values: Iterable[str] = (row[index] for row in reader if len(row) > index)
+        elif suffix in (".ndjson", ".jsonl"):
+            values = (_json_target(line, column) for line in stream if line.strip())
+        else:
+            values = stream
+        for value in values:
+            value = value.strip()
+            if value:
+                yield value
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def _json_target(line: str, column: str) -> str:
+    doc = json.loads(line)
+    return str(doc[column]) if isinstance(doc, dict) else str(doc)
+
+
+def completed_pairs(path: str) -> Set[Pair]:
+    """
+    (target, op) pairs with a successful line in an existing output file. A
+    torn last line (from a crash mid-write) is cut off so appends stay valid.
+    """
+    done: Set[Pair] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "rb+") as fh:
+        data = fh.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            fh.truncate(end)
+    for line in data[:end].splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get("ok"):
+            done.add((record["target"], record["op"]))
+    return done
+
+
+class Progress:
+    """Throughput and ETA on stderr, at most every `interval_s`."""
+
+    def __init__(self, total: Optional[int], *, interval_s: float = 2.0, stream: Optional[IO[str]] = None) -> None:
+        self.total = total
+        self.interval_s = interval_s
+        self.stream = stream or sys.stderr
+        self.done = self.failed = 0
+        self._start = self._last = time.monotonic()
+
+    def update(self, ok: bool) -> None:
+        self.done += 1
+        self.failed += not ok
+        now = time.monotonic()
+        if now - self._last >= self.interval_s:
+            self._last = now
+            self.report(now)
+
+    def report(self, now: Optional[float] = None) -> None:
+        elapsed = max((now or time.monotonic()) - self._start, 1e-9)
+        rate = self.done / elapsed
+        line = f"{self.done}"
+        if self.total is not None:
+            line += f"/{self.total} ({self.done / self.total:.1%})" if self.total else "/0"
+        line += f" done, {self.failed} failed, {rate:.1f}/s"
+        if self.total is not None and rate > 0:
+            line += f", ETA {_duration((self.total - self.done) / rate)}"
+        self.stream.write(line + "\n")
+        self.stream.flush()
+
+
+def _duration(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    return f"{hours}:{rest // 60:02d}:{rest % 60:02d}"
+
+
+def _batchable(op: str) -> EndpointSpec:
+    spec = get_spec(op)
+    if len(spec.required) != 1:
+        raise ValueError(f"{spec.op} needs {', '.join(spec.required) or 'no target'}; only single-target operations can be batched")
+    return spec
+
+
+def _call(client: "AhrefsClient", spec: EndpointSpec, target: str, params: Dict[str, Any], tag: str) -> Dict[str, Any]:
+    record: Dict[str, Any] = {"target": target, "op": spec.op}
+    try:
+        # pool threads don't inherit the caller's context: set lane and unit tag here
+        with lane(BULK), tagged(tag):
+            data = getattr(client, spec.name)(**{spec.required[0]: target}, **params)
+        record.update(ok=True, data=data)
+    except Exception as exc:
+        record.update(ok=False, error=type(exc).__name__, message=str(exc))
+    return record
+
+
+def run(
+    client: "AhrefsClient",
+    targets: Iterable[str],
+    ops: List[str],
+    out: IO[str],
+    *,
+    params: Optional[Dict[str, Any]] = None,
+    concurrency: int = 4,
+    skip: Iterable[Pair] = (),
+    progress: Optional[Progress] = None,
+    tag: str = "cli",
+) -> Tuple[int, int]:
+    """
+    Run every op for every target, writing one NDJSON record per pair to `out`
+    as it completes. At most `2 * concurrency` pairs are in flight, so inputs of
+    any size stream through. Returns (pairs run, pairs failed).
+    """
+    specs = [_batchable(op) for op in ops]
+    params = params or {}
+    # pairs already done, then every pair submitted, so duplicates run once
+    skipped = {(canonical_target(target), op) for target, op in skip}
+    ran = failed = 0
+
+    def write(record: Dict[str, Any]) -> None:
+        # results are collected and written on this thread only
+        nonlocal ran, failed
+        out.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+        out.flush()
+        ran += 1
+        failed += not record["ok"]
+        if progress is not None:
+            progress.update(record["ok"])
+
+    pending: Set["Future[Dict[str, Any]]"] = set()
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1), thread_name_prefix="ahrefs-cli") as pool:
+        for target in targets:
+            key = canonical_target(target)
+            for spec in specs:
+                if (key, spec.op) in skipped:
+                    continue
+                skipped.add((key, spec.op))
+                if len(pending) >= 2 * concurrency:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        write(future.result())
+                pending.add(pool.submit(_call, client, spec, target, params, tag))
+        for future in pending:
+            write(future.result())
+    return ran, failed
+
+
+def _param(value: str) -> Tuple[str, Any]:
+    key, sep, raw = value.partition("=")
+    if not sep or not key:
+        raise argparse.ArgumentTypeError(f"expected key=value, got {value!r}")
+    try:
+        return key, json.loads(raw)
+    except ValueError:
+        return key, raw
+
+
+def _dry_run(client: "AhrefsClient", args: argparse.Namespace, skip: Set[Pair]) -> int:
+    from .planner import Operation, plan
+
+    skipped = {(canonical_target(target), op) for target, op in skip}
+    params = dict(args.param)
+    specs = [_batchable(op) for op in args.ops]
+    ops = (
+        Operation(spec.name, {**params, spec.required[0]: target})
+        for target in read_targets(args.input, column=args.column)
+        for spec in specs
+        if (canonical_target(target), spec.op) not in skipped
+    )
+    # the CLI calls every pair on its own, so no batch-analysis folding here
+    result = plan(ops, client=client, concurrency=args.concurrency, batch=False)
+    sys.stdout.write(json.dumps(result.summary(), indent=2) + "\n")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None, *, client: Optional["AhrefsClient"] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m backend.app.core.landing_page.ahrefs",
+        description="Run Ahrefs operations over a list of targets, resumably.",
+    )
+    parser.add_argument("input", help="CSV, NDJSON/JSONL or text file of targets ('-' for stdin)")
+    parser.add_argument("-o", "--output", required=True, help="NDJSON results file (also the checkpoint); '-' for stdout")
+    parser.add_argument("--op", action="append", required=True, dest="ops", help="operation or client method, repeatable")
+    parser.add_argument("--column", default="target", help="CSV column / NDJSON key holding the target")
+    parser.add_argument("--param", action="append", type=_param, default=[], metavar="KEY=VALUE", help="extra parameter for every call (JSON values allowed)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--tag", default="cli", help="unit accounting tag")
+    parser.add_argument("--fresh", action="store_true", help="ignore existing output instead of resuming from it")
+    parser.add_argument("--progress-interval", type=float, default=2.0, help="seconds between progress lines")
+    parser.add_argument("--dry-run", action="store_true", help="print the request, unit and time estimate as JSON and exit")
+    args = parser.parse_args(argv)
+
+    try:
+        for op in args.ops:
+            _batchable(op)
+    except KeyError as exc:
+        parser.error(exc.args[0])
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    skip: Set[Pair] = set()
+    to_stdout = args.output == "-"
+    if not to_stdout and not args.fresh:
+        skip = completed_pairs(args.output)
+    total = None
+    if args.input != "-":
+        # a first pass for the ETA; cheap next to the API calls
+        total = sum(1 for _ in read_targets(args.input, column=args.column)) * len(args.ops)
+        total = max(total - len(skip), 0)
+    if client is None:
+        from .config import get_client
+
+        client = get_client()
+    if args.dry_run:
+        return _dry_run(client, args, skip)
+
+    out: IO[str] = sys.stdout if to_stdout else open(args.output, "w" if args.fresh else "a", encoding="utf-8")
+    progress = Progress(total, interval_s=args.progress_interval)
+    if skip:
+        sys.stderr.write(f"resuming: {len(skip)} results already in {args.output}\n")
+    try:
+        _, failed = run(
+            client,
+            read_targets(args.input, column=args.column),
+            args.ops,
+            out,
+            params=dict(args.param),
+            concurrency=args.concurrency,
+            skip=skip,
+            progress=progress,
+            tag=args.tag,
+        )
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    progress.report()
+    return 1 if failed else 0
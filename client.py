@@ -1,15 +1,47 @@
 from __future__ import annotations
 
+import inspect
 import os
-from typing import Any, Dict, List, Optional
-
-import requests
-from requests import Session, Response
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from . import batch_analysis
+from .admission import LIMITER_QUEUES
+from .endpoints import ENDPOINTS, EndpointSpec, extract_rows, get_spec, single_attempt
 from .errors import AhrefsAPIError, AhrefsAuthError, AhrefsRateLimitError
+from .hooks import (
+    AFTER_ACQUIRE,
+    AFTER_BODY,
+    AFTER_DECODE,
+    AFTER_HEADERS,
+    BEFORE_ACQUIRE,
+    BEFORE_SEND,
+    ON_ERROR,
+    HookRegistry,
+    RequestTrace,
+)
+from .metrics import (
+    CLIENT_IN_FLIGHT,
+    CLIENT_LATENCY,
+    CLIENT_LIMITER_WAIT,
+    CLIENT_REQUESTS,
+    CLIENT_RETRIES,
+    CLIENT_UNITS,
+    REGISTRY,
+    MetricsRegistry,
+    status_class,
+)
+from .projection import normalize_fields, project
 from .rate_limiter import RateLimiter
+from .units import LEDGER, BudgetGuard, CostTable, UnitLedger, count_rows, current_tag, key_fingerprint
+
+if TYPE_CHECKING:
+    from requests import Response, Session
+
+    from .key_pool import KeyPool, PooledKey
+    from .rank_sync import SyncReport
+    from .scheduler import PriorityScheduler
 
 DEFAULT_BASE_URL = "https://api.ahrefs.com"
 
@@ -39,6 +71,23 @@ class AhrefsClient:
         session: Optional[Session] = None,
         max_retries: int = 3,
         backoff_factor: float = 0.5,
+        metrics: Optional[MetricsRegistry] = None,
+        hooks: Optional[HookRegistry] = None,
+        cost_table: Optional[CostTable] = None,
+        ledger: Optional[UnitLedger] = None,
+        budget_guard: Optional[BudgetGuard] = None,
+        cassette_path: Optional[str] = None,
+        cassette_mode: str = "replay",
+        cassette_timing: bool = False,
+        pool_connections: int = 10,
+        pool_maxsize: int = 32,
+        pool_block: bool = True,
+        pool_timeout_s: Optional[float] = 30.0,
+        http2: bool = False,
+        share_session: bool = False,
+        scheduler: Optional[PriorityScheduler] = None,
+        key_pool: Optional[KeyPool] = None,
+        rate_limiter: Optional[RateLimiter] = None,
     ) -> None:
         self.api_key = api_key or os.getenv("AHREFS_API_KEY")
         self.base_url = base_url.rstrip("/")
@@ -48,55 +97,76 @@ class AhrefsClient:
         self.api_key_prefix = api_key_prefix
         self.api_key_query_param = api_key_query_param
 
-        self.session = session or requests.Session()
-        retry = Retry(
-            total=max_retries,
-            read=max_retries,
-            connect=max_retries,
-            status=max_retries,
-            backoff_factor=backoff_factor,
-            status_forcelist=(429, 500, 502, 503, 504),
-            allowed_methods=("GET", "POST"),
-            raise_on_status=False,
-        )
-        adapter = HTTPAdapter(max_retries=retry)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
-
-        # Token bucket per minute
-        self._rate_limiter = RateLimiter(capacity=max(rate_limit_per_min, 1), refill_window_s=60)
+        # The HTTP session is built on first use (see `session`), so importing and
+        # constructing the client never pays for requests/urllib3
+        if cassette_path and cassette_mode not in ("record", "replay"):
+            raise ValueError("cassette_mode must be 'record' or 'replay'")
+        self._session = session
+        self._session_ready = False
+        self._session_lock = threading.Lock()
+        # Clients built per request (config.get_client) share one session, and so
+        # one connection pool, per transport configuration
+        self._share_session = share_session and session is None
+        self._transport_options: Dict[str, Any] = {
+            "max_retries": max_retries,
+            "backoff_factor": backoff_factor,
+            "pool_connections": pool_connections,
+            "pool_maxsize": pool_maxsize,
+            "pool_block": pool_block,
+            "pool_timeout_s": pool_timeout_s,
+            "http2": http2,
+            "cassette_path": cassette_path,
+            "cassette_mode": cassette_mode,
+            "cassette_timing": cassette_timing,
+            "ignored_params": ("token", api_key_query_param),
+        }
+
+        # Token bucket per minute; pass a shared one (`shared_rate_limiter`) when
+        # several clients use the same key
+        self.rate_limit_per_min = max(rate_limit_per_min, 1)
+        self._rate_limiter = rate_limiter or RateLimiter(capacity=self.rate_limit_per_min, refill_window_s=60)
+        # Priority lanes in front of a (usually shared) limiter, used instead of the
+        # one above when set (see scheduler.py)
+        self.scheduler = scheduler
+        # Several API keys, each with its own limiter and budget; when set, every
+        # request picks a key from the pool instead of using `api_key` (see key_pool.py).
+        # Lanes then live on the pooled keys (`KeyPool(priority_lanes=True)`)
+        if scheduler is not None and key_pool is not None:
+            raise ValueError("scheduler= is not used with key_pool=; build the pool with priority_lanes=True instead")
+        self.key_pool = key_pool
+        # Shared process-wide registry unless an isolated one is injected
+        self.metrics = metrics or REGISTRY
+        # Lifecycle hooks (see hooks.py); empty by default
+        self.hooks = hooks if hooks is not None else HookRegistry()
+        # API unit accounting (see units.py); the guard is opt-in
+        self.cost_table = cost_table or CostTable()
+        self.ledger = ledger if ledger is not None else LEDGER
+        self.budget_guard = budget_guard
+
+    @property
+    def session(self) -> Session:
+        if not self._session_ready:
+            with self._session_lock:
+                if not self._session_ready:
+                    from .transport import build_session, shared_session
+
+                    if self._share_session:
+                        self._session = shared_session(**self._transport_options)
+                    else:
+                        self._session = build_session(self._session, **self._transport_options)
+                    self._session_ready = True
+        return self._session  # type: ignore[return-value]
+
+    @session.setter
+    def session(self, session: Session) -> None:
+        self._session = session
+        self._session_ready = True
 
     # ---------------
     # Public endpoints
     # ---------------
-    def get_domain_metrics(self, *, domain: str, metrics: Optional[List[str]] = None, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"domain": domain}
-        if metrics:
-            params["metrics"] = ",".join(metrics)
-        params.update(extra)
-        return self._request("GET", "/v1/domain/metrics", params=params)
-
-    def get_backlinks(self, *, target: str, limit: int = 100, offset: int = 0, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target, "limit": limit, "offset": offset}
-        params.update(extra)
-        return self._request("GET", "/v1/backlinks", params=params)
-
-    def get_referring_domains(self, *, target: str, limit: int = 100, offset: int = 0, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target, "limit": limit, "offset": offset}
-        params.update(extra)
-        return self._request("GET", "/v1/referring-domains", params=params)
-
-    def get_organic_keywords(self, *, target: str, country: Optional[str] = None, limit: int = 100, offset: int = 0, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target, "limit": limit, "offset": offset}
-        if country:
-            params["country"] = country
-        params.update(extra)
-        return self._request("GET", "/v1/organic-keywords", params=params)
-
-    def get_pages(self, *, target: str, limit: int = 100, offset: int = 0, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target, "limit": limit, "offset": offset}
-        params.update(extra)
-        return self._request("GET", "/v1/pages", params=params)
+    # The per-endpoint methods (get_backlinks, get_domain_rating, ...) are generated
+    # from the spec table in endpoints.py; see the bottom of this module.
 
     def batch(self, requests_: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         # naive convenience: execute sequentially
@@ -109,104 +179,65 @@ class AhrefsClient:
             results.append(self._request(method, path, params=params, json=json))
         return results
 
-    # -----------------------------
-    # Site Explorer convenience ops
-    # -----------------------------
-    def _get_site_explorer(self, op: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    def paginate(self, name: str, *, page_size: int = 100, max_rows: Optional[int] = None, **params: Any) -> Iterator[Any]:
+        """
+        Iterate the rows of an offset-paginated endpoint (by method or op name),
+        fetching `page_size` rows per request until a short page or `max_rows`.
         """
-        Generic Site Explorer GET. By default, calls `/site-explorer/{op}`.
-        You can override the vendor path by passing `path` inside params (will be popped).
+        spec = get_spec(name)
+        if spec.pagination != "offset":
+            raise ValueError(f"{spec.name} is not paginated")
+        fetch = getattr(self, spec.name)
+        offset = int(params.pop("offset", 0))
+        seen = 0
+        while True:
+            limit = page_size if max_rows is None else min(page_size, max_rows - seen)
+            if limit <= 0:
+                return
+            rows = extract_rows(fetch(limit=limit, offset=offset, **params))
+            yield from rows
+            seen += len(rows)
+            offset += len(rows)
+            if len(rows) < limit:
+                return
+
+    def sync_keywords(self, project_id: str, keywords: Iterable[str], **options: Any) -> SyncReport:
         """
-        params = dict(params) if params else {}
-        # allow override of default path
-        path = params.pop("path", f"/site-explorer/{op}")
-        return self._request("GET", path, params=params)
-
-    def get_domain_rating(self, *, domain: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"domain": domain}
-        params.update(extra)
-        return self._get_site_explorer("domain-rating", params)
-
-    def get_backlinks_stats(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_site_explorer("backlinks-stats", params)
-
-    def get_outlinks_stats(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_site_explorer("outlinks-stats", params)
-
-    def get_metrics(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_site_explorer("metrics", params)
-
-    def get_refdomains_history(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_site_explorer("refdomains-history", params)
-
-    def get_domain_rating_history(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_site_explorer("domain-rating-history", params)
-
-    def get_url_rating_history(self, *, url: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"url": url}
-        params.update(extra)
-        return self._get_site_explorer("url-rating-history", params)
-
-    def get_pages_history(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_site_explorer("pages-history", params)
-
-    def get_metrics_history(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_site_explorer("metrics-history", params)
-
-    def get_keywords_history(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_site_explorer("keywords-history", params)
-
-    def get_metrics_by_country(self, *, target: str, country: Optional[str] = None, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        if country:
-            params["country"] = country
-        params.update(extra)
-        return self._get_site_explorer("metrics-by-country", params)
-
-    def get_pages_by_traffic(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_site_explorer("pages-by-traffic", params)
-
-    def get_total_search_volume_history(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_site_explorer("total-search-volume-history", params)
+        Make a Rank Tracker project track exactly `keywords`, sending only the
+        additions and removals (see rank_sync.py for `chunk_size`, `max_workers`,
+        `prune` and `dry_run`).
+        """
+        from .rank_sync import sync_keywords
+
+        return sync_keywords(self, project_id, keywords, **options)
+
+    def sync_competitors(self, project_id: str, competitors: Iterable[str], **options: Any) -> SyncReport:
+        """Like `sync_keywords`, for the project's competitors."""
+        from .rank_sync import sync_competitors
+
+        return sync_competitors(self, project_id, competitors, **options)
 
     # ------------------
     # Internal helpers
     # ------------------
-    def _auth_headers_and_params(self) -> tuple[Dict[str, str], Dict[str, Any]]:
-        if not self.api_key:
+    def _auth_headers_and_params(self, api_key: Optional[str] = None) -> tuple[Dict[str, str], Dict[str, Any]]:
+        api_key = api_key or self.api_key
+        if not api_key:
             raise AhrefsAuthError("API key missing. Set AHREFS_API_KEY or pass api_key.")
         if self.auth_in_header:
-            return ({self.api_key_header: f"{self.api_key_prefix}{self.api_key}"}, {})
+            return ({self.api_key_header: f"{self.api_key_prefix}{api_key}"}, {})
         else:
-            return ({}, {self.api_key_query_param: self.api_key})
+            return ({}, {self.api_key_query_param: api_key})
 
-    def _handle_response(self, resp: Response) -> Dict[str, Any]:
+    def _handle_response(self, resp: Response, trace: Optional[RequestTrace] = None) -> Dict[str, Any]:
         if resp.status_code == 429:
             raise AhrefsRateLimitError("Rate limit exceeded", status_code=resp.status_code, response_text=resp.text)
         try:
             data = resp.json() if resp.content else {}
         except ValueError:
             data = {}
+        if trace is not None:
+            self.hooks.emit(AFTER_DECODE, trace)
         if 200 <= resp.status_code < 300:
             return data
         if resp.status_code in (401, 403):
@@ -223,8 +254,60 @@ class AhrefsClient:
         params: Optional[Dict[str, Any]] = None,
         json: Optional[Dict[str, Any]] = None,
     ) -> Dict[str, Any]:
-        self._rate_limiter.acquire()
-        headers_auth, params_auth = self._auth_headers_and_params()
+        pool = self.key_pool
+        if pool is None:
+            return self._send(method, path, params=params, json=json)
+        estimate = self.cost_table.estimate(path, params=params, json=json)
+        return pool.call(lambda key: self._send(method, path, params=params, json=json, key=key), estimate=estimate)
+
+    def _send(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+        key: Optional[PooledKey] = None,
+    ) -> Dict[str, Any]:
+        metrics = self.metrics
+        hooks = self.hooks
+        method = method.upper()
+        key_id = key.fingerprint if key is not None else key_fingerprint(self.api_key)
+        tag = current_tag()
+        lane: Optional[str] = None
+        if self.budget_guard is not None:
+            estimate = self.cost_table.estimate(path, params=params, json=json)
+            if self.budget_guard.check(self.ledger, key_id, estimate, tag):
+                # over the soft budget: queue behind everything else, or without lanes, back off
+                scheduler = key.scheduler if key is not None else self.scheduler
+                if scheduler is not None:
+                    lane = scheduler.bottom
+                else:
+                    time.sleep(self.budget_guard.soft_delay_s)
+        # Tracing is only paid for when at least one hook is registered
+        trace = RequestTrace(method, path) if hooks else None
+        if trace is not None:
+            hooks.emit(BEFORE_ACQUIRE, trace)
+        acquire_start = time.perf_counter()
+        # counted while waiting so the router can estimate queue time (admission.py)
+        if key is not None:
+            with LIMITER_QUEUES.waiting(key_id, key.rate_limit_per_min):
+                if key.scheduler is not None:
+                    key.scheduler.acquire(lane)
+                else:
+                    key.limiter.acquire()
+        elif self.scheduler is not None:
+            with LIMITER_QUEUES.waiting(key_id, self.scheduler.capacity):
+                self.scheduler.acquire(lane)
+        else:
+            with LIMITER_QUEUES.waiting(key_id, self.rate_limit_per_min):
+                self._rate_limiter.acquire()
+        send_start = time.perf_counter()
+        metrics.observe(CLIENT_LIMITER_WAIT, (), send_start - acquire_start)
+        if trace is not None:
+            hooks.emit(AFTER_ACQUIRE, trace)
+
+        headers_auth, params_auth = self._auth_headers_and_params(key.api_key if key is not None else None)
 
         url = f"{self.base_url}{path}"
         merged_params: Dict[str, Any] = {}
@@ -232,250 +315,163 @@ class AhrefsClient:
             merged_params.update(params)
         merged_params.update(params_auth)
 
-        resp = self.session.request(
-            method=method.upper(),
-            url=url,
-            params=merged_params if merged_params else None,
-            json=json,
-            headers=headers_auth if headers_auth else None,
-            timeout=self.timeout_s,
-        )
-        return self._handle_response(resp)
-
-    # -----------------------------
-    # Category helpers and methods
-    # -----------------------------
-    def _get_category(self, category: str, op: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Generic category GET with default path `/{category}/{op}`.
-        Overridable by passing `path` in params.
-        """
-        params = dict(params) if params else {}
-        path = params.pop("path", f"/{category}/{op}")
-        return self._request("GET", path, params=params)
-
-    # Backlinks
-    def get_broken_backlinks(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_category("backlinks", "broken", params)
-
-    def get_refdomains(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_category("backlinks", "refdomains", params)
-
-    def get_anchors(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_category("backlinks", "anchors", params)
-
-    # Organic search
-    def get_organic_competitors(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_category("organic", "competitors", params)
-
-    def get_top_pages(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_category("organic", "top-pages", params)
-
-    # Paid search
-    def get_paid_pages(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_category("paid", "pages", params)
-
-    # Pages
-    def get_best_by_external_links(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_category("pages", "best-by-external-links", params)
-
-    def get_best_by_internal_links(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_category("pages", "best-by-internal-links", params)
-
-    # Outgoing links
-    def get_linked_domains(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_category("outgoing", "linked-domains", params)
-
-    def get_outgoing_external_anchors(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_category("outgoing", "external-anchors", params)
-
-    def get_outgoing_internal_anchors(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_category("outgoing", "internal-anchors", params)
-
-    # Keywords Explorer
-    def get_keywords_overview(self, *, query: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"query": query}
-        params.update(extra)
-        return self._get_category("keywords-explorer", "overview", params)
-
-    def get_keywords_volume_history(self, *, query: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"query": query}
-        params.update(extra)
-        return self._get_category("keywords-explorer", "volume-history", params)
-
-    def get_keywords_volume_by_country(self, *, query: str, country: str | None = None, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"query": query}
-        if country:
-            params["country"] = country
-        params.update(extra)
-        return self._get_category("keywords-explorer", "volume-by-country", params)
-
-    def get_matching_terms(self, *, query: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"query": query}
-        params.update(extra)
-        return self._get_category("keywords-explorer", "matching-terms", params)
-
-    def get_related_terms(self, *, query: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"query": query}
-        params.update(extra)
-        return self._get_category("keywords-explorer", "related-terms", params)
-
-    def get_search_suggestions(self, *, query: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"query": query}
-        params.update(extra)
-        return self._get_category("keywords-explorer", "search-suggestions", params)
-
-    # Rank Tracker
-    def get_rank_tracker_overview(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_category("rank-tracker", "overview", params)
-
-    # Overview group
-    def get_overview(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_category("overview", "overview", params)
-
-    def get_competitors_overview(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_category("overview", "competitors-overview", params)
-
-    def get_competitors_pages(self, *, target: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"target": target}
-        params.update(extra)
-        return self._get_category("overview", "competitors-pages", params)
-
-    # SERP Overview
-    def get_serp_overview(self, *, query: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"query": query}
-        params.update(extra)
-        return self._get_category("serp", "overview", params)
-
-    # Batch Analysis (POST)
-    def post_batch_analysis(self, *, items: list[str], **extra: Any) -> Dict[str, Any]:
-        data: Dict[str, Any] = {"items": items}
-        # Allow overriding path via extra.path
-        path = (extra or {}).pop("path", "/batch-analysis")
-        # Remaining extras treated as additional JSON fields
-        if extra:
-            data.update(extra)
-        headers, params = self._auth_headers_and_params()
-        if self._rate_limiter:
-            self._rate_limiter.acquire()
-        resp = self.session.request(
-            "POST",
-            url=f"{self.base_url}{path}",
-            headers=headers,
-            params=params,
-            json=data,
-            timeout=self.timeout_s,
+        endpoint = (("endpoint", path),)
+        # Streaming lets hooks separate time-to-headers from body download
+        send_kwargs: Dict[str, Any] = {"stream": True} if trace is not None else {}
+        metrics.gauge_add(CLIENT_IN_FLIGHT, (), 1)
+        try:
+            if trace is not None:
+                hooks.emit(BEFORE_SEND, trace)
+            resp = self.session.request(
+                method=method,
+                url=url,
+                params=merged_params if merged_params else None,
+                json=json,
+                headers=headers_auth if headers_auth else None,
+                timeout=self.timeout_s,
+                **send_kwargs,
+            )
+        except Exception as exc:
+            metrics.inc(CLIENT_REQUESTS, endpoint + (("method", method), ("status", "error")))
+            if trace is not None:
+                trace.error = exc
+                hooks.emit(ON_ERROR, trace)
+            raise
+        finally:
+            metrics.gauge_add(CLIENT_IN_FLIGHT, (), -1)
+            metrics.observe(CLIENT_LATENCY, endpoint, time.perf_counter() - send_start)
+
+        metrics.inc(CLIENT_REQUESTS, endpoint + (("method", method), ("status", status_class(resp.status_code))))
+        retries = _retry_count(resp)
+        if retries:
+            metrics.inc(CLIENT_RETRIES, endpoint, retries)
+        if trace is None:
+            data = self._handle_response(resp)
+        else:
+            trace.status_code = resp.status_code
+            hooks.emit(AFTER_HEADERS, trace)
+            try:
+                resp.content  # drain the streamed body
+                hooks.emit(AFTER_BODY, trace)
+                data = self._handle_response(resp, trace)
+            except Exception as exc:
+                trace.error = exc
+                # error responses that were decoded already reported via after_decode
+                if AFTER_DECODE not in trace.marks:
+                    hooks.emit(ON_ERROR, trace)
+                raise
+
+        rows = count_rows(data)
+        units = self.cost_table.actual(path, rows)
+        if units:
+            self.ledger.record(key_id, tag, path, units, rows)
+            metrics.inc(CLIENT_UNITS, endpoint + (("tag", tag),), units)
+        return data
+
+
+def _endpoint_method(spec: EndpointSpec) -> Callable[..., Dict[str, Any]]:
+    build = spec.build
+    http_method = spec.method
+    body = spec.body
+    select = spec.select
+    idempotent = spec.idempotent
+
+    def method(self: AhrefsClient, **kwargs: Any) -> Dict[str, Any]:
+        priority = kwargs.pop("priority", None)
+        if priority is not None:
+            from .scheduler import lane
+
+            with lane(priority):
+                return method(self, **kwargs)
+        fields = normalize_fields(kwargs.pop("fields", None))
+        path, values = build(kwargs)
+        if fields is not None and select is not None:
+            values[select] = ",".join(fields)
+        if not idempotent:
+            # never replayed by the transport, whatever `path` it was sent to
+            with single_attempt():
+                data = self._request(http_method, path, json=values) if body else self._request(http_method, path, params=values)
+        elif body:
+            data = self._request(http_method, path, json=values)
+        else:
+            data = self._request(http_method, path, params=values)
+        return data if fields is None else project(data, fields)
+
+    method.__name__ = spec.name
+    method.__qualname__ = f"AhrefsClient.{spec.name}"
+    method.__doc__ = spec.doc or f"{spec.method} {spec.path}"
+    method.__signature__ = spec.signature()  # type: ignore[attr-defined]
+    method.endpoint = spec  # type: ignore[attr-defined]
+    return method
+
+
+for _spec in ENDPOINTS:
+    setattr(AhrefsClient, _spec.name, _endpoint_method(_spec))
+del _spec
+
+
+def _chunked_batch_analysis(single: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+    """Wrap the generated post_batch_analysis so large item lists are chunked (see batch_analysis.py)."""
+
+    def post_batch_analysis(
+        self: AhrefsClient,
+        *,
+        items: List[Any],
+        chunk_size: int = batch_analysis.DEFAULT_CHUNK_SIZE,
+        max_workers: int = batch_analysis.DEFAULT_MAX_WORKERS,
+        chunk_retries: int = 2,
+        fields: Optional[List[str]] = None,
+        **extra: Any,
+    ) -> Dict[str, Any]:
+        # project after merging: chunk results are matched back to items by their target
+        data = batch_analysis.run(
+            lambda chunk: single(self, items=chunk, **extra),
+            items,
+            chunk_size=chunk_size,
+            max_workers=max_workers,
+            chunk_retries=chunk_retries,
         )
-        return self._handle_response(resp)
-
-    # Subscription Information
-    def get_limits_and_usage(self, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {}
-        params.update(extra or {})
-        return self._get_category("subscription", "limits-and-usage", params)
-
-    # -----------------------------
-    # Management
-    # -----------------------------
-    # Projects
-    def get_projects(self, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {}
-        params.update(extra or {})
-        return self._get_category("management", "projects", params)
-
-    def create_project(self, *, name: str, target: str, **extra: Any) -> Dict[str, Any]:
-        data: Dict[str, Any] = {"name": name, "target": target}
-        if extra:
-            data.update(extra)
-        return self._request("POST", "/management/projects", json=data)
-
-    # Keywords
-    def get_keywords(self, *, project_id: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"project_id": project_id}
-        params.update(extra or {})
-        return self._get_category("management", "keywords", params)
-
-    def put_keywords(self, *, project_id: str, keywords: list[str], **extra: Any) -> Dict[str, Any]:
-        data: Dict[str, Any] = {"project_id": project_id, "keywords": keywords}
-        if extra:
-            data.update(extra)
-        return self._request("PUT", "/management/keywords", json=data)
-
-    def delete_keywords(self, *, project_id: str, keywords: list[str], **extra: Any) -> Dict[str, Any]:
-        data: Dict[str, Any] = {"project_id": project_id, "keywords": keywords}
-        if extra:
-            data.update(extra)
-        # API uses PUT for delete per spec provided
-        return self._request("PUT", "/management/keywords/delete", json=data)
-
-    # Competitors
-    def get_competitors(self, *, project_id: str, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {"project_id": project_id}
-        params.update(extra or {})
-        return self._get_category("management", "competitors", params)
-
-    def add_competitors(self, *, project_id: str, competitors: list[str], **extra: Any) -> Dict[str, Any]:
-        data: Dict[str, Any] = {"project_id": project_id, "competitors": competitors}
-        if extra:
-            data.update(extra)
-        return self._request("POST", "/management/competitors", json=data)
-
-    def delete_competitors(self, *, project_id: str, competitors: list[str], **extra: Any) -> Dict[str, Any]:
-        data: Dict[str, Any] = {"project_id": project_id, "competitors": competitors}
-        if extra:
-            data.update(extra)
-        return self._request("POST", "/management/competitors/delete", json=data)
-
-    # Locations and languages
-    def get_locations_and_languages(self, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {}
-        params.update(extra or {})
-        return self._get_category("management", "locations-and-languages", params)
-
-    # Keyword lists
-    def get_keyword_lists(self, *, project_id: str | None = None, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {}
-        if project_id:
-            params["project_id"] = project_id
-        params.update(extra or {})
-        return self._get_category("management", "keyword-lists", params)
-
-    # -----------------------------
-    # Public
-    # -----------------------------
-    def get_crawler_ip_addresses(self, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {}
-        params.update(extra or {})
-        return self._get_category("public", "crawler-ip-addresses", params)
-
-    def get_crawler_ip_ranges(self, **extra: Any) -> Dict[str, Any]:
-        params: Dict[str, Any] = {}
-        params.update(extra or {})
-        return self._get_category("public", "crawler-ip-ranges", params)
+        return project(data, fields)
+
+    spec: EndpointSpec = single.endpoint  # type: ignore[attr-defined]
+    sig = spec.signature()
+    params = list(sig.parameters.values())
+    kw = inspect.Parameter.KEYWORD_ONLY
+    params[-1:-1] = [
+        inspect.Parameter("chunk_size", kw, default=batch_analysis.DEFAULT_CHUNK_SIZE, annotation=int),
+        inspect.Parameter("max_workers", kw, default=batch_analysis.DEFAULT_MAX_WORKERS, annotation=int),
+        inspect.Parameter("chunk_retries", kw, default=2, annotation=int),
+    ]
+    post_batch_analysis.__qualname__ = single.__qualname__
+    post_batch_analysis.__doc__ = f"{single.__doc__}\n\nItems are de-duplicated and sent in chunks of `chunk_size` on up to `max_workers` threads."
+    post_batch_analysis.__signature__ = sig.replace(parameters=params)  # type: ignore[attr-defined]
+    post_batch_analysis.endpoint = spec  # type: ignore[attr-defined]
+    return post_batch_analysis
+
+
+AhrefsClient.post_batch_analysis = _chunked_batch_analysis(AhrefsClient.post_batch_analysis)  # type: ignore[method-assign]
+
+
+def _retry_count(resp: Response) -> int:
+    """Number of retries urllib3 performed for `resp` (0 when unavailable)."""
+    retries = getattr(getattr(resp, "raw", None), "retries", None)
+    return len(getattr(retries, "history", None) or ())
+
+
+_LIMITERS: Dict[Tuple[str, str], RateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def shared_rate_limiter(api_key: Optional[str], base_url: str, *, rate_limit_per_min: int) -> RateLimiter:
+    """
+    Process-wide limiter for an API key and base URL. Routes build a client per
+    request, so the bucket (and the queue admission control measures) has to be shared.
+    """
+    key = (key_fingerprint(api_key), base_url)
+    limiter = _LIMITERS.get(key)
+    if limiter is None:
+        with _LIMITERS_LOCK:
+            limiter = _LIMITERS.get(key)
+            if limiter is None:
+                limiter = _LIMITERS[key] = RateLimiter(capacity=max(rate_limit_per_min, 1), refill_window_s=60)
+    return limiter
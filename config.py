@@ -4,7 +4,8 @@ import os
 from functools import lru_cache
 from typing import Optional
 
-from .client import AhrefsClient
+from .client import AhrefsClient, shared_rate_limiter
+from .units import BudgetGuard
 
 
 class AhrefsSettings:
@@ -19,6 +20,26 @@ class AhrefsSettings:
         api_key_header: str = "Authorization",  # used when auth_in_header=True
         api_key_prefix: str = "Bearer ",  # e.g., "Bearer " or "Ahrefs ", can be empty
         api_key_query_param: str = "token",  # used when auth_in_header=False
+        monthly_unit_budget: Optional[int] = None,  # enables the budget guard when set
+        budget_mode: str = "hard",  # "hard" rejects, "soft" deprioritises near the limit
+        microbatch_window_ms: float = 0.0,  # > 0 batches single-domain metric routes (see batcher.py)
+        microbatch_max_items: int = 50,
+        priority_lanes: bool = False,  # share one limiter per key with interactive/normal/bulk lanes (see scheduler.py)
+        interactive_reserve: float = 0.2,  # fraction of the rate limit kept for the interactive lane
+        api_keys: Optional[str] = None,  # "key1,key2:600:200000" enables the key pool (see key_pool.parse_keys)
+        router_max_concurrency: int = 32,  # router requests running at once, shared fairly across tenants
+        tenant_max_concurrency: int = 8,  # per Bearer-token tenant
+        tenant_rate_per_min: int = 0,  # per Bearer-token tenant; 0 disables
+        admission_max_wait_s: float = 10.0,  # shed router requests expected to wait longer for a token; 0 disables
+        pool_connections: int = 10,  # per-host pools kept in the shared session
+        pool_maxsize: int = 32,  # keep-alive connections per host in the shared session
+        pool_block: bool = True,  # wait for a free connection instead of opening throwaway ones
+        pool_timeout_s: float = 30.0,  # how long a blocked caller waits before the request fails
+        http2: bool = False,  # multiplex over HTTP/2 (needs httpx[http2], see transport.py)
+        warmup_connections: int = 4,  # connections opened by warmup.warm_up_default
+        dns_ttl_s: float = 300.0,  # how long warmed-up DNS answers are cached; 0 disables the cache
+        jobs_db: str = "ahrefs_jobs.sqlite3",  # SQLite file for export jobs and their results (see jobs.py)
+        jobs_max_workers: int = 2,  # export jobs running at once
     ) -> None:
         self.api_key = api_key or os.getenv("AHREFS_API_KEY")
         self.base_url = os.getenv("AHREFS_BASE_URL", base_url)
@@ -28,6 +49,27 @@ class AhrefsSettings:
         self.api_key_header = os.getenv("AHREFS_API_KEY_HEADER", api_key_header)
         self.api_key_prefix = os.getenv("AHREFS_API_KEY_PREFIX", api_key_prefix)
         self.api_key_query_param = os.getenv("AHREFS_API_KEY_QUERY_PARAM", api_key_query_param)
+        budget = os.getenv("AHREFS_MONTHLY_UNIT_BUDGET")
+        self.monthly_unit_budget = int(budget) if budget else monthly_unit_budget
+        self.budget_mode = os.getenv("AHREFS_BUDGET_MODE", budget_mode)
+        self.microbatch_window_ms = float(os.getenv("AHREFS_MICROBATCH_WINDOW_MS", str(microbatch_window_ms)))
+        self.microbatch_max_items = int(os.getenv("AHREFS_MICROBATCH_MAX_ITEMS", str(microbatch_max_items)))
+        self.priority_lanes = os.getenv("AHREFS_PRIORITY_LANES", str(int(priority_lanes))) in {"1", "true", "True"}
+        self.interactive_reserve = float(os.getenv("AHREFS_INTERACTIVE_RESERVE", str(interactive_reserve)))
+        self.api_keys = os.getenv("AHREFS_API_KEYS", api_keys or "")
+        self.router_max_concurrency = int(os.getenv("AHREFS_ROUTER_MAX_CONCURRENCY", str(router_max_concurrency)))
+        self.tenant_max_concurrency = int(os.getenv("AHREFS_TENANT_MAX_CONCURRENCY", str(tenant_max_concurrency)))
+        self.tenant_rate_per_min = int(os.getenv("AHREFS_TENANT_RATE_PER_MIN", str(tenant_rate_per_min)))
+        self.admission_max_wait_s = float(os.getenv("AHREFS_ADMISSION_MAX_WAIT_S", str(admission_max_wait_s)))
+        self.pool_connections = int(os.getenv("AHREFS_POOL_CONNECTIONS", str(pool_connections)))
+        self.pool_maxsize = int(os.getenv("AHREFS_POOL_MAXSIZE", str(pool_maxsize)))
+        self.pool_block = os.getenv("AHREFS_POOL_BLOCK", str(int(pool_block))) in {"1", "true", "True"}
+        self.pool_timeout_s = float(os.getenv("AHREFS_POOL_TIMEOUT_S", str(pool_timeout_s)))
+        self.http2 = os.getenv("AHREFS_HTTP2", str(int(http2))) in {"1", "true", "True"}
+        self.warmup_connections = int(os.getenv("AHREFS_WARMUP_CONNECTIONS", str(warmup_connections)))
+        self.dns_ttl_s = float(os.getenv("AHREFS_DNS_TTL_S", str(dns_ttl_s)))
+        self.jobs_db = os.getenv("AHREFS_JOBS_DB", jobs_db)
+        self.jobs_max_workers = int(os.getenv("AHREFS_JOBS_MAX_WORKERS", str(jobs_max_workers)))
 
 
 @lru_cache(maxsize=1)
@@ -37,6 +79,28 @@ def get_settings() -> AhrefsSettings:
 
 def get_client() -> AhrefsClient:
     s = get_settings()
+    scheduler = None
+    key_pool = None
+    if s.api_keys:
+        from .key_pool import parse_keys, shared_key_pool
+
+        # with lanes on, each pooled key gets its own scheduler
+        key_pool = shared_key_pool(
+            parse_keys(s.api_keys),
+            rate_limit_per_min=s.rate_limit_per_min,
+            monthly_units=s.monthly_unit_budget,  # per key, unless its entry sets one
+            priority_lanes=s.priority_lanes,
+            interactive_reserve=s.interactive_reserve,
+        )
+    elif s.priority_lanes:
+        from .scheduler import shared_scheduler
+
+        scheduler = shared_scheduler(s.api_key, s.base_url, capacity=s.rate_limit_per_min, reserved=s.interactive_reserve)
+    rate_limiter = None
+    if scheduler is None and key_pool is None:
+        # one bucket per key across the clients built per request, so the rate
+        # limit holds and admission control measures the queue that really forms
+        rate_limiter = shared_rate_limiter(s.api_key, s.base_url, rate_limit_per_min=s.rate_limit_per_min)
     return AhrefsClient(
         api_key=s.api_key,
         base_url=s.base_url,
@@ -46,4 +110,14 @@ def get_client() -> AhrefsClient:
         api_key_header=s.api_key_header,
         api_key_prefix=s.api_key_prefix,
         api_key_query_param=s.api_key_query_param,
+        budget_guard=BudgetGuard(monthly_units=s.monthly_unit_budget, mode=s.budget_mode) if s.monthly_unit_budget else None,
+        scheduler=scheduler,
+        key_pool=key_pool,
+        rate_limiter=rate_limiter,
+        pool_connections=s.pool_connections,
+        pool_maxsize=s.pool_maxsize,
+        pool_block=s.pool_block,
+        pool_timeout_s=s.pool_timeout_s,
+        http2=s.http2,
+        share_session=True,
     )
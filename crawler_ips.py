@@ -0,0 +1,245 @@
+"""
+AhrefsBot IP verification.
+
+`CrawlerIPIndex` compiles the CIDR ranges and single addresses published at
+`public/crawler-ip-ranges` / `public/crawler-ip-addresses` into merged, sorted
+integer intervals (one table for IPv4, one for IPv6), so checking an address is
+a parse plus one binary search instead of a scan over every network.
+`CrawlerIPVerifier` keeps an index fresh in a background thread, swapping in
+each rebuilt index as a single reference assignment, and can persist it as a
+snapshot so a restarted process verifies traffic before its first refresh.
+
+    verifier = CrawlerIPVerifier(client, snapshot_path="/var/cache/ahrefs_ips.json").start()
+    if verifier.is_ahrefs_crawler(request.client.host): ...
+"""
+from __future__ import annotations
+
+import ipaddress
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from bisect import bisect_right
+from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .endpoints import extract_rows
+
+logger = logging.getLogger(__name__)
+
+IPLike = Union[str, int, ipaddress.IPv4Address, ipaddress.IPv6Address]
+Network = Union[ipaddress.IPv4Network, ipaddress.IPv6Network]
+
+SNAPSHOT_VERSION = 1
+
+# ::ffff:0:0/96, IPv4 addresses seen through a dual-stack socket
+_MAPPED_LO = 0xFFFF_0000_0000
+_MAPPED_HI = 0xFFFF_FFFF_FFFF
+
+_inet_pton = socket.inet_pton
+_unpack_v4 = struct.Struct("!I").unpack
+_AF_INET = socket.AF_INET
+_AF_INET6 = socket.AF_INET6
+
+
+def _merge(intervals: Iterable[Tuple[int, int]]) -> Tuple[List[int], List[int]]:
+    """Sort and coalesce overlapping or adjacent [start, end] intervals."""
+    starts: List[int] = []
+    ends: List[int] = []
+    for start, end in sorted(intervals):
+        if ends and start <= ends[-1] + 1:
+            if end > ends[-1]:
+                ends[-1] = end
+        else:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
+
+
+def networks_from_payload(payload: Any) -> List[Network]:
+    """Every network (or single address) found in a crawler-ip-ranges / crawler-ip-addresses response."""
+    found: List[Network] = []
+    for row in extract_rows(payload):
+        values = row.values() if isinstance(row, dict) else (row,)
+        for value in values:
+            if not isinstance(value, str):
+                continue
+            try:
+                found.append(ipaddress.ip_network(value.strip(), strict=False))
+            except ValueError:
+                continue
+    return found
+
+
+class CrawlerIPIndex:
+    """Immutable interval index of crawler networks; `ip in index` is O(log n)."""
+
+    __slots__ = ("v4_starts", "v4_ends", "v6_starts", "v6_ends", "built_at")
+
+    def __init__(
+        self,
+        v4: Tuple[Sequence[int], Sequence[int]] = ((), ()),
+        v6: Tuple[Sequence[int], Sequence[int]] = ((), ()),
+        *,
+        built_at: Optional[float] = None,
+    ) -> None:
+        # plain lists: bisect on a list of ints is faster than on an array('Q')
+        self.v4_starts = list(v4[0])
+        self.v4_ends = list(v4[1])
+        self.v6_starts = list(v6[0])
+        self.v6_ends = list(v6[1])
+        self.built_at = time.time() if built_at is None else built_at
+
+    @classmethod
+    def from_networks(cls, networks: Iterable[Network]) -> "CrawlerIPIndex":
+        v4: List[Tuple[int, int]] = []
+        v6: List[Tuple[int, int]] = []
+        for net in networks:
+            bounds = (int(net.network_address), int(net.broadcast_address))
+            (v4 if net.version == 4 else v6).append(bounds)
+        return cls(_merge(v4), _merge(v6))
+
+    @classmethod
+    def from_payloads(cls, *payloads: Any) -> "CrawlerIPIndex":
+        return cls.from_networks(net for payload in payloads for net in networks_from_payload(payload))
+
+    def __len__(self) -> int:
+        """Number of merged intervals."""
+        return len(self.v4_starts) + len(self.v6_starts)
+
+    def __repr__(self) -> str:
+        return f"CrawlerIPIndex({len(self.v4_starts)} IPv4 + {len(self.v6_starts)} IPv6 intervals)"
+
+    def __contains__(self, ip: object) -> bool:
+        if isinstance(ip, str):
+            try:
+                if ":" in ip:
+                    value = int.from_bytes(_inet_pton(_AF_INET6, ip), "big")
+                    if not _MAPPED_LO <= value <= _MAPPED_HI:
+                        i = bisect_right(self.v6_starts, value) - 1
+                        return i >= 0 and value <= self.v6_ends[i]
+                    value -= _MAPPED_LO
+                else:
+                    value = _unpack_v4(_inet_pton(_AF_INET, ip))[0]
+            except OSError:  # not an IP address (e.g. a spoofed forwarding header)
+                return False
+            i = bisect_right(self.v4_starts, value) - 1
+            return i >= 0 and value <= self.v4_ends[i]
+        if isinstance(ip, ipaddress.IPv6Address):
+            mapped = ip.ipv4_mapped
+            if mapped is None:
+                value = int(ip)
+                i = bisect_right(self.v6_starts, value) - 1
+                return i >= 0 and value <= self.v6_ends[i]
+            ip = mapped
+        if isinstance(ip, (int, ipaddress.IPv4Address)) and not isinstance(ip, bool):
+            value = int(ip)
+            if not 0 <= value <= 0xFFFF_FFFF:
+                return False
+            i = bisect_right(self.v4_starts, value) - 1
+            return i >= 0 and value <= self.v4_ends[i]
+        return False
+
+    def is_ahrefs_crawler(self, ip: IPLike) -> bool:
+        """True if `ip` (text, IPv4 int or ipaddress object) is in a published crawler range."""
+        return ip in self
+
+    # ---------------
+    # Snapshots
+    # ---------------
+    def to_json(self) -> dict:
+        return {
+            "version": SNAPSHOT_VERSION,
+            "built_at": self.built_at,
+            "ipv4": [self.v4_starts, self.v4_ends],
+            # 128-bit bounds as hex strings, JSON numbers are not portable at that size
+            "ipv6": [[format(v, "x") for v in self.v6_starts], [format(v, "x") for v in self.v6_ends]],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "CrawlerIPIndex":
+        if data.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported crawler IP snapshot version {data.get('version')!r}")
+        v6_starts, v6_ends = data["ipv6"]
+        return cls(
+            (data["ipv4"][0], data["ipv4"][1]),
+            ([int(v, 16) for v in v6_starts], [int(v, 16) for v in v6_ends]),
+            built_at=data.get("built_at", 0.0),
+        )
+
+    def save(self, path: str) -> None:
+        """Write the snapshot atomically (temp file + rename)."""
+        tmp = f"{path}.tmp.{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(self.to_json(), fh, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "CrawlerIPIndex":
+        with open(path, encoding="utf-8") as fh:
+            return cls.from_json(json.load(fh))
+
+
+class CrawlerIPVerifier:
+    """
+    Keeps a `CrawlerIPIndex` built from the client's public crawler endpoints.
+
+    Lookups read `self.index` without locking; refreshes build a new index and
+    replace the reference, so readers always see either the old or the new
+    table. A failed refresh keeps serving the previous index.
+    """
+
+    def __init__(self, client: Any, *, snapshot_path: Optional[str] = None, refresh_interval_s: float = 6 * 3600.0) -> None:
+        self.client = client
+        self.snapshot_path = snapshot_path
+        self.refresh_interval_s = refresh_interval_s
+        # never built: stale from the start, so the first refresh runs right away
+        self.index = CrawlerIPIndex(built_at=0.0)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        if snapshot_path and os.path.exists(snapshot_path):
+            try:
+                self.index = CrawlerIPIndex.load(snapshot_path)
+            except (OSError, ValueError, KeyError) as exc:
+                logger.warning("ignoring unreadable crawler IP snapshot %s: %s", snapshot_path, exc)
+
+    def is_ahrefs_crawler(self, ip: IPLike) -> bool:
+        return ip in self.index
+
+    @property
+    def stale(self) -> bool:
+        return time.time() - self.index.built_at >= self.refresh_interval_s
+
+    def refresh_once(self) -> CrawlerIPIndex:
+        index = CrawlerIPIndex.from_payloads(self.client.get_crawler_ip_ranges(), self.client.get_crawler_ip_addresses())
+        if not len(index):
+            raise ValueError("Ahrefs returned no crawler IP ranges; keeping the previous index")
+        self.index = index
+        if self.snapshot_path:
+            index.save(self.snapshot_path)
+        return index
+
+    def _run(self) -> None:
+        # a fresh snapshot from the previous process is good until it ages out
+        if not self.stale:
+            self._stop.wait(self.refresh_interval_s - (time.time() - self.index.built_at))
+        while not self._stop.is_set():
+            try:
+                self.refresh_once()
+            except Exception:  # keep the last good index after transient upstream failures
+                logger.exception("ahrefs crawler IP refresh failed")
+            self._stop.wait(self.refresh_interval_s)
+
+    def start(self) -> "CrawlerIPVerifier":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="ahrefs-crawler-ips", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
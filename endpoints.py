@@ -0,0 +1,300 @@
+"""
+Declarative endpoint table.
+
+Every Ahrefs operation the SDK exposes is described once here. `client.py`
+generates the `AhrefsClient` methods from it, `api/handlers.py` the handlers and
+`api/routes.py` the `/ahrefs` routes, and per-endpoint policies (unit cost,
+cacheability, retry safety, pagination) are read from the same spec.
+"""
+from __future__ import annotations
+
+import contextvars
+import inspect
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+
+class EndpointCost(NamedTuple):
+    per_request: float
+    per_row: float = 0.0
+
+
+FREE = EndpointCost(0)
+
+# Annotations used for generated signatures; unlisted params are `str`
+_PARAM_TYPES: Dict[str, Any] = {
+    "limit": int,
+    "offset": int,
+    "metrics": Optional[List[str]],
+    "items": List[str],
+    "keywords": List[str],
+    "competitors": List[str],
+    "country": Optional[str],
+    "project_id": str,
+}
+
+Builder = Callable[[Dict[str, Any]], Tuple[str, Dict[str, Any]]]
+
+
+class EndpointSpec:
+    """
+    One upstream operation.
+
+    - `required`: keyword-only params that must be given
+    - `defaults`: params always sent, with their default values
+    - `optional`: params sent only when truthy; those in `joined` are comma-joined lists
+    - `body`: params go into the JSON body instead of the query string
+    - `pagination`: "offset" when pages are addressed by limit/offset
+    - `route`: "<METHOD> <path>" under `/ahrefs`, with `model` the request model in `api/_requests.py`
+    - `select`: upstream param taking a comma-separated field list, when the endpoint supports one
+    """
+
+    __slots__ = (
+        "name", "op", "method", "path", "required", "defaults", "optional", "joined", "body",
+        "pagination", "cost", "cacheable", "idempotent", "route", "model", "select", "doc", "build",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        path: str,
+        *,
+        op: Optional[str] = None,
+        required: Tuple[str, ...] = (),
+        defaults: Tuple[Tuple[str, Any], ...] = (),
+        optional: Tuple[str, ...] = (),
+        joined: Tuple[str, ...] = (),
+        body: bool = False,
+        pagination: Optional[str] = None,
+        cost: Optional[EndpointCost] = None,
+        cacheable: Optional[bool] = None,
+        idempotent: Optional[bool] = None,
+        route: Optional[str] = None,
+        model: Optional[str] = None,
+        select: Optional[str] = None,
+        doc: str = "",
+    ) -> None:
+        self.name = name
+        # short operation name, used for handler names and by-name dispatch
+        self.op = op or name.split("_", 1)[1]
+        self.method = method
+        self.path = path
+        self.required = required
+        self.defaults = defaults
+        self.optional = optional
+        self.joined = joined
+        self.body = body
+        self.pagination = pagination
+        self.cost = cost
+        self.cacheable = method == "GET" if cacheable is None else cacheable
+        self.idempotent = method in ("GET", "PUT") if idempotent is None else idempotent
+        self.route = route
+        self.model = model
+        self.select = select
+        self.doc = doc
+        self.build = _compile_builder(self)
+
+    @property
+    def handler_name(self) -> str:
+        return f"handle_{self.op}"
+
+    def signature(self) -> inspect.Signature:
+        kw = inspect.Parameter.KEYWORD_ONLY
+        params = [inspect.Parameter("self", inspect.Parameter.POSITIONAL_OR_KEYWORD)]
+        params += [inspect.Parameter(n, kw, annotation=_PARAM_TYPES.get(n, str)) for n in self.required]
+        params += [inspect.Parameter(n, kw, default=d, annotation=_PARAM_TYPES.get(n, type(d))) for n, d in self.defaults]
+        params += [inspect.Parameter(n, kw, default=None, annotation=_PARAM_TYPES.get(n, Optional[str])) for n in self.optional]
+        params.append(inspect.Parameter("fields", kw, default=None, annotation=Optional[List[str]]))
+        params.append(inspect.Parameter("priority", kw, default=None, annotation=Optional[str]))
+        params.append(inspect.Parameter("extra", inspect.Parameter.VAR_KEYWORD, annotation=Any))
+        return inspect.Signature(params, return_annotation=Dict[str, Any])
+
+    def __repr__(self) -> str:
+        return f"EndpointSpec({self.name!r}, {self.method!r}, {self.path!r})"
+
+
+def _compile_builder(spec: EndpointSpec) -> Builder:
+    """Precompute a params builder: kwargs -> (path, params-or-body)."""
+    name = spec.name
+    default_path = spec.path
+    required = spec.required
+    defaults = spec.defaults
+    optional = spec.optional
+    joined = frozenset(spec.joined)
+
+    def build(kwargs: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        extra = dict(kwargs)
+        # vendor path override, as supported by the original helpers
+        path = extra.pop("path", default_path)
+        out: Dict[str, Any] = {}
+        for key in required:
+            try:
+                out[key] = extra.pop(key)
+            except KeyError:
+                raise TypeError(f"{name}() missing required keyword-only argument: {key!r}") from None
+        for key, default in defaults:
+            out[key] = extra.pop(key, default)
+        for key in optional:
+            value = extra.pop(key, None)
+            if value:
+                out[key] = ",".join(value) if key in joined else value
+        out.update(extra)
+        return path, out
+
+    return build
+
+
+_PAGE = (("limit", 100), ("offset", 0))
+
+
+def _site_explorer(name: str, op_path: str, param: str = "target", **kw: Any) -> EndpointSpec:
+    return EndpointSpec(
+        name, "GET", f"/site-explorer/{op_path}", required=(param,),
+        route=f"POST /site-explorer/{op_path}", model=kw.pop("model", None), select="select", **kw,
+    )
+
+
+def _category(name: str, path: str, param: str, model: str, **kw: Any) -> EndpointSpec:
+    return EndpointSpec(name, "GET", path, required=(param,), route=f"POST {path}", model=model, **kw)
+
+
+ENDPOINTS: Tuple[EndpointSpec, ...] = (
+    # v1
+    EndpointSpec("get_domain_metrics", "GET", "/v1/domain/metrics", required=("domain",), optional=("metrics",), joined=("metrics",),
+                 route="POST /domain/metrics", model="DomainMetricsRequest"),
+    EndpointSpec("get_backlinks", "GET", "/v1/backlinks", required=("target",), defaults=_PAGE, pagination="offset",
+                 route="POST /backlinks", model="BacklinksRequest"),
+    EndpointSpec("get_referring_domains", "GET", "/v1/referring-domains", required=("target",), defaults=_PAGE, pagination="offset",
+                 route="POST /referring-domains", model="ReferringDomainsRequest"),
+    EndpointSpec("get_organic_keywords", "GET", "/v1/organic-keywords", required=("target",), optional=("country",), defaults=_PAGE,
+                 pagination="offset", route="POST /organic-keywords", model="OrganicKeywordsRequest"),
+    EndpointSpec("get_pages", "GET", "/v1/pages", required=("target",), defaults=_PAGE, pagination="offset",
+                 route="POST /pages", model="PagesRequest"),
+    # Site Explorer
+    _site_explorer("get_domain_rating", "domain-rating", "domain", model="DomainRatingRequest"),
+    _site_explorer("get_backlinks_stats", "backlinks-stats", model="BacklinksStatsRequest"),
+    _site_explorer("get_outlinks_stats", "outlinks-stats", model="OutlinksStatsRequest"),
+    _site_explorer("get_metrics", "metrics", model="MetricsRequest"),
+    _site_explorer("get_refdomains_history", "refdomains-history", model="RefdomainsHistoryRequest"),
+    _site_explorer("get_domain_rating_history", "domain-rating-history", model="DomainRatingHistoryRequest"),
+    _site_explorer("get_url_rating_history", "url-rating-history", "url", model="UrlRatingHistoryRequest"),
+    _site_explorer("get_pages_history", "pages-history", model="PagesHistoryRequest"),
+    _site_explorer("get_metrics_history", "metrics-history", model="MetricsHistoryRequest"),
+    _site_explorer("get_keywords_history", "keywords-history", model="KeywordsHistoryRequest"),
+    _site_explorer("get_metrics_by_country", "metrics-by-country", optional=("country",), model="MetricsByCountryRequest"),
+    _site_explorer("get_pages_by_traffic", "pages-by-traffic", model="PagesByTrafficRequest"),
+    _site_explorer("get_total_search_volume_history", "total-search-volume-history", model="TotalSearchVolumeHistoryRequest"),
+    # Backlinks
+    _category("get_broken_backlinks", "/backlinks/broken", "target", "BacklinksRequest", pagination="offset"),
+    _category("get_refdomains", "/backlinks/refdomains", "target", "RefdomainsRequest", pagination="offset"),
+    _category("get_anchors", "/backlinks/anchors", "target", "AnchorsRequest", pagination="offset"),
+    # Organic search
+    _category("get_organic_competitors", "/organic/competitors", "target", "OrganicCompetitorsRequest", pagination="offset"),
+    _category("get_top_pages", "/organic/top-pages", "target", "TopPagesRequest", pagination="offset"),
+    # Paid search
+    _category("get_paid_pages", "/paid/pages", "target", "PaidPagesRequest", pagination="offset"),
+    # Pages
+    _category("get_best_by_external_links", "/pages/best-by-external-links", "target", "BestByExternalLinksRequest", pagination="offset"),
+    _category("get_best_by_internal_links", "/pages/best-by-internal-links", "target", "BestByInternalLinksRequest", pagination="offset"),
+    # Outgoing links
+    _category("get_linked_domains", "/outgoing/linked-domains", "target", "LinkedDomainsRequest", pagination="offset"),
+    _category("get_outgoing_external_anchors", "/outgoing/external-anchors", "target", "OutgoingExternalAnchorsRequest", pagination="offset"),
+    _category("get_outgoing_internal_anchors", "/outgoing/internal-anchors", "target", "OutgoingInternalAnchorsRequest", pagination="offset"),
+    # Keywords Explorer
+    _category("get_keywords_overview", "/keywords-explorer/overview", "query", "KeywordsOverviewRequest", select="select"),
+    _category("get_keywords_volume_history", "/keywords-explorer/volume-history", "query", "KeywordsVolumeHistoryRequest", select="select"),
+    _category("get_keywords_volume_by_country", "/keywords-explorer/volume-by-country", "query", "KeywordsVolumeByCountryRequest", select="select",
+              optional=("country",)),
+    _category("get_matching_terms", "/keywords-explorer/matching-terms", "query", "MatchingTermsRequest", select="select", pagination="offset"),
+    _category("get_related_terms", "/keywords-explorer/related-terms", "query", "RelatedTermsRequest", select="select", pagination="offset"),
+    _category("get_search_suggestions", "/keywords-explorer/search-suggestions", "query", "SearchSuggestionsRequest", select="select", pagination="offset"),
+    # Rank Tracker
+    _category("get_rank_tracker_overview", "/rank-tracker/overview", "target", "RankTrackerOverviewRequest"),
+    # Overview group
+    EndpointSpec("get_overview", "GET", "/overview/overview", required=("target",), route="GET /overview/overview", model="OverviewRequest"),
+    EndpointSpec("get_competitors_overview", "GET", "/overview/competitors-overview", required=("target",),
+                 route="GET /overview/competitors-overview", model="CompetitorsOverviewRequest"),
+    EndpointSpec("get_competitors_pages", "GET", "/overview/competitors-pages", required=("target",), pagination="offset",
+                 route="GET /overview/competitors-pages", model="CompetitorsPagesRequest"),
+    # SERP Overview
+    EndpointSpec("get_serp_overview", "GET", "/serp/overview", required=("query",), route="GET /serp/overview", model="SerpOverviewRequest",
+                 select="select"),
+    # Batch Analysis: POST, but a read, so safe to retry and cache
+    EndpointSpec("post_batch_analysis", "POST", "/batch-analysis", required=("items",), body=True, idempotent=True, cacheable=True,
+                 cost=EndpointCost(50, 1), route="POST /batch-analysis", model="BatchAnalysisRequest"),
+    # Subscription Information
+    EndpointSpec("get_limits_and_usage", "GET", "/subscription/limits-and-usage", cost=FREE, cacheable=False,
+                 route="GET /subscription/limits-and-usage", model="LimitsAndUsageRequest"),
+    # Management: projects
+    EndpointSpec("get_projects", "GET", "/management/projects", op="projects", cost=FREE,
+                 route="GET /management/projects", model="ProjectsRequest"),
+    EndpointSpec("create_project", "POST", "/management/projects", op="create_project", required=("name", "target"), body=True, cost=FREE,
+                 route="POST /management/projects", model="CreateProjectRequest"),
+    # Management: keywords (the API uses PUT for delete)
+    EndpointSpec("get_keywords", "GET", "/management/keywords", op="keywords_get", required=("project_id",), cost=FREE,
+                 route="GET /management/keywords", model="KeywordsGetRequest"),
+    EndpointSpec("put_keywords", "PUT", "/management/keywords", op="keywords_put", required=("project_id", "keywords"), body=True, cost=FREE,
+                 route="PUT /management/keywords", model="KeywordsPutRequest"),
+    EndpointSpec("delete_keywords", "PUT", "/management/keywords/delete", op="keywords_delete", required=("project_id", "keywords"), body=True,
+                 cost=FREE, route="PUT /management/keywords/delete", model="KeywordsDeleteRequest"),
+    # Management: competitors
+    EndpointSpec("get_competitors", "GET", "/management/competitors", op="competitors_get", required=("project_id",), cost=FREE,
+                 route="GET /management/competitors", model="CompetitorsGetRequest"),
+    EndpointSpec("add_competitors", "POST", "/management/competitors", op="competitors_add", required=("project_id", "competitors"), body=True,
+                 cost=FREE, route="POST /management/competitors", model="CompetitorsAddRequest"),
+    EndpointSpec("delete_competitors", "POST", "/management/competitors/delete", op="competitors_delete", required=("project_id", "competitors"),
+                 body=True, cost=FREE, route="POST /management/competitors/delete", model="CompetitorsDeleteRequest"),
+    # Management: locations, keyword lists
+    EndpointSpec("get_locations_and_languages", "GET", "/management/locations-and-languages", cost=FREE,
+                 route="GET /management/locations-and-languages", model="LocationsAndLanguagesRequest"),
+    EndpointSpec("get_keyword_lists", "GET", "/management/keyword-lists", optional=("project_id",), cost=FREE,
+                 route="GET /management/keyword-lists", model="KeywordListsRequest"),
+    # Public
+    EndpointSpec("get_crawler_ip_addresses", "GET", "/public/crawler-ip-addresses", cost=FREE,
+                 route="GET /public/crawler-ip-addresses", model="CrawlerIpAddressesRequest"),
+    EndpointSpec("get_crawler_ip_ranges", "GET", "/public/crawler-ip-ranges", cost=FREE,
+                 route="GET /public/crawler-ip-ranges", model="CrawlerIpRangesRequest"),
+)
+
+BY_NAME: Dict[str, EndpointSpec] = {spec.name: spec for spec in ENDPOINTS}
+BY_OP: Dict[str, EndpointSpec] = {spec.op: spec for spec in ENDPOINTS}
+# Upstream paths that must never be replayed by the HTTP adapter's retries
+NON_IDEMPOTENT_PATHS = frozenset(spec.path for spec in ENDPOINTS if not spec.idempotent)
+
+# Set while a non-idempotent endpoint is sent, whichever path it goes to
+# (`path=` overrides the spec's); the adapters check it before any retry
+_single_attempt: contextvars.ContextVar[bool] = contextvars.ContextVar("ahrefs_single_attempt", default=False)
+
+
+@contextmanager
+def single_attempt() -> Iterator[None]:
+    """Send the requests made inside the block (in this thread or task) without transport retries."""
+    token = _single_attempt.set(True)
+    try:
+        yield
+    finally:
+        _single_attempt.reset(token)
+
+
+def replay_allowed(path: str) -> bool:
+    """Whether the transport may retry a request to `path` sent from the current context."""
+    return not _single_attempt.get() and path not in NON_IDEMPOTENT_PATHS
+
+
+def get_spec(name_or_op: str) -> EndpointSpec:
+    spec = BY_NAME.get(name_or_op) or BY_OP.get(name_or_op)
+    if spec is None:
+        raise KeyError(f"Unknown Ahrefs operation {name_or_op!r}")
+    return spec
+
+
+def extract_rows(data: Any) -> List[Any]:
+    """Rows of a response payload: its largest top-level list (unwrapping a `data` envelope)."""
+    if isinstance(data, list):
+        return data
+    if not isinstance(data, dict):
+        return []
+    if isinstance(data.get("data"), (dict, list)):
+        return extract_rows(data["data"])
+    return max((v for v in data.values() if isinstance(v, list)), key=len, default=[])
@@ -27,3 +27,41 @@ class AhrefsAPIError(AhrefsError):
         self.status_code = status_code
         self.response_text = response_text
         self.payload = payload or {}
+
+
+class AhrefsBudgetExceededError(AhrefsError):
+    def __init__(self, message: str = "API unit budget exceeded", *, estimate: float = 0.0, used: float = 0.0, limit: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.estimate = estimate
+        self.used = used
+        self.limit = limit
+
+
+class AhrefsCassetteMissError(AhrefsError):
+    def __init__(self, message: str = "No recorded interaction for request", *, key: Optional[str] = None) -> None:
+        super().__init__(message)
+        self.key = key
+
+
+class AhrefsResponseValidationError(AhrefsError):
+    def __init__(self, message: str = "Response does not match the expected shape", *, field: Optional[str] = None, value: Any = None) -> None:
+        super().__init__(message)
+        self.field = field
+        self.value = value
+
+
+class AhrefsBatchError(AhrefsAPIError):
+    """Some chunks of a chunked batch request still failed after retries; `payload` holds the merged partial result."""
+
+    def __init__(self, message: str, *, status_code: Optional[int] = None, payload: Optional[dict[str, Any]] = None, failed_items: Optional[list[Any]] = None, errors: Optional[list[BaseException]] = None) -> None:
+        super().__init__(message, status_code=status_code, payload=payload)
+        self.failed_items = failed_items or []
+        self.errors = errors or []
+
+
+class AhrefsKeyPoolExhaustedError(AhrefsAPIError):
+    """Every key of a `KeyPool` is ejected, cooling down or out of budget; `reasons` maps key fingerprints to why."""
+
+    def __init__(self, message: str, *, status_code: Optional[int] = 503, reasons: Optional[dict[str, str]] = None) -> None:
+        super().__init__(message, status_code=status_code)
+        self.reasons = reasons or {}
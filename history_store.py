@@ -0,0 +1,262 @@
+"""
+Incremental history sync backed by a local SQLite store.
+
+`HistoryStore` keeps every fetched history point, clustered by
+(endpoint, target, field, day) in a WITHOUT ROWID table, so reading one series
+is a single range scan. `HistorySync` sits in front of the client: the first
+read of a series downloads it in full; later reads only request the days after
+the last stored one (plus a small overlap, since Ahrefs revises the latest
+points) through `date_from`/`date_to`, and reads within `refresh_interval_s`
+of the last sync are answered from the store without any upstream call. A
+series first synced from an explicit `date_from` remembers where it starts;
+asking for earlier history later fetches the missing head.
+
+    sync = HistorySync(client, HistoryStore("ahrefs_history.sqlite3"))
+    dr = sync.get("get_domain_rating_history", "example.com")  # TimeSeries
+
+Extra params other than the date range (`country`, `mode`, ...) select a
+different series: each combination is stored and synced on its own, under
+`series_key(endpoint, extra)`.
+"""
+from __future__ import annotations
+
+import datetime as _dt
+import json
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .endpoints import extract_rows, get_spec
+from .metrics import REGISTRY, MetricsRegistry
+from .timeseries import HISTORY_ENDPOINTS, DateLike, TimeSeries, from_epoch_day, to_epoch_day
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS points (
+    endpoint TEXT NOT NULL,
+    target TEXT NOT NULL,
+    field TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    value REAL,
+    PRIMARY KEY (endpoint, target, field, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sync_state (
+    endpoint TEXT NOT NULL,
+    target TEXT NOT NULL,
+    last_day INTEGER,
+    synced_at REAL NOT NULL,
+    fields TEXT NOT NULL DEFAULT '',
+    from_day INTEGER,
+    PRIMARY KEY (endpoint, target)
+) WITHOUT ROWID;
+"""
+
+
+class HistoryStore:
+    """Append/upsert-only store of history points. Safe to share between threads."""
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(sync_state)")]
+        if "from_day" not in columns:  # stores written before the synced range was tracked
+            self._conn.execute("ALTER TABLE sync_state ADD COLUMN from_day INTEGER")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def append(
+        self,
+        endpoint: str,
+        target: str,
+        points: Iterable[Tuple[str, int, Optional[float]]],
+        *,
+        last_day: Optional[int],
+        fields: Iterable[str],
+        from_day: Optional[int] = None,
+    ) -> int:
+        """
+        Upsert (field, day, value) points and record the sync; returns the number
+        of points written. `from_day` is the first day the fetch asked for (None:
+        the start of the history); the series' synced range grows to cover it.
+        """
+        rows = [(endpoint, target, field, day, value) for field, day, value in points]
+        now = time.time()
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN")
+            try:
+                conn.executemany("INSERT OR REPLACE INTO points VALUES (?, ?, ?, ?, ?)", rows)
+                known = self._fields_locked(endpoint, target)
+                merged = known + [f for f in fields if f not in known]
+                conn.execute(
+                    "INSERT INTO sync_state (endpoint, target, last_day, synced_at, fields, from_day) VALUES (?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (endpoint, target) DO UPDATE SET "
+                    "last_day = MAX(COALESCE(sync_state.last_day, excluded.last_day), COALESCE(excluded.last_day, sync_state.last_day)), "
+                    "synced_at = excluded.synced_at, fields = excluded.fields, "
+                    # NULL is the start of the history, so it wins
+                    "from_day = CASE WHEN sync_state.from_day IS NULL OR excluded.from_day IS NULL THEN NULL "
+                    "ELSE MIN(sync_state.from_day, excluded.from_day) END",
+                    (endpoint, target, last_day, now, ",".join(merged), from_day),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def state(self, endpoint: str, target: str) -> Optional[Tuple[Optional[int], float, Optional[int]]]:
+        """
+        (last stored epoch day, unix time of the last sync, first synced epoch day
+        or None when synced from the start of the history), or None if never synced.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_day, synced_at, from_day FROM sync_state WHERE endpoint = ? AND target = ?", (endpoint, target)
+            ).fetchone()
+        return (row[0], row[1], row[2]) if row else None
+
+    def fields(self, endpoint: str, target: str) -> List[str]:
+        with self._lock:
+            return self._fields_locked(endpoint, target)
+
+    def _fields_locked(self, endpoint: str, target: str) -> List[str]:
+        row = self._conn.execute("SELECT fields FROM sync_state WHERE endpoint = ? AND target = ?", (endpoint, target)).fetchone()
+        return [f for f in row[0].split(",") if f] if row else []
+
+    def read(self, endpoint: str, target: str, field: str, *, start: Optional[DateLike] = None, end: Optional[DateLike] = None) -> TimeSeries:
+        lo = to_epoch_day(start) if start is not None else -(1 << 62)
+        hi = to_epoch_day(end) if end is not None else 1 << 62
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT day, value FROM points WHERE endpoint = ? AND target = ? AND field = ? AND day BETWEEN ? AND ? ORDER BY day",
+                (endpoint, target, field, lo, hi),
+            ).fetchall()
+        days = array("q", (r[0] for r in rows))
+        values = array("d", (float("nan") if r[1] is None else r[1] for r in rows))
+        return TimeSeries(days, values, name=target)
+
+
+# Params that bound the fetched range rather than select a series
+_RANGE_PARAMS = ("date_from", "date_to")
+
+
+def series_key(endpoint: str, extra: Dict[str, Any]) -> str:
+    """Store key of one series: the endpoint, plus a canonical JSON of the params selecting it."""
+    selecting = {k: v for k, v in extra.items() if k not in _RANGE_PARAMS and v is not None}
+    if not selecting:
+        return endpoint
+    return f"{endpoint}?{json.dumps(selecting, sort_keys=True, separators=(',', ':'), default=str)}"
+
+
+def _numeric_points(payload: Any) -> Tuple[List[Tuple[str, int, Optional[float]]], List[str], Optional[int]]:
+    """Flatten a history payload into (field, day, value) points, its fields, and the latest day."""
+    points: List[Tuple[str, int, Optional[float]]] = []
+    fields: List[str] = []
+    last: Optional[int] = None
+    for row in extract_rows(payload):
+        if not isinstance(row, dict) or "date" not in row:
+            continue
+        day = to_epoch_day(row["date"])
+        last = day if last is None or day > last else last
+        for key, value in row.items():
+            if key == "date" or isinstance(value, bool) or not isinstance(value, (int, float, type(None))):
+                continue
+            if key not in fields:
+                fields.append(key)
+            points.append((key, day, None if value is None else float(value)))
+    return points, fields, last
+
+
+class HistorySync:
+    """
+    Serve `*-history` series from a `HistoryStore`, fetching only the missing
+    range from Ahrefs. Store hits and misses are reported as the
+    `history_store` cache in the metrics registry.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        store: HistoryStore,
+        *,
+        refresh_interval_s: float = 3600.0,
+        overlap_days: int = 2,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        self.client = client
+        self.store = store
+        self.refresh_interval_s = refresh_interval_s
+        self.overlap_days = overlap_days
+        self.metrics = metrics or REGISTRY
+        self._locks: Dict[Tuple[str, str], threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock_for(self, key: Tuple[str, str]) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def sync(self, name: str, target: str, *, force: bool = False, **extra: Any) -> int:
+        """Bring the stored series up to date; returns the number of points fetched (0 when fresh)."""
+        spec = get_spec(name)
+        if spec.name not in HISTORY_ENDPOINTS:
+            raise ValueError(f"{spec.name} is not a history endpoint")
+        endpoint = spec.name
+        series = series_key(endpoint, extra)
+        wanted_from = to_epoch_day(extra["date_from"]) if extra.get("date_from") else None
+        with self._lock_for((series, target)):
+            state = self.store.state(series, target)
+            # an earlier sync started later than this caller wants: the head is missing
+            head_missing = state is not None and state[2] is not None and (wanted_from is None or wanted_from < state[2])
+            fresh = state is not None and not force and time.time() - state[1] < self.refresh_interval_s
+            if fresh and not head_missing:
+                self.metrics.record_cache("history_store", True)
+                return 0
+            self.metrics.record_cache("history_store", False)
+            fetched = 0
+            if head_missing:
+                head = {k: v for k, v in extra.items() if k != "date_to"}
+                head["date_to"] = from_epoch_day(state[2]).isoformat()  # type: ignore[index]
+                fetched += self._fetch(endpoint, series, target, head)
+            if not fresh:
+                params: Dict[str, Any] = dict(extra)
+                if state is not None and state[0] is not None:
+                    params["date_from"] = from_epoch_day(state[0] - self.overlap_days).isoformat()
+                    params.setdefault("date_to", _dt.date.today().isoformat())
+                fetched += self._fetch(endpoint, series, target, params)
+            return fetched
+
+    def _fetch(self, endpoint: str, series: str, target: str, params: Dict[str, Any]) -> int:
+        spec = get_spec(endpoint)
+        payload = getattr(self.client, endpoint)(**{**params, spec.required[0]: target})
+        points, fields, last = _numeric_points(payload)
+        from_day = to_epoch_day(params["date_from"]) if params.get("date_from") else None
+        return self.store.append(series, target, points, last_day=last, fields=fields, from_day=from_day)
+
+    def get(
+        self,
+        name: str,
+        target: str,
+        *,
+        field: Optional[str] = None,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+        **extra: Any,
+    ) -> TimeSeries:
+        """Series for `target` after an incremental sync; `field` defaults to the first numeric field."""
+        endpoint = get_spec(name).name
+        self.sync(endpoint, target, **extra)
+        series = series_key(endpoint, extra)
+        if field is None:
+            fields = self.store.fields(series, target)
+            if not fields:
+                return TimeSeries(array("q"), array("d"), name=target)
+            field = fields[0]
+        return self.store.read(series, target, field, start=start, end=end)
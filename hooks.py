@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+BEFORE_ACQUIRE = "before_acquire"
+AFTER_ACQUIRE = "after_acquire"
+BEFORE_SEND = "before_send"
+AFTER_HEADERS = "after_headers"
+AFTER_BODY = "after_body"
+AFTER_DECODE = "after_decode"
+ON_ERROR = "on_error"
+
+PHASES = (BEFORE_ACQUIRE, AFTER_ACQUIRE, BEFORE_SEND, AFTER_HEADERS, AFTER_BODY, AFTER_DECODE, ON_ERROR)
+
+Hook = Callable[[str, "RequestTrace"], None]
+
+
+class RequestTrace:
+    """
+    Timeline of a single client request.
+
+    `marks` maps each phase reached to a `time.perf_counter()` timestamp
+    (monotonic, seconds). Connection setup is not observable separately through
+    `requests`, so it is included in the `before_send` -> `after_headers` span.
+    """
+
+    __slots__ = ("method", "path", "marks", "status_code", "error")
+
+    def __init__(self, method: str, path: str) -> None:
+        self.method = method
+        self.path = path
+        self.marks: Dict[str, float] = {}
+        self.status_code: Optional[int] = None
+        self.error: Optional[BaseException] = None
+
+    def breakdown(self) -> Dict[str, float]:
+        """Seconds spent per phase: acquire, ttfb (incl. connect), body, decode and total."""
+        m = self.marks
+        spans = {
+            "acquire": (BEFORE_ACQUIRE, AFTER_ACQUIRE),
+            "ttfb": (BEFORE_SEND, AFTER_HEADERS),
+            "body": (AFTER_HEADERS, AFTER_BODY),
+            "decode": (AFTER_BODY, AFTER_DECODE),
+        }
+        out = {name: m[end] - m[start] for name, (start, end) in spans.items() if start in m and end in m}
+        if m:
+            out["total"] = max(m.values()) - min(m.values())
+        return out
+
+
+class HookRegistry:
+    """
+    Per-client registry of lifecycle hooks, called synchronously on the request thread.
+
+    Every request ends with exactly one terminal phase: `after_decode` once a
+    response body was decoded (including 4xx/5xx bodies), otherwise `on_error`.
+    """
+
+    def __init__(self) -> None:
+        self._hooks: Dict[str, List[Hook]] = {phase: [] for phase in PHASES}
+        self._count = 0
+
+    def register(self, phase: str, hook: Hook) -> Hook:
+        if phase not in self._hooks:
+            raise ValueError(f"Unknown hook phase {phase!r}; expected one of {', '.join(PHASES)}")
+        self._hooks[phase].append(hook)
+        self._count += 1
+        return hook
+
+    def unregister(self, phase: str, hook: Hook) -> None:
+        self._hooks[phase].remove(hook)
+        self._count -= 1
+
+    def __bool__(self) -> bool:
+        return self._count > 0
+
+    def emit(self, phase: str, trace: RequestTrace) -> None:
+        trace.marks[phase] = time.perf_counter()
+        for hook in self._hooks[phase]:
+            hook(phase, trace)
+
+
+class SlowRequestLogger:
+    """Log a sampled fraction of requests slower than `threshold_s`, with the phase breakdown."""
+
+    def __init__(self, *, threshold_s: float = 1.0, sample_rate: float = 1.0, logger: Optional[logging.Logger] = None) -> None:
+        self.threshold_s = threshold_s
+        self.sample_rate = sample_rate
+        self.logger = logger or logging.getLogger("ahrefs.slow_requests")
+
+    def install(self, client: Any) -> "SlowRequestLogger":
+        client.hooks.register(AFTER_DECODE, self)
+        client.hooks.register(ON_ERROR, self)
+        return self
+
+    def __call__(self, phase: str, trace: RequestTrace) -> None:
+        parts = trace.breakdown()
+        if parts.get("total", 0.0) < self.threshold_s:
+            return
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        detail = " ".join(f"{k}={v:.4f}s" for k, v in parts.items())
+        self.logger.warning(
+            "slow ahrefs request %s %s status=%s %s", trace.method, trace.path, trace.status_code, detail
+        )
+
+
+class OpenTelemetryHook:
+    """
+    Emit one span per request with an event per lifecycle phase.
+
+    Requires `opentelemetry-api`. Spans are created when the request finishes,
+    with start/end times back-dated from the recorded monotonic marks.
+    """
+
+    def __init__(self, tracer: Any = None, *, span_name: str = "ahrefs.request") -> None:
+        try:
+            from opentelemetry import trace as otel_trace
+            from opentelemetry.trace import Status, StatusCode
+        except ImportError as exc:  # pragma: no cover - optional dependency
+            raise ImportError("OpenTelemetryHook requires the 'opentelemetry-api' package") from exc
+        self._status = Status
+        self._status_code = StatusCode
+        self.tracer = tracer or otel_trace.get_tracer("ahrefs")
+        self.span_name = span_name
+        # offset converting perf_counter seconds to epoch nanoseconds
+        self._epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+
+    def install(self, client: Any) -> "OpenTelemetryHook":
+        client.hooks.register(AFTER_DECODE, self)
+        client.hooks.register(ON_ERROR, self)
+        return self
+
+    def _ns(self, t: float) -> int:
+        return int(t * 1e9) + self._epoch_offset_ns
+
+    def __call__(self, phase: str, trace: RequestTrace) -> None:
+        marks = trace.marks
+        span = self.tracer.start_span(
+            self.span_name,
+            start_time=self._ns(min(marks.values())),
+            attributes={"http.method": trace.method, "ahrefs.path": trace.path},
+        )
+        for name, t in sorted(marks.items(), key=lambda kv: kv[1]):
+            span.add_event(name, timestamp=self._ns(t))
+        if trace.status_code is not None:
+            span.set_attribute("http.status_code", trace.status_code)
+        if trace.error is not None:
+            span.record_exception(trace.error)
+            span.set_status(self._status(self._status_code.ERROR, str(trace.error)))
+        elif trace.status_code is not None and trace.status_code >= 400:
+            span.set_status(self._status(self._status_code.ERROR, f"HTTP {trace.status_code}"))
+        span.end(end_time=self._ns(max(marks.values())))
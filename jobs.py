@@ -0,0 +1,315 @@
+"""
+Long-running exports as background jobs, persisted in SQLite.
+
+A job pages through one offset-paginated endpoint (`client.paginate`) and
+appends its rows to a `JobStore`. Every `page_size` rows are written in the
+same transaction as the job's next offset, so a job interrupted by a restart
+resumes where its last page ended instead of starting over. `JobRunner` runs
+jobs on a bounded pool of worker threads, in the bulk lane (scheduler.py) so
+exports never crowd out interactive calls on the same key.
+
+    runner = JobRunner(JobStore("ahrefs_jobs.sqlite3"), max_workers=2)
+    job = runner.submit(client, "default", "backlinks", {"target": "example.com"}, max_rows=50_000)
+    runner.store.get(job.id).status  # "queued", "running", "done", "failed" or "cancelled"
+    rows = runner.store.iter_rows(job.id)
+
+Jobs store their owner (`tenant`) but never the API key. After a restart,
+`recover(client_for)` restarts the unfinished jobs of every tenant it can
+get a client for; the others resume on `resume(tenant, client)`, e.g. when
+their owner next asks for them.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set
+
+from .endpoints import get_spec
+from .metrics import JOBS_FINISHED, JOBS_ROWS, JOBS_RUNNING, REGISTRY, MetricsRegistry
+from .scheduler import BULK, lane
+
+if TYPE_CHECKING:
+    from .client import AhrefsClient
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+ACTIVE = (QUEUED, RUNNING)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    tenant TEXT NOT NULL,
+    op TEXT NOT NULL,
+    params TEXT NOT NULL,
+    page_size INTEGER NOT NULL,
+    max_rows INTEGER,
+    status TEXT NOT NULL,
+    rows INTEGER NOT NULL DEFAULT 0,
+    next_offset INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_by_tenant ON jobs (tenant, created_at);
+CREATE TABLE IF NOT EXISTS job_rows (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    row TEXT NOT NULL,
+    PRIMARY KEY (job_id, seq)
+) WITHOUT ROWID;
+"""
+
+_COLUMNS = "id, tenant, op, params, page_size, max_rows, status, rows, next_offset, error, created_at, updated_at"
+
+
+class Job(NamedTuple):
+    id: str
+    tenant: str
+    op: str
+    params: Dict[str, Any]
+    page_size: int
+    max_rows: Optional[int]
+    status: str
+    rows: int
+    next_offset: int
+    error: Optional[str]
+    created_at: float
+    updated_at: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public view of the job (without the owner)."""
+        data = self._asdict()
+        del data["tenant"]
+        return data
+
+
+def _job(row: Any) -> Job:
+    return Job(row[0], row[1], row[2], json.loads(row[3]), *row[4:])
+
+
+class JobStore:
+    """Jobs and their result rows. Safe to share between threads."""
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def create(self, tenant: str, op: str, params: Dict[str, Any], *, page_size: int, max_rows: Optional[int] = None, offset: int = 0) -> Job:
+        now = time.time()
+        job = Job(uuid.uuid4().hex, tenant, op, params, page_size, max_rows, QUEUED, 0, offset, None, now, now)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO jobs ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job.id, tenant, op, json.dumps(params, sort_keys=True), page_size, max_rows, QUEUED, 0, offset, None, now, now),
+            )
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job(row) if row else None
+
+    def list(self, tenant: Optional[str] = None, statuses: Iterable[str] = ()) -> List[Job]:
+        """Jobs, oldest first, optionally of one tenant and/or in some statuses."""
+        sql = f"SELECT {_COLUMNS} FROM jobs WHERE 1 = 1"
+        args: List[Any] = []
+        if tenant is not None:
+            sql += " AND tenant = ?"
+            args.append(tenant)
+        statuses = tuple(statuses)
+        if statuses:
+            sql += f" AND status IN ({','.join('?' * len(statuses))})"
+            args.extend(statuses)
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY created_at", args).fetchall()
+        return [_job(row) for row in rows]
+
+    def transition(self, job_id: str, from_statuses: Iterable[str], status: str, *, error: Optional[str] = None) -> bool:
+        """Move the job to `status` if it is in one of `from_statuses`; False otherwise."""
+        current = tuple(from_statuses)
+        with self._lock:
+            cur = self._conn.execute(
+                f"UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ? AND status IN ({','.join('?' * len(current))})",
+                (status, error, time.time(), job_id, *current),
+            )
+        return cur.rowcount == 1
+
+    def append_rows(self, job_id: str, rows: List[Any], next_offset: int) -> bool:
+        """
+        Store a page of rows and the offset to resume from, atomically. False
+        (and nothing written) when the job is no longer running, e.g. cancelled.
+        """
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT status, rows FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                if row is None or row[0] != RUNNING:
+                    conn.execute("ROLLBACK")
+                    return False
+                start = row[1]
+                conn.executemany(
+                    "INSERT OR REPLACE INTO job_rows VALUES (?, ?, ?)",
+                    ((job_id, start + i, json.dumps(r, separators=(",", ":"))) for i, r in enumerate(rows)),
+                )
+                conn.execute(
+                    "UPDATE jobs SET rows = ?, next_offset = ?, updated_at = ? WHERE id = ?",
+                    (start + len(rows), next_offset, time.time(), job_id),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return True
+
+    def iter_lines(self, job_id: str, *, chunk: int = 1000) -> Iterator[str]:
+        """The job's rows as JSON lines, in order, read `chunk` rows at a time."""
+        seq = -1
+        while True:
+            with self._lock:
+                batch = self._conn.execute(
+                    "SELECT seq, row FROM job_rows WHERE job_id = ? AND seq > ? ORDER BY seq LIMIT ?", (job_id, seq, chunk)
+                ).fetchall()
+            for seq, line in batch:
+                yield line
+            if len(batch) < chunk:
+                return
+
+    def iter_rows(self, job_id: str, *, chunk: int = 1000) -> Iterator[Any]:
+        return (json.loads(line) for line in self.iter_lines(job_id, chunk=chunk))
+
+    def delete(self, job_id: str) -> bool:
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN")
+            conn.execute("DELETE FROM job_rows WHERE job_id = ?", (job_id,))
+            deleted = conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,)).rowcount
+            conn.execute("COMMIT")
+        return deleted == 1
+
+
+class JobRunner:
+    """
+    Run export jobs from a `JobStore` on at most `max_workers` threads; jobs
+    beyond that wait in the pool's queue (status "queued").
+    """
+
+    def __init__(self, store: JobStore, *, max_workers: int = 2, metrics: Optional[MetricsRegistry] = None) -> None:
+        self.store = store
+        self.metrics = metrics or REGISTRY
+        self._pool = ThreadPoolExecutor(max_workers=max(max_workers, 1), thread_name_prefix="ahrefs-jobs")
+        self._lock = threading.Lock()
+        self._scheduled: Set[str] = set()
+
+    def submit(
+        self,
+        client: "AhrefsClient",
+        tenant: str,
+        op: str,
+        params: Dict[str, Any],
+        *,
+        page_size: int = 1000,
+        max_rows: Optional[int] = None,
+    ) -> Job:
+        """Validate and queue an export of `op` (any offset-paginated endpoint)."""
+        spec = get_spec(op)
+        if spec.pagination != "offset":
+            raise ValueError(f"{spec.name} is not paginated")
+        params = dict(params)
+        offset = int(params.pop("offset", 0) or 0)
+        params.pop("limit", None)
+        missing = [name for name in spec.required if params.get(name) in (None, "")]
+        if missing:
+            raise ValueError(f"{spec.name} requires {', '.join(missing)}")
+        job = self.store.create(tenant, spec.op, params, page_size=page_size, max_rows=max_rows, offset=offset)
+        self._schedule(job.id, client)
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Stop a queued or running job; rows already stored are kept."""
+        return self.store.transition(job_id, ACTIVE, CANCELLED)
+
+    def recover(self, client_for: Callable[[str], Optional["AhrefsClient"]]) -> int:
+        """Restart unfinished jobs after a restart; returns how many were rescheduled."""
+        count = 0
+        for job in self.store.list(statuses=ACTIVE):
+            client = client_for(job.tenant)
+            if client is not None and self._schedule(job.id, client):
+                count += 1
+        return count
+
+    def resume(self, tenant: str, client: "AhrefsClient") -> int:
+        """Restart `tenant`'s unfinished jobs that are not scheduled yet."""
+        return sum(self._schedule(job.id, client) for job in self.store.list(tenant, ACTIVE))
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _schedule(self, job_id: str, client: "AhrefsClient") -> bool:
+        with self._lock:
+            if job_id in self._scheduled:
+                return False
+            self._scheduled.add(job_id)
+        self._pool.submit(self._run, job_id, client)
+        return True
+
+    def _run(self, job_id: str, client: "AhrefsClient") -> None:
+        try:
+            job = self.store.get(job_id)
+            if job is None or not self.store.transition(job_id, ACTIVE, RUNNING):
+                return
+            self.metrics.gauge_add(JOBS_RUNNING, (), 1)
+            try:
+                status = self._export(job, client)
+            finally:
+                self.metrics.gauge_add(JOBS_RUNNING, (), -1)
+            self.metrics.inc(JOBS_FINISHED, (("op", job.op), ("status", status)))
+        finally:
+            with self._lock:
+                self._scheduled.discard(job_id)
+
+    def _export(self, job: Job, client: "AhrefsClient") -> str:
+        labels = (("op", job.op),)
+        offset = job.next_offset
+        remaining = job.max_rows - job.rows if job.max_rows is not None else None
+        page: List[Any] = []
+        try:
+            with lane(BULK):  # pool threads don't inherit the caller's lane
+                rows = client.paginate(job.op, page_size=job.page_size, max_rows=remaining, offset=offset, **job.params)
+                for row in rows:
+                    page.append(row)
+                    if len(page) >= job.page_size:
+                        offset += len(page)
+                        if not self.store.append_rows(job.id, page, offset):
+                            return CANCELLED
+                        self.metrics.inc(JOBS_ROWS, labels, len(page))
+                        page = []
+            if page:
+                offset += len(page)
+                if not self.store.append_rows(job.id, page, offset):
+                    return CANCELLED
+                self.metrics.inc(JOBS_ROWS, labels, len(page))
+        except Exception as exc:
+            logger.warning("Export job %s (%s) failed: %s", job.id, job.op, exc)
+            self.store.transition(job.id, (RUNNING,), FAILED, error=str(exc))
+            return FAILED
+        return DONE if self.store.transition(job.id, (RUNNING,), DONE) else CANCELLED
@@ -0,0 +1,249 @@
+"""
+Several Ahrefs API keys behind one client.
+
+`KeyPool` holds one `PooledKey` per key, each with its own rate limiter and
+optional monthly unit budget. Every request goes to the least-loaded healthy
+key: fewest requests in flight (including ones waiting for that key's limiter)
+relative to its rate limit, then the lowest share of its budget used, then the
+fewest requests so far relative to its rate limit (so sequential calls rotate). Keys
+leave the rotation when upstream rejects them:
+
+- 401/403: the key is ejected until `restore()` (revoked or mistyped keys stay out)
+- 429 after the transport's own retries: the key cools down for `cooldown_s`
+- 402, or its local `monthly_units` reached: ejected for `quota_cooldown_s`
+
+The request that hit a rejected key is retried once on each remaining key, so
+callers only see an error when no healthy key is left
+(`AhrefsKeyPoolExhaustedError`, a 503). With N keys of equal limits, aggregate
+throughput is N times a single key's.
+
+With `priority_lanes=True` each key's limiter sits behind its own
+`PriorityScheduler`, so `lane()`/`priority=` order requests on every key as
+they do on a single one.
+
+`AHREFS_API_KEYS` configures the pool from the environment (see `parse_keys`).
+"""
+from __future__ import annotations
+
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, TypeVar, Union
+
+from .errors import AhrefsAPIError, AhrefsAuthError, AhrefsKeyPoolExhaustedError, AhrefsRateLimitError
+from .metrics import KEY_POOL_EJECTIONS, KEY_POOL_REQUESTS, REGISTRY, MetricsRegistry
+from .rate_limiter import RateLimiter
+from .scheduler import PriorityScheduler
+from .units import LEDGER, UnitLedger, key_fingerprint
+
+T = TypeVar("T")
+
+AUTH = "auth"
+RATE_LIMITED = "rate_limited"
+QUOTA = "quota"
+
+
+class KeySpec(NamedTuple):
+    api_key: str
+    rate_limit_per_min: Optional[int] = None  # None: the pool default
+    monthly_units: Optional[float] = None
+
+
+def parse_keys(value: str) -> List[KeySpec]:
+    """
+    Keys from "key1,key2:600,key3:600:200000": each entry is `key[:rate_per_min[:monthly_units]]`,
+    empty parts falling back to the pool defaults.
+    """
+    specs = []
+    for entry in value.split(","):
+        parts = entry.strip().split(":")
+        if not parts[0]:
+            continue
+        rate = int(parts[1]) if len(parts) > 1 and parts[1] else None
+        units = float(parts[2]) if len(parts) > 2 and parts[2] else None
+        specs.append(KeySpec(parts[0], rate, units))
+    return specs
+
+
+class PooledKey:
+    """One key's limiter, budget and health; `fingerprint` is what metrics and the ledger see."""
+
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        rate_limit_per_min: int,
+        monthly_units: Optional[float],
+        interactive_reserve: Optional[float] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        self.api_key = api_key
+        self.fingerprint = key_fingerprint(api_key)
+        self.rate_limit_per_min = max(int(rate_limit_per_min), 1)
+        self.monthly_units = monthly_units
+        self.limiter = RateLimiter(capacity=self.rate_limit_per_min, refill_window_s=60)
+        # Priority lanes in front of this key's limiter; None when the pool has no lanes
+        self.scheduler: Optional[PriorityScheduler] = None
+        if interactive_reserve is not None:
+            self.scheduler = PriorityScheduler(
+                capacity=self.rate_limit_per_min, reserved=interactive_reserve, limiter=self.limiter, metrics=metrics
+            )
+        self.labels = (("key", self.fingerprint),)
+        self.in_flight = 0
+        self.requests = 0
+        self.ejected_until = 0.0
+        self.eject_reason: Optional[str] = None
+
+    def healthy(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+
+class KeyPool:
+    def __init__(
+        self,
+        keys: Iterable[Union[str, KeySpec]],
+        *,
+        rate_limit_per_min: int = 60,
+        monthly_units: Optional[float] = None,
+        cooldown_s: float = 30.0,
+        quota_cooldown_s: float = 3600.0,
+        priority_lanes: bool = False,
+        interactive_reserve: float = 0.2,
+        ledger: Optional[UnitLedger] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        specs = [KeySpec(k) if isinstance(k, str) else k for k in keys]
+        if not specs:
+            raise ValueError("KeyPool needs at least one API key")
+        self.metrics = metrics or REGISTRY
+        self.keys: List[PooledKey] = [
+            PooledKey(
+                spec.api_key,
+                rate_limit_per_min=spec.rate_limit_per_min or rate_limit_per_min,
+                monthly_units=spec.monthly_units if spec.monthly_units is not None else monthly_units,
+                interactive_reserve=interactive_reserve if priority_lanes else None,
+                metrics=self.metrics,
+            )
+            for spec in specs
+        ]
+        self.cooldown_s = cooldown_s
+        self.quota_cooldown_s = quota_cooldown_s
+        self.ledger = ledger if ledger is not None else LEDGER
+        self._lock = threading.Lock()
+
+    def checkout(self, *, estimate: float = 0.0, exclude: Iterable[PooledKey] = ()) -> PooledKey:
+        """Least-loaded healthy key with budget for `estimate` units, marked in flight until `release`."""
+        now = time.monotonic()
+        skipped = set(exclude)
+        with self._lock:
+            best: Optional[PooledKey] = None
+            best_load: Tuple[float, float, float] = (math.inf, math.inf, math.inf)
+            for key in self.keys:
+                if key in skipped or not key.healthy(now):
+                    continue
+                used_share = 0.0
+                if key.monthly_units is not None:
+                    used = self.ledger.used(key.fingerprint)
+                    if used + estimate > key.monthly_units:
+                        self._eject(key, QUOTA, self.quota_cooldown_s, now)
+                        continue
+                    used_share = used / key.monthly_units if key.monthly_units else 1.0
+                load = (key.in_flight / key.rate_limit_per_min, used_share, key.requests / key.rate_limit_per_min)
+                if load < best_load:
+                    best, best_load = key, load
+            if best is None:
+                reasons = {k.fingerprint: k.eject_reason or "excluded" for k in self.keys}
+                raise AhrefsKeyPoolExhaustedError("No healthy API key left in the pool", reasons=reasons)
+            best.in_flight += 1
+            best.requests += 1
+        self.metrics.inc(KEY_POOL_REQUESTS, best.labels)
+        return best
+
+    def release(self, key: PooledKey) -> None:
+        with self._lock:
+            key.in_flight -= 1
+
+    def eject(self, key: PooledKey, reason: str, duration_s: float = math.inf) -> None:
+        with self._lock:
+            self._eject(key, reason, duration_s, time.monotonic())
+
+    def _eject(self, key: PooledKey, reason: str, duration_s: float, now: float) -> None:
+        if key.healthy(now):
+            self.metrics.inc(KEY_POOL_EJECTIONS, key.labels + (("reason", reason),))
+        key.ejected_until = max(key.ejected_until, now + duration_s)
+        key.eject_reason = reason
+
+    def restore(self, key: Optional[PooledKey] = None) -> None:
+        """Put `key` (default: every key) back into rotation."""
+        with self._lock:
+            for k in self.keys if key is None else [key]:
+                k.ejected_until, k.eject_reason = 0.0, None
+
+    def call(self, send: Callable[[PooledKey], T], *, estimate: float = 0.0) -> T:
+        """Run `send(key)` on the least-loaded key, moving on to another key when one is rejected."""
+        tried: Set[PooledKey] = set()
+        while True:
+            key = self.checkout(estimate=estimate, exclude=tried)
+            try:
+                return send(key)
+            except AhrefsAuthError:
+                self.eject(key, AUTH)
+            except AhrefsRateLimitError:
+                self.eject(key, RATE_LIMITED, self.cooldown_s)
+            except AhrefsAPIError as exc:
+                if exc.status_code != 402:
+                    raise
+                self.eject(key, QUOTA, self.quota_cooldown_s)
+            finally:
+                self.release(key)
+            tried.add(key)
+
+    def usage(self) -> List[Dict[str, object]]:
+        """Per-key requests, units, budget and health."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "key": k.fingerprint,
+                    "healthy": k.healthy(now),
+                    "reason": None if k.healthy(now) else k.eject_reason,
+                    "in_flight": k.in_flight,
+                    "requests": k.requests,
+                    "units": self.ledger.used(k.fingerprint),
+                    "monthly_units": k.monthly_units,
+                    "rate_limit_per_min": k.rate_limit_per_min,
+                }
+                for k in self.keys
+            ]
+
+
+_POOLS: Dict[Tuple[Tuple[KeySpec, ...], int, Optional[float], bool, float], KeyPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def shared_key_pool(
+    specs: Iterable[KeySpec],
+    *,
+    rate_limit_per_min: int = 60,
+    monthly_units: Optional[float] = None,
+    priority_lanes: bool = False,
+    interactive_reserve: float = 0.2,
+) -> KeyPool:
+    """
+    Process-wide pool for a set of keys and limits. Routes build a client per
+    request, so limiters, lanes, load and health have to be shared.
+    """
+    key = (tuple(specs), rate_limit_per_min, monthly_units, priority_lanes, interactive_reserve)
+    pool = _POOLS.get(key)
+    if pool is None:
+        with _POOLS_LOCK:
+            pool = _POOLS.get(key)
+            if pool is None:
+                pool = _POOLS[key] = KeyPool(
+                    key[0],
+                    rate_limit_per_min=rate_limit_per_min,
+                    monthly_units=monthly_units,
+                    priority_lanes=priority_lanes,
+                    interactive_reserve=interactive_reserve,
+                )
+    return pool
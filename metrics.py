@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Client metrics
+CLIENT_REQUESTS = "ahrefs_client_requests_total"
+CLIENT_LATENCY = "ahrefs_client_request_duration_seconds"
+CLIENT_RETRIES = "ahrefs_client_retries_total"
+CLIENT_LIMITER_WAIT = "ahrefs_client_rate_limiter_wait_seconds"
+CLIENT_IN_FLIGHT = "ahrefs_client_in_flight_requests"
+CLIENT_LIMITER_QUEUE = "ahrefs_client_rate_limiter_queue_depth"
+CLIENT_UNITS = "ahrefs_client_units_total"
+CACHE_HITS = "ahrefs_cache_hits_total"
+CACHE_MISSES = "ahrefs_cache_misses_total"
+
+# Micro-batcher metrics
+BATCHER_LOOKUPS = "ahrefs_batcher_lookups_total"
+BATCHER_FLUSHES = "ahrefs_batcher_flushes_total"
+BATCHER_WAIT = "ahrefs_batcher_wait_seconds"
+
+# Priority scheduler metrics
+SCHEDULER_QUEUE_DEPTH = "ahrefs_scheduler_queue_depth"
+SCHEDULER_WAIT = "ahrefs_scheduler_wait_seconds"
+SCHEDULER_GRANTS = "ahrefs_scheduler_grants_total"
+
+# Key pool metrics
+KEY_POOL_REQUESTS = "ahrefs_key_pool_requests_total"
+KEY_POOL_EJECTIONS = "ahrefs_key_pool_ejections_total"
+
+# Router tenancy metrics
+TENANT_REQUESTS = "ahrefs_tenant_requests_total"
+TENANT_QUEUE_WAIT = "ahrefs_tenant_queue_wait_seconds"
+TENANT_IN_FLIGHT = "ahrefs_tenant_in_flight_requests"
+TENANT_REJECTED = "ahrefs_tenant_rejected_total"
+
+# Router metrics
+ROUTER_REQUESTS = "ahrefs_router_requests_total"
+ROUTER_LATENCY = "ahrefs_router_request_duration_seconds"
+ROUTER_IN_FLIGHT = "ahrefs_router_in_flight_requests"
+ROUTER_SHED = "ahrefs_router_shed_total"
+
+# Export job metrics
+JOBS_RUNNING = "ahrefs_jobs_running"
+JOBS_ROWS = "ahrefs_jobs_rows_total"
+JOBS_FINISHED = "ahrefs_jobs_finished_total"
+
+# Warm-up metrics
+WARMUP_DURATION = "ahrefs_warmup_duration_seconds"
+WARMUP_CONNECTIONS = "ahrefs_warmup_connections_total"
+
+
+def status_class(status_code: Optional[int]) -> str:
+    """Collapse an HTTP status into a low-cardinality label ("2xx", "4xx", ...)."""
+    if not status_code:
+        return "error"
+    return f"{status_code // 100}xx"
+
+
+class _Shard:
+    """Per-thread metric storage. Only the owning thread writes to it."""
+
+    __slots__ = ("counters", "gauges", "histograms")
+
+    def __init__(self) -> None:
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.gauges: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], List[float]] = {}
+
+
+class MetricsRegistry:
+    """
+    In-process metrics registry rendered in Prometheus text exposition format.
+
+    Writes never take a lock: every thread updates its own shard and shards are
+    merged when the registry is rendered. Values recorded by threads that have
+    since exited are kept, so counters stay monotonic.
+    """
+
+    def __init__(self, *, buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets))
+        self._local = threading.local()
+        self._shards: List[_Shard] = []
+        self._shards_lock = threading.Lock()
+        self._values: Dict[Tuple[str, Labels], float] = {}
+        self._meta: Dict[str, Tuple[str, str]] = {}
+
+    def describe(self, name: str, kind: str, help_text: str) -> None:
+        """Register HELP/TYPE metadata for `name` (kind: counter, gauge or histogram)."""
+        self._meta[name] = (kind, help_text)
+
+    def _shard(self) -> _Shard:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = _Shard()
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    # ---------------
+    # Recording
+    # ---------------
+    def inc(self, name: str, labels: Labels = (), value: float = 1.0) -> None:
+        counters = self._shard().counters
+        key = (name, labels)
+        counters[key] = counters.get(key, 0.0) + value
+
+    def gauge_add(self, name: str, labels: Labels = (), value: float = 1.0) -> None:
+        gauges = self._shard().gauges
+        key = (name, labels)
+        gauges[key] = gauges.get(key, 0.0) + value
+
+    def set(self, name: str, labels: Labels = (), value: float = 0.0) -> None:
+        """Set an absolute gauge value (last write wins across threads)."""
+        self._values[(name, labels)] = value
+
+    def observe(self, name: str, labels: Labels = (), value: float = 0.0) -> None:
+        histograms = self._shard().histograms
+        key = (name, labels)
+        slot = histograms.get(key)
+        if slot is None:
+            # one count per bucket, one for +Inf, then the running sum
+            slot = histograms[key] = [0.0] * (len(self.buckets) + 2)
+        slot[bisect_left(self.buckets, value)] += 1
+        slot[-1] += value
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        self.inc(CACHE_HITS if hit else CACHE_MISSES, (("cache", cache),))
+
+    # ---------------
+    # Reading
+    # ---------------
+    def snapshot(self) -> Tuple[Dict[Tuple[str, Labels], float], Dict[Tuple[str, Labels], float], Dict[Tuple[str, Labels], List[float]]]:
+        """Merge all shards into (counters, gauges, histograms)."""
+        counters: Dict[Tuple[str, Labels], float] = {}
+        gauges: Dict[Tuple[str, Labels], float] = dict(self._values)
+        histograms: Dict[Tuple[str, Labels], List[float]] = {}
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            # dict() copies are atomic under the GIL, so the owner may keep writing
+            for key, value in dict(shard.counters).items():
+                counters[key] = counters.get(key, 0.0) + value
+            for key, value in dict(shard.gauges).items():
+                gauges[key] = gauges.get(key, 0.0) + value
+            for key, slot in dict(shard.histograms).items():
+                merged = histograms.get(key)
+                if merged is None:
+                    histograms[key] = list(slot)
+                else:
+                    for i, v in enumerate(slot):
+                        merged[i] += v
+        return counters, gauges, histograms
+
+    def value(self, name: str, labels: Labels = ()) -> float:
+        """Current value of a counter or gauge; histogram lookups return the sample count."""
+        counters, gauges, histograms = self.snapshot()
+        key = (name, labels)
+        if key in counters:
+            return counters[key]
+        if key in gauges:
+            return gauges[key]
+        if key in histograms:
+            return sum(histograms[key][:-1])
+        return 0.0
+
+    def render(self) -> str:
+        counters, gauges, histograms = self.snapshot()
+        grouped: Dict[str, List[str]] = {}
+        for (name, labels), value in sorted(counters.items()):
+            grouped.setdefault(name, []).append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+        for (name, labels), value in sorted(gauges.items()):
+            grouped.setdefault(name, []).append(f"{name}{_fmt_labels(labels)} {_fmt_value(value)}")
+        for (name, labels), slot in sorted(histograms.items()):
+            lines = grouped.setdefault(name, [])
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), slot[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _fmt_value(bound)
+                lines.append(f"{name}_bucket{_fmt_labels(labels + (('le', le),))} {_fmt_value(cumulative)}")
+            lines.append(f"{name}_sum{_fmt_labels(labels)} {_fmt_value(slot[-1])}")
+            lines.append(f"{name}_count{_fmt_labels(labels)} {_fmt_value(cumulative)}")
+
+        out: List[str] = []
+        for name in sorted(grouped):
+            kind, help_text = self._meta.get(name, ("untyped", ""))
+            if help_text:
+                out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+            out.extend(grouped[name])
+        return "\n".join(out) + "\n" if out else ""
+
+
+def _fmt_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for k, v in labels:
+        v = str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{k}="{v}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _fmt_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+REGISTRY = MetricsRegistry()
+
+REGISTRY.describe(CLIENT_REQUESTS, "counter", "Upstream Ahrefs requests by endpoint, method and status class.")
+REGISTRY.describe(CLIENT_LATENCY, "histogram", "Upstream request latency in seconds, excluding rate limiter wait.")
+REGISTRY.describe(CLIENT_RETRIES, "counter", "Retries performed by the HTTP adapter.")
+REGISTRY.describe(CLIENT_LIMITER_WAIT, "histogram", "Time spent waiting in the rate limiter in seconds.")
+REGISTRY.describe(CLIENT_LIMITER_QUEUE, "gauge", "Requests waiting for a rate limiter token, by key fingerprint.")
+REGISTRY.describe(CLIENT_IN_FLIGHT, "gauge", "Upstream requests currently in flight.")
+REGISTRY.describe(CLIENT_UNITS, "counter", "API units spent by endpoint and caller tag, per the client cost table.")
+REGISTRY.describe(CACHE_HITS, "counter", "Cache hits by cache name.")
+REGISTRY.describe(CACHE_MISSES, "counter", "Cache misses by cache name.")
+REGISTRY.describe(BATCHER_LOOKUPS, "counter", "Single-target lookups submitted to the micro-batcher.")
+REGISTRY.describe(BATCHER_FLUSHES, "counter", "Batch-analysis calls made by the micro-batcher.")
+REGISTRY.describe(BATCHER_WAIT, "histogram", "Time a lookup waited in the micro-batcher before its batch was sent, in seconds.")
+REGISTRY.describe(SCHEDULER_QUEUE_DEPTH, "gauge", "Callers waiting for a rate limiter token, by priority lane.")
+REGISTRY.describe(SCHEDULER_WAIT, "histogram", "Time from queueing in a priority lane to holding a token, in seconds.")
+REGISTRY.describe(SCHEDULER_GRANTS, "counter", "Rate limiter tokens granted, by priority lane.")
+REGISTRY.describe(KEY_POOL_REQUESTS, "counter", "Requests routed to each pooled API key (by key fingerprint).")
+REGISTRY.describe(KEY_POOL_EJECTIONS, "counter", "Pooled API keys taken out of rotation, by key fingerprint and reason.")
+REGISTRY.describe(TENANT_REQUESTS, "counter", "Router requests admitted, by tenant (Bearer token fingerprint or 'default').")
+REGISTRY.describe(TENANT_QUEUE_WAIT, "histogram", "Time a router request waited for its tenant's turn, in seconds.")
+REGISTRY.describe(TENANT_IN_FLIGHT, "gauge", "Router requests running, by tenant.")
+REGISTRY.describe(TENANT_REJECTED, "counter", "Router requests rejected by per-tenant caps, by tenant and reason.")
+REGISTRY.describe(ROUTER_REQUESTS, "counter", "Router requests by route, method and status class.")
+REGISTRY.describe(ROUTER_LATENCY, "histogram", "Router request latency in seconds.")
+REGISTRY.describe(ROUTER_SHED, "counter", "Router requests rejected with 503 because the estimated limiter wait exceeded their deadline.")
+REGISTRY.describe(ROUTER_IN_FLIGHT, "gauge", "Router requests currently in flight.")
+REGISTRY.describe(JOBS_RUNNING, "gauge", "Export jobs currently running.")
+REGISTRY.describe(JOBS_ROWS, "counter", "Rows stored by export jobs, by operation.")
+REGISTRY.describe(JOBS_FINISHED, "counter", "Export jobs finished, by operation and final status.")
+REGISTRY.describe(WARMUP_DURATION, "histogram", "Start-up warm-up time in seconds, by phase (dns, connect).")
+REGISTRY.describe(WARMUP_CONNECTIONS, "counter", "Keep-alive connections opened by the start-up warm-up, by result.")
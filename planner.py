@@ -0,0 +1,288 @@
+"""
+Dry-run planning of a workload: requests, API units and wall time, before any call is made.
+
+    ops = operations("get_domain_rating", domains) + operations("get_backlinks", domains, rows=5000)
+    p = plan(ops, client=client)
+    p.requests, p.units, p.wall_time_s
+    for step in p.steps: ...
+
+`plan` turns the intended operations into an execution plan:
+
+- identical idempotent calls collapse into one (targets are canonicalised as
+  in batch_analysis.py); calls differing only in `fields` become one call
+  returning the union of the fields
+- paginated calls over the same target and params merge overlapping or
+  adjacent row ranges (`offset` .. `offset + rows`); each range is one
+  `client.paginate` run of `page_size` pages
+- plain single-domain lookups (`BATCHABLE_ENDPOINTS`, target only) are folded
+  into batch-analysis calls of `batch_size` targets, one row per domain however
+  many of those endpoints asked for it
+- lookups come first; exports follow in the bulk lane, longest first so they
+  overlap as much as the worker count allows
+
+Units come from the cost table (the client's, when a client is passed).
+Latency per endpoint is the mean the client has observed so far
+(`ahrefs_client_request_duration_seconds`), else `default_latency_s`. Wall
+time is the longest of: waiting for rate limiter tokens (a full bucket of
+`rate_limit_per_min`, then the refill rate), the summed latency spread over
+`concurrency` workers, and the longest export (its pages are sequential).
+"""
+from __future__ import annotations
+
+import json
+import math
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from . import batch_analysis
+from .batch_analysis import DEFAULT_CHUNK_SIZE, canonical_target
+from .batcher import BATCHABLE_ENDPOINTS
+from .endpoints import EndpointSpec, get_spec
+from .metrics import CLIENT_LATENCY, REGISTRY, MetricsRegistry
+from .projection import normalize_fields
+from .scheduler import BULK, NORMAL
+from .units import CostTable
+
+if TYPE_CHECKING:
+    from .client import AhrefsClient
+
+DEFAULT_LATENCY_S = 0.5
+DEFAULT_PAGE_SIZE = 100
+
+# Params holding a domain or URL, which `canonical_target` may normalise
+_TARGET_PARAMS = ("target", "domain", "url")
+
+SINGLE = "single"
+PAGINATED = "paginated"
+BATCH = "batch"
+
+
+class Operation(NamedTuple):
+    """One intended call: `params` include the target; `rows` is the expected row count of a paginated call."""
+
+    op: str
+    params: Mapping[str, Any]
+    rows: Optional[int] = None
+
+
+def operations(op: str, targets: Iterable[str], *, rows: Optional[int] = None, **params: Any) -> List[Operation]:
+    """The same operation over many targets (passed as the endpoint's first required param)."""
+    spec = get_spec(op)
+    if not spec.required:
+        raise ValueError(f"{spec.name} takes no target")
+    return [Operation(spec.name, {**params, spec.required[0]: target}, rows) for target in targets]
+
+
+class Step(NamedTuple):
+    method: str  # client method name
+    kind: str  # SINGLE, PAGINATED or BATCH
+    params: Dict[str, Any]  # call kwargs; for PAGINATED, `client.paginate(method, page_size=, max_rows=rows, **params)`
+    page_size: Optional[int]
+    rows: Optional[int]  # rows expected (PAGINATED) or targets sent (BATCH)
+    requests: int
+    units: float
+    time_s: float  # summed request latency
+    covers: int  # input operations served by this step
+    lane: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        doc = self._asdict()
+        doc["time_s"] = round(self.time_s, 3)
+        return doc
+
+
+class Plan(NamedTuple):
+    steps: List[Step]
+    operations: int  # input operations
+    naive_requests: int  # requests if every operation ran on its own
+    requests: int
+    units: float
+    token_wait_s: float  # time spent waiting for rate limiter tokens
+    wall_time_s: float
+    rate_limit_per_min: int
+    concurrency: int
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "operations": self.operations,
+            "steps": len(self.steps),
+            "naive_requests": self.naive_requests,
+            "requests": self.requests,
+            "units": self.units,
+            "token_wait_s": round(self.token_wait_s, 3),
+            "wall_time_s": round(self.wall_time_s, 3),
+            "rate_limit_per_min": self.rate_limit_per_min,
+            "concurrency": self.concurrency,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**self.summary(), "plan": [step.to_dict() for step in self.steps]}
+
+
+def observed_latency(metrics: MetricsRegistry) -> Dict[str, float]:
+    """Mean observed request latency per upstream path."""
+    _, _, histograms = metrics.snapshot()
+    means: Dict[str, float] = {}
+    for (name, labels), slot in histograms.items():
+        count = sum(slot[:-1])
+        if name == CLIENT_LATENCY and count:
+            means[dict(labels).get("endpoint", "")] = slot[-1] / count
+    return means
+
+
+def _key(params: Mapping[str, Any]) -> str:
+    return json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _normalise(op: Operation) -> Tuple[EndpointSpec, Dict[str, Any], Optional[Tuple[str, ...]]]:
+    spec = get_spec(op.op)
+    params = dict(op.params)
+    missing = [key for key in spec.required if key not in params]
+    if missing:
+        raise ValueError(f"{spec.name} requires {', '.join(missing)}")
+    key = spec.required[0] if spec.required else None
+    if key in _TARGET_PARAMS or spec.name in BATCHABLE_ENDPOINTS:
+        # only targets fold together; names, queries and keyword lists are kept as given
+        params[key] = canonical_target(params[key])
+    fields = normalize_fields(params.pop("fields", None))
+    return spec, params, fields
+
+
+def _union(a: Optional[Tuple[str, ...]], b: Optional[Tuple[str, ...]]) -> Optional[Tuple[str, ...]]:
+    # no field list means every field
+    if a is None or b is None:
+        return None
+    return a + tuple(f for f in b if f not in a)
+
+
+def _merge_ranges(ranges: List[Tuple[int, int, int]]) -> List[Tuple[int, int, int]]:
+    """(start, end, operations) ranges with overlapping or adjacent ones merged."""
+    merged: List[List[int]] = []
+    for start, end, count in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+            merged[-1][2] += count
+        else:
+            merged.append([start, end, count])
+    return [(start, end, count) for start, end, count in merged]
+
+
+def plan(
+    ops: Iterable[Operation],
+    *,
+    client: Optional["AhrefsClient"] = None,
+    rate_limit_per_min: Optional[int] = None,
+    concurrency: int = 4,
+    page_size: Optional[int] = None,
+    batch: bool = True,
+    batch_size: int = DEFAULT_CHUNK_SIZE,
+    cost_table: Optional[CostTable] = None,
+    metrics: Optional[MetricsRegistry] = None,
+    default_latency_s: float = DEFAULT_LATENCY_S,
+) -> Plan:
+    """
+    Plan `ops` without calling the API. Rate limit, cost table and metrics
+    default to the client's when one is given. `page_size` defaults to each
+    endpoint's default `limit` (else 100); `batch=False` keeps single lookups
+    as they are.
+    """
+    if client is not None:
+        rate_limit_per_min = rate_limit_per_min or client.rate_limit_per_min
+        cost_table = cost_table or client.cost_table
+        metrics = metrics or client.metrics
+    rate = max(int(rate_limit_per_min or 60), 1)
+    concurrency = max(concurrency, 1)
+    cost_table = cost_table or CostTable()
+    latencies = observed_latency(metrics or REGISTRY)
+
+    def latency(path: str) -> float:
+        return latencies.get(path, default_latency_s)
+
+    submitted = naive = 0
+    # (method, params key) -> [spec, params, fields, operations]
+    singles: Dict[Tuple[str, str], List[Any]] = {}
+    # (method, params key without offset/limit) -> [spec, params, fields, page size, ranges]
+    exports: Dict[Tuple[str, str], List[Any]] = {}
+    batched: List[str] = []
+
+    for op in ops:
+        submitted += 1
+        spec, params, fields = _normalise(op)
+        if spec.pagination == "offset":
+            size = int(page_size or dict(spec.defaults).get("limit") or DEFAULT_PAGE_SIZE)
+            offset = int(params.pop("offset", 0))
+            rows = op.rows if op.rows is not None else int(params.get("limit") or size)
+            params.pop("limit", None)
+            naive += max(math.ceil(rows / size), 1)
+            entry = exports.setdefault((spec.name, _key(params)), [spec, params, fields, size, []])
+            entry[2] = _union(entry[2], fields) if entry[4] else fields
+            entry[4].append((offset, offset + rows, 1))
+            continue
+        naive += 1
+        if batch and spec.name in BATCHABLE_ENDPOINTS and fields is None and set(params) == set(spec.required):
+            batched.append(params[spec.required[0]])
+            continue
+        # a repeated POST/PUT is a second write, not a duplicate: each gets its own step
+        key = (spec.name, _key(params) if spec.idempotent else f"#{submitted}")
+        entry = singles.get(key)
+        if entry is None:
+            singles[key] = [spec, params, fields, 1]
+        else:
+            entry[2] = _union(entry[2], fields)
+            entry[3] += 1
+
+    steps: List[Step] = []
+    if batched:
+        spec = get_spec("post_batch_analysis")
+        _, positions, chunks = batch_analysis.plan(batched, batch_size)
+        served = [0] * len(chunks)
+        for position in positions:
+            served[position // batch_size] += 1
+        for chunk, covers in zip(chunks, served):
+            body = {"items": chunk}
+            steps.append(Step(spec.name, BATCH, body, None, len(chunk), 1, cost_table.estimate(spec.path, json=body),
+                              latency(spec.path), covers, NORMAL))
+
+    for spec, params, fields, covers in singles.values():
+        call = dict(params)
+        if fields is not None:
+            call["fields"] = list(fields)
+        path, built = spec.build(dict(params))
+        units = cost_table.estimate(path, json=built) if spec.body else cost_table.estimate(path, params=built)
+        steps.append(Step(spec.name, SINGLE, call, None, None, 1, units, latency(path), covers, NORMAL))
+
+    paginated: List[Step] = []
+    for spec, params, fields, size, ranges in exports.values():
+        for start, end, covers in _merge_ranges(ranges):
+            rows = end - start
+            call = {**params, "offset": start}
+            if fields is not None:
+                call["fields"] = list(fields)
+            pages = max(math.ceil(rows / size), 1)
+            units = 0.0
+            for page in range(pages):
+                path, built = spec.build({**params, "offset": start + page * size, "limit": min(size, rows - page * size)})
+                units += cost_table.estimate(path, params=built)
+            paginated.append(Step(spec.name, PAGINATED, call, size, rows, pages, units, pages * latency(path), covers, BULK))
+    steps.extend(sorted(paginated, key=lambda step: -step.time_s))
+
+    requests = sum(step.requests for step in steps)
+    busy_s = sum(step.time_s for step in steps)
+    token_wait_s = max(requests - rate, 0) * 60.0 / rate
+    wall_time_s = 0.0
+    if requests:
+        wall_time_s = max(
+            token_wait_s + busy_s / requests,
+            busy_s / concurrency,
+            max((step.time_s for step in paginated), default=0.0),
+        )
+    return Plan(
+        steps=steps,
+        operations=submitted,
+        naive_requests=naive,
+        requests=requests,
+        units=sum(step.units for step in steps),
+        token_wait_s=token_wait_s,
+        wall_time_s=wall_time_s,
+        rate_limit_per_min=rate,
+        concurrency=concurrency,
+    )
@@ -0,0 +1,51 @@
+"""
+Field projection for responses.
+
+`fields=` on a client method (or `?fields=` on an `/ahrefs` route) keeps only
+the named fields. Endpoints that accept a native selection (`EndpointSpec.select`,
+Ahrefs' `select` param) get the list forwarded so upstream sends less; every
+response is also projected right after decoding, so callers see the same shape
+either way and the router re-serialises only what was asked for.
+
+Rows (the largest list in the payload, as in `endpoints.extract_rows`) are
+projected row by row; object payloads keep the named keys at the top level, or
+inside each nested object when none of them is at the top level.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+FieldsArg = Union[str, Iterable[str], None]
+
+
+def normalize_fields(fields: FieldsArg) -> Optional[Tuple[str, ...]]:
+    """("a", "b") from "a,b" or ["a", "b"]; None when no projection was asked for."""
+    if fields is None:
+        return None
+    parts = fields.split(",") if isinstance(fields, str) else fields
+    out = tuple(dict.fromkeys(p.strip() for p in parts if p and p.strip()))
+    return out or None
+
+
+def _project_object(obj: Dict[str, Any], fields: Tuple[str, ...]) -> Dict[str, Any]:
+    return {k: obj[k] for k in fields if k in obj}
+
+
+def project(payload: Any, fields: FieldsArg) -> Any:
+    """Copy of `payload` reduced to `fields`; the input is not modified."""
+    wanted = normalize_fields(fields)
+    if wanted is None:
+        return payload
+    if isinstance(payload, list):
+        return [_project_object(row, wanted) if isinstance(row, dict) else row for row in payload]
+    if not isinstance(payload, dict):
+        return payload
+    inner = payload.get("data")
+    if isinstance(inner, (dict, list)):
+        return {**payload, "data": project(inner, wanted)}
+    rows_key = max((k for k, v in payload.items() if isinstance(v, list)), key=lambda k: len(payload[k]), default=None)
+    if rows_key is not None and payload[rows_key] and isinstance(payload[rows_key][0], dict):
+        return {**payload, rows_key: project(payload[rows_key], wanted)}
+    if any(k in payload for k in wanted):
+        return _project_object(payload, wanted)
+    return {k: _project_object(v, wanted) if isinstance(v, dict) else v for k, v in payload.items()}
@@ -0,0 +1,161 @@
+"""
+Diff-based sync of Rank Tracker project keywords and competitors.
+
+Instead of re-sending full lists, `sync_keywords` / `sync_competitors` read the
+project's current list once, compare it with the desired one as sets of
+canonical keys (keywords: whitespace-collapsed and case-folded; competitors:
+canonical targets), and only send what changed. Removals go first, so a project
+near its keyword limit is never pushed over it, then additions. Each side is
+split into `chunk_size` requests run on up to `max_workers` threads.
+
+    report = client.sync_keywords("p_1", desired_keywords)
+    report.added, report.removed, report.unchanged, report.failed
+"""
+from __future__ import annotations
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .batch_analysis import canonical_target
+from .endpoints import extract_rows
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_MAX_WORKERS = 4
+
+
+class SyncFailure(NamedTuple):
+    action: str  # "add" or "remove"
+    items: List[str]
+    error: BaseException
+
+
+class SyncReport(NamedTuple):
+    added: List[str]
+    removed: List[str]
+    unchanged: int
+    requests: int
+    failed: List[SyncFailure]
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.removed)
+
+
+def keyword_key(keyword: str) -> str:
+    return " ".join(keyword.split()).casefold()
+
+
+def competitor_key(competitor: str) -> str:
+    return canonical_target(competitor).casefold()
+
+
+def _labels(payload: Any, fields: Tuple[str, ...]) -> List[str]:
+    """Item strings of a list response; object rows use the first of `fields` they carry."""
+    out: List[str] = []
+    for row in extract_rows(payload):
+        if isinstance(row, str):
+            out.append(row)
+        elif isinstance(row, dict):
+            label = next((row[f] for f in fields if isinstance(row.get(f), str)), None)
+            if label is not None:
+                out.append(label)
+    return out
+
+
+def diff(current: Iterable[str], desired: Iterable[str], key: Callable[[str], str]) -> Tuple[List[str], List[str], int]:
+    """(to add, in desired order; to remove, in current order; unchanged count)."""
+    have: Dict[str, str] = {}
+    for item in current:
+        have.setdefault(key(item), item)
+    want: Dict[str, str] = {}
+    for item in desired:
+        want.setdefault(key(item), item)
+    to_add = [item for k, item in want.items() if k not in have]
+    to_remove = [item for k, item in have.items() if k not in want]
+    return to_add, to_remove, len(want) - len(to_add)
+
+
+def _send(
+    action: str,
+    send: Callable[[List[str]], Any],
+    items: Sequence[str],
+    chunk_size: int,
+    pool: Optional[ThreadPoolExecutor],
+) -> Tuple[List[str], List[SyncFailure], int]:
+    chunks = [list(items[i : i + chunk_size]) for i in range(0, len(items), chunk_size)]
+
+    def attempt(chunk: List[str]) -> Optional[SyncFailure]:
+        try:
+            send(chunk)
+            return None
+        except Exception as exc:
+            return SyncFailure(action, chunk, exc)
+
+    if pool is not None:
+        # pool threads don't inherit the caller's context: keep its lane and unit tag
+        ctx = contextvars.copy_context()
+        outcomes = list(pool.map(lambda chunk: ctx.copy().run(attempt, chunk), chunks))
+    else:
+        outcomes = [attempt(chunk) for chunk in chunks]
+    done = [item for chunk, failure in zip(chunks, outcomes) if failure is None for item in chunk]
+    return done, [f for f in outcomes if f is not None], len(chunks)
+
+
+def sync(
+    *,
+    current: Iterable[str],
+    desired: Iterable[str],
+    key: Callable[[str], str],
+    add: Callable[[List[str]], Any],
+    remove: Callable[[List[str]], Any],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    prune: bool = True,
+    dry_run: bool = False,
+) -> SyncReport:
+    """Send the delta between `current` and `desired`; `prune=False` never removes."""
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be >= 1")
+    to_add, to_remove, unchanged = diff(current, desired, key)
+    if not prune:
+        to_remove = []
+    if dry_run:
+        return SyncReport(to_add, to_remove, unchanged, 0, [])
+    chunks = -(-len(to_add) // chunk_size) + -(-len(to_remove) // chunk_size)
+    pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ahrefs-sync") if max_workers > 1 and chunks > 1 else None
+    try:
+        removed, remove_failed, remove_requests = _send("remove", remove, to_remove, chunk_size, pool)
+        added, add_failed, add_requests = _send("add", add, to_add, chunk_size, pool)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return SyncReport(added, removed, unchanged, remove_requests + add_requests, remove_failed + add_failed)
+
+
+def sync_keywords(client: Any, project_id: str, keywords: Iterable[str], **options: Any) -> SyncReport:
+    current = _labels(client.get_keywords(project_id=project_id), ("keyword", "name"))
+    return sync(
+        current=current,
+        desired=keywords,
+        key=keyword_key,
+        add=lambda chunk: client.put_keywords(project_id=project_id, keywords=chunk),
+        remove=lambda chunk: client.delete_keywords(project_id=project_id, keywords=chunk),
+        **options,
+    )
+
+
+def sync_competitors(client: Any, project_id: str, competitors: Iterable[str], **options: Any) -> SyncReport:
+    current = _labels(client.get_competitors(project_id=project_id), ("competitor", "domain", "target", "url"))
+    return sync(
+        current=current,
+        desired=competitors,
+        key=competitor_key,
+        add=lambda chunk: client.add_competitors(project_id=project_id, competitors=chunk),
+        remove=lambda chunk: client.delete_competitors(project_id=project_id, competitors=chunk),
+        **options,
+    )
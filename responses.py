@@ -0,0 +1,301 @@
+"""
+Typed, lazily decoded response rows.
+
+A row wraps the dict produced by `resp.json()` and decodes a field only when it
+is read; timestamps are parsed once per row and cached. Pages hold the raw row list and
+create row views on access, so a 10k-row page costs one small object per row you
+actually touch. `strict=True` validates every field of every row up front.
+
+    page = parse("get_backlinks", client.get_backlinks(target="example.com", limit=1000))
+    for row in page:
+        row.url_from, row.domain_rating, row.first_seen  # str, float, datetime
+"""
+from __future__ import annotations
+
+import datetime as _dt
+from typing import Any, Callable, Dict, Generic, Iterator, List, Mapping, Optional, Sequence, Tuple, Type, TypeVar, Union, overload
+
+from .endpoints import extract_rows, get_spec
+from .errors import AhrefsResponseValidationError
+
+Decoder = Callable[[Any], Any]
+
+
+def _str(value: Any) -> str:
+    if not isinstance(value, str):
+        raise TypeError("expected a string")
+    return value
+
+
+def _int(value: Any) -> int:
+    if isinstance(value, bool):
+        raise TypeError("expected an integer")
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError("expected an integer")
+        return int(value)
+    return int(value)
+
+
+def _float(value: Any) -> float:
+    if isinstance(value, bool):
+        raise TypeError("expected a number")
+    return float(value)
+
+
+def _bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if value in (0, 1):
+        return bool(value)
+    raise TypeError("expected a boolean")
+
+
+def _datetime(value: Any) -> _dt.datetime:
+    text = _str(value)
+    if text.endswith("Z"):
+        text = text[:-1] + "+00:00"
+    return _dt.datetime.fromisoformat(text)
+
+
+def _date(value: Any) -> _dt.date:
+    text = _str(value)
+    return _dt.date.fromisoformat(text[:10])
+
+
+# JSON types each decoder accepts unchanged, and decoders worth caching
+_NATIVE: Dict[Decoder, Tuple[type, ...]] = {_str: (str,), _int: (int,), _float: (float,), _bool: (bool,)}
+_CACHED = frozenset((_datetime, _date))
+_MISSING = object()
+
+
+class Field:
+    """
+    Lazily decoded field: reads `key` from the raw row and decodes it on access.
+
+    Values already of the target type are returned as-is. Other values are
+    converted; expensive conversions (`cache=True`, e.g. timestamps) are done
+    once per row and cached.
+    """
+
+    __slots__ = ("name", "key", "decode", "required", "cache", "native")
+
+    def __init__(self, decode: Decoder, *, key: Optional[str] = None, required: bool = False) -> None:
+        self.decode = decode
+        self.key = key
+        self.required = required
+        self.name = ""
+        self.native = _NATIVE.get(decode, ())
+        self.cache = decode in _CACHED
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+        self.key = self.key or name
+
+    def load(self, raw: Mapping[str, Any]) -> Any:
+        value = raw.get(self.key)  # type: ignore[arg-type]
+        if value is None:
+            if self.required:
+                raise AhrefsResponseValidationError(f"Missing required field {self.key!r}", field=self.key)
+            return None
+        if value.__class__ in self.native:
+            return value
+        try:
+            return self.decode(value)
+        except (TypeError, ValueError) as exc:
+            raise AhrefsResponseValidationError(f"Invalid value for {self.key!r}: {exc}", field=self.key, value=value) from None
+
+    def __get__(self, obj: Optional["Row"], owner: type) -> Any:
+        if obj is None:
+            return self
+        if not self.cache:
+            value = obj._raw.get(self.key)
+            if value.__class__ in self.native:
+                return value
+            return self.load(obj._raw)
+        cache = obj._cache
+        if cache is None:
+            cache = obj._cache = {}
+        else:
+            value = cache.get(self.name, _MISSING)
+            if value is not _MISSING:
+                return value
+        value = cache[self.name] = self.load(obj._raw)
+        return value
+
+
+class _RowMeta(type):
+    """Collects the declared Fields of a row class (including inherited ones) into `_fields`."""
+
+    def __new__(mcs, name: str, bases: Tuple[type, ...], namespace: Dict[str, Any]) -> "_RowMeta":
+        namespace.setdefault("__slots__", ())
+        cls = super().__new__(mcs, name, bases, namespace)
+        own = [value for value in namespace.values() if isinstance(value, Field)]
+        inherited: Tuple[Field, ...] = getattr(cls, "_fields", ())
+        names = {f.name for f in own}
+        cls._fields = tuple(f for f in inherited if f.name not in names) + tuple(own)  # type: ignore[attr-defined]
+        return cls
+
+
+class Row(metaclass=_RowMeta):
+    __slots__ = ("_raw", "_cache")
+    _fields: Tuple[Field, ...] = ()
+
+    def __init__(self, raw: Mapping[str, Any], strict: bool = False) -> None:
+        self._raw = raw
+        self._cache: Optional[Dict[str, Any]] = None
+        if strict:
+            self.validate()
+
+    @property
+    def raw(self) -> Mapping[str, Any]:
+        """The undecoded row as returned by the API (including fields not declared here)."""
+        return self._raw
+
+    def validate(self) -> None:
+        if not isinstance(self._raw, Mapping):
+            raise AhrefsResponseValidationError(f"Expected an object row, got {type(self._raw).__name__}", value=self._raw)
+        for field in self._fields:
+            getattr(self, field.name)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field.name: getattr(self, field.name) for field in self._fields}
+
+    def __eq__(self, other: object) -> bool:
+        return type(other) is type(self) and other._raw == self._raw  # type: ignore[attr-defined]
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        shown = ", ".join(f"{f.name}={getattr(self, f.name)!r}" for f in self._fields[:3])
+        return f"{type(self).__name__}({shown}, ...)"
+
+
+class BacklinkRow(Row):
+    url_from = Field(_str, required=True)
+    url_to = Field(_str)
+    anchor = Field(_str)
+    domain_rating = Field(_float)
+    traffic = Field(_int)
+    is_dofollow = Field(_bool)
+    first_seen = Field(_datetime)
+    last_seen = Field(_datetime)
+
+
+class RefdomainRow(Row):
+    domain = Field(_str)
+    domain_rating = Field(_float)
+    backlinks = Field(_int)
+    dofollow_backlinks = Field(_int)
+    traffic = Field(_int)
+    first_seen = Field(_datetime)
+    last_seen = Field(_datetime)
+
+
+class KeywordOverview(Row):
+    keyword = Field(_str, required=True)
+    volume = Field(_int)
+    global_volume = Field(_int)
+    difficulty = Field(_float)
+    cpc = Field(_float)
+    clicks = Field(_float)
+    parent_topic = Field(_str)
+
+
+class _SeriesValue(Field):
+    """The value of a history point: the one numeric key besides `date`."""
+
+    __slots__ = ()
+
+    def load(self, raw: Mapping[str, Any]) -> Any:
+        for key, value in raw.items():
+            if key != "date" and value is not None:
+                try:
+                    return _float(value)
+                except (TypeError, ValueError):
+                    continue
+        if self.required:
+            raise AhrefsResponseValidationError("History point has no numeric value", field="value")
+        return None
+
+
+class HistoryPoint(Row):
+    date = Field(_date, required=True)
+    value = _SeriesValue(_float, required=True)
+
+
+R = TypeVar("R", bound=Row)
+
+
+class RowPage(Sequence[R], Generic[R]):
+    """
+    Rows of one response page. Lenient pages create row objects on access and
+    do not keep them, so hold on to the ones you need (`list(page)` materialises
+    all of them). Strict pages validate and keep every row up front.
+    """
+
+    __slots__ = ("row_type", "payload", "_rows", "_validated", "strict")
+
+    def __init__(self, row_type: Type[R], payload: Any, *, strict: bool = False) -> None:
+        self.row_type = row_type
+        self.payload = payload
+        self._rows: List[Any] = extract_rows(payload)
+        self.strict = strict
+        self._validated: Optional[List[R]] = [row_type(raw, strict=True) for raw in self._rows] if strict else None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @overload
+    def __getitem__(self, index: int) -> R: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[R]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[R, List[R]]:
+        if self._validated is not None:
+            return self._validated[index]
+        if isinstance(index, slice):
+            return list(map(self.row_type, self._rows[index]))
+        return self.row_type(self._rows[index])
+
+    def __iter__(self) -> Iterator[R]:
+        if self._validated is not None:
+            return iter(self._validated)
+        return map(self.row_type, self._rows)
+
+    def column(self, name: str) -> List[Any]:
+        """One decoded field for every row, without creating row objects."""
+        field: Field = getattr(self.row_type, name)
+        load = field.load
+        return [load(raw) for raw in self._rows]
+
+    def __repr__(self) -> str:
+        return f"RowPage[{self.row_type.__name__}]({len(self)} rows)"
+
+
+# Row type per client method
+RESPONSE_TYPES: Dict[str, Type[Row]] = {
+    "get_backlinks": BacklinkRow,
+    "get_broken_backlinks": BacklinkRow,
+    "get_referring_domains": RefdomainRow,
+    "get_refdomains": RefdomainRow,
+    "get_keywords_overview": KeywordOverview,
+    "get_refdomains_history": HistoryPoint,
+    "get_domain_rating_history": HistoryPoint,
+    "get_url_rating_history": HistoryPoint,
+    "get_pages_history": HistoryPoint,
+    "get_metrics_history": HistoryPoint,
+    "get_keywords_history": HistoryPoint,
+    "get_total_search_volume_history": HistoryPoint,
+    "get_keywords_volume_history": HistoryPoint,
+}
+
+
+def parse(name: str, payload: Any, *, strict: bool = False) -> RowPage[Any]:
+    """Wrap a response payload of the endpoint `name` (method or op name) in its typed page."""
+    spec = get_spec(name)
+    row_type = RESPONSE_TYPES.get(spec.name)
+    if row_type is None:
+        raise KeyError(f"No typed response for {spec.name!r}")
+    return RowPage(row_type, payload, strict=strict)
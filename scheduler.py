@@ -0,0 +1,203 @@
+"""
+Priority lanes in front of the rate limiter.
+
+`PriorityScheduler` owns a `RateLimiter` and decides who gets the next token.
+Callers queue in a lane ("interactive", "normal", "bulk" by default) and lanes
+are served by weighted fair sharing (stride scheduling): with weights 6/3/1 and
+all lanes busy, interactive gets 6 of every 10 tokens and bulk 1, but an idle
+lane's share goes to whoever is waiting, and a lane that was idle does not bank
+credit. On top of that, `reserved` of the limiter's capacity is kept for the
+top lane: the other lanes together never take more than
+`capacity * (1 - reserved)` tokens per window, so interactive calls find a
+token quickly even while a bulk export has been saturating the key.
+
+The lane comes from the `priority=` kwarg of a client method, or from
+`with lane("bulk"): ...` around any code; the default is "normal".
+"""
+from __future__ import annotations
+
+import contextvars
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional, Tuple
+
+from .metrics import REGISTRY, SCHEDULER_GRANTS, SCHEDULER_QUEUE_DEPTH, SCHEDULER_WAIT, MetricsRegistry
+from .rate_limiter import RateLimiter
+from .units import key_fingerprint
+
+INTERACTIVE = "interactive"
+NORMAL = "normal"
+BULK = "bulk"
+DEFAULT_WEIGHTS: Dict[str, float] = {INTERACTIVE: 6.0, NORMAL: 3.0, BULK: 1.0}
+
+_current_lane: contextvars.ContextVar[str] = contextvars.ContextVar("ahrefs_lane", default=NORMAL)
+
+
+@contextmanager
+def lane(name: str) -> Iterator[None]:
+    """Route requests made inside the block (in this thread or task) through lane `name`."""
+    token = _current_lane.set(name)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def current_lane() -> str:
+    return _current_lane.get()
+
+
+class _Lane:
+    __slots__ = ("name", "weight", "labels", "waiters", "pass_")
+
+    def __init__(self, name: str, weight: float) -> None:
+        if weight <= 0:
+            raise ValueError(f"Lane {name!r} needs a positive weight")
+        self.name = name
+        self.weight = weight
+        self.labels = (("lane", name),)
+        self.waiters: Deque[object] = deque()
+        self.pass_ = 0.0  # virtual time of this lane's next grant
+
+
+class PriorityScheduler:
+    """
+    Weighted fair queueing of rate limiter tokens across lanes.
+
+    `weights` maps lane names to weights, highest priority first; the first lane
+    is the one `reserved` (a fraction of `capacity` per `window_s`) is kept for.
+    Pass `limiter` to schedule an existing limiter instead of building one.
+    """
+
+    def __init__(
+        self,
+        *,
+        capacity: int,
+        window_s: float = 60.0,
+        weights: Optional[Dict[str, float]] = None,
+        reserved: float = 0.2,
+        limiter: Optional[RateLimiter] = None,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        if not 0 <= reserved < 1:
+            raise ValueError("reserved must be in [0, 1)")
+        weights = weights or DEFAULT_WEIGHTS
+        self.capacity = max(int(capacity), 1)
+        self.window_s = window_s
+        self.reserved = reserved
+        self.limiter = limiter or RateLimiter(capacity=self.capacity, refill_window_s=window_s)
+        self.metrics = metrics or REGISTRY
+        self._lanes: Dict[str, _Lane] = {name: _Lane(name, w) for name, w in weights.items()}
+        self.top, self.bottom = next(iter(self._lanes)), list(self._lanes)[-1]
+        # Tokens the non-top lanes may take per window; None when nothing is reserved
+        self._shared_cap: Optional[int] = self.capacity - math.ceil(self.capacity * reserved) if reserved else None
+        self._shared_grants: Deque[float] = deque()  # grant times of non-top lanes within the window
+        self._cond = threading.Condition()
+        self._busy = False  # a granted caller is (about to be) inside limiter.acquire()
+        self._turn: Optional[object] = None
+        self._vtime = 0.0
+        self._retry_in: Optional[float] = None
+
+    def acquire(self, lane_name: Optional[str] = None) -> float:
+        """Wait for this caller's turn and a limiter token; returns the seconds waited."""
+        name = lane_name or current_lane()
+        lane_ = self._lanes.get(name)
+        if lane_ is None:
+            raise ValueError(f"Unknown lane {name!r}; expected one of {sorted(self._lanes)}")
+        start = time.perf_counter()
+        ticket = object()
+        self.metrics.gauge_add(SCHEDULER_QUEUE_DEPTH, lane_.labels, 1)
+        try:
+            with self._cond:
+                if not lane_.waiters:
+                    lane_.pass_ = max(lane_.pass_, self._vtime)
+                lane_.waiters.append(ticket)
+                self._dispatch()
+                try:
+                    while self._turn is not ticket:
+                        self._cond.wait(self._retry_in)
+                        self._dispatch()
+                except BaseException:
+                    # interrupted (KeyboardInterrupt, cancellation): leave the queue, and
+                    # if the turn was already handed over, pass it on so later callers run
+                    if self._turn is ticket:
+                        self._turn = None
+                        self._busy = False
+                    elif ticket in lane_.waiters:
+                        lane_.waiters.remove(ticket)
+                    self._dispatch()
+                    raise
+                self._turn = None
+        finally:
+            self.metrics.gauge_add(SCHEDULER_QUEUE_DEPTH, lane_.labels, -1)
+        try:
+            self.limiter.acquire()
+        finally:
+            with self._cond:
+                self._busy = False
+                self._dispatch()
+        waited = time.perf_counter() - start
+        self.metrics.inc(SCHEDULER_GRANTS, lane_.labels)
+        self.metrics.observe(SCHEDULER_WAIT, lane_.labels, waited)
+        return waited
+
+    def queued(self) -> Dict[str, int]:
+        """Callers currently waiting, per lane."""
+        with self._cond:
+            return {name: len(l.waiters) for name, l in self._lanes.items()}
+
+    def _dispatch(self) -> None:
+        # Called with the condition held: hand the next turn to the head of the
+        # eligible lane with the lowest virtual time
+        if self._busy:
+            return
+        now = time.monotonic()
+        shared_open = True
+        was_blocked, self._retry_in = self._retry_in is not None, None
+        if self._shared_cap is not None:
+            grants = self._shared_grants
+            while grants and grants[0] <= now - self.window_s:
+                grants.popleft()
+            shared_open = len(grants) < self._shared_cap
+        chosen: Optional[_Lane] = None
+        for l in self._lanes.values():
+            if not l.waiters or (not shared_open and l.name != self.top):
+                continue
+            if chosen is None or l.pass_ < chosen.pass_:
+                chosen = l
+        if chosen is None:
+            if not shared_open and any(l.waiters for l in self._lanes.values()):
+                # blocked by the reservation: waiters re-check when the oldest grant leaves the window
+                self._retry_in = max(self._shared_grants[0] + self.window_s - now, 0.001)
+                if not was_blocked:
+                    self._cond.notify_all()
+            return
+        self._vtime = chosen.pass_
+        chosen.pass_ += 1.0 / chosen.weight
+        if self._shared_cap is not None and chosen.name != self.top:
+            self._shared_grants.append(now)
+        self._turn = chosen.waiters.popleft()
+        self._busy = True
+        self._cond.notify_all()
+
+
+_SCHEDULERS: Dict[Tuple[str, str], PriorityScheduler] = {}
+_SCHEDULERS_LOCK = threading.Lock()
+
+
+def shared_scheduler(api_key: Optional[str], base_url: str, *, capacity: int, reserved: float = 0.2) -> PriorityScheduler:
+    """
+    Process-wide scheduler for an API key and base URL. Routes build a client per
+    request, so the lanes (and the limiter behind them) have to be shared.
+    """
+    key = (key_fingerprint(api_key), base_url)
+    scheduler = _SCHEDULERS.get(key)
+    if scheduler is None:
+        with _SCHEDULERS_LOCK:
+            scheduler = _SCHEDULERS.get(key)
+            if scheduler is None:
+                scheduler = _SCHEDULERS[key] = PriorityScheduler(capacity=capacity, reserved=reserved)
+    return scheduler
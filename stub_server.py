@@ -0,0 +1,324 @@
+"""
+Local Ahrefs stub server for tests and benchmarks.
+
+Serves every path the client calls with synthetic payloads, with configurable
+latency distributions, payload sizes and injected 429/5xx responses. Built on
+the standard library so it runs anywhere the SDK does.
+
+    with StubServer(StubConfig(latency=lognormal(0.05, 0.5), error_rate_429=0.01)) as stub:
+        client = AhrefsClient(api_key="x", base_url=stub.base_url)
+
+Standalone:
+    python -m backend.app.core.landing_page.ahrefs.stub_server --port 8080 --latency uniform:0.01,0.05
+"""
+from __future__ import annotations
+
+import argparse
+import datetime as _dt
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+Latency = Callable[[], float]
+
+KNOWN_PREFIXES = (
+    "/v1/",
+    "/site-explorer/",
+    "/keywords-explorer/",
+    "/management/",
+    "/batch-analysis",
+    "/public/",
+    "/backlinks/",
+    "/organic/",
+    "/paid/",
+    "/pages/",
+    "/outgoing/",
+    "/rank-tracker/",
+    "/overview/",
+    "/serp/",
+    "/subscription/",
+)
+
+
+def fixed(seconds: float) -> Latency:
+    return lambda: seconds
+
+
+def uniform(low_s: float, high_s: float) -> Latency:
+    return lambda: random.uniform(low_s, high_s)
+
+
+def lognormal(median_s: float, sigma: float) -> Latency:
+    """Long-tailed latency: `median_s` is the 50th percentile."""
+    mu = math.log(median_s)
+    return lambda: random.lognormvariate(mu, sigma)
+
+
+def parse_latency(spec: str) -> Latency:
+    """Parse "fixed:0.05", "uniform:0.01,0.05" or "lognormal:0.05,0.5"."""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v]
+    factories = {"fixed": fixed, "uniform": uniform, "lognormal": lognormal}
+    if kind not in factories:
+        raise ValueError(f"Unknown latency distribution {kind!r}")
+    return factories[kind](*values)
+
+
+class StubConfig:
+    def __init__(
+        self,
+        *,
+        latency: Optional[Latency] = None,
+        total_rows: int = 1000,
+        max_rows: int = 100,
+        row_padding: int = 0,
+        error_rate_429: float = 0.0,
+        error_rate_5xx: float = 0.0,
+        retry_after_s: int = 1,
+        require_auth: bool = False,
+        overrides: Optional[Dict[str, Tuple[int, Dict[str, Any]]]] = None,
+        key_errors: Optional[Dict[str, int]] = None,
+    ) -> None:
+        self.latency = latency or fixed(0.0)
+        self.total_rows = total_rows  # rows available per target, across pages
+        self.max_rows = max_rows  # page size when the request has no `limit`
+        self.row_padding = row_padding  # extra bytes per row to simulate wide rows
+        self.error_rate_429 = error_rate_429
+        self.error_rate_5xx = error_rate_5xx
+        self.retry_after_s = retry_after_s
+        self.require_auth = require_auth
+        # path -> (status, payload) returned verbatim
+        self.overrides = overrides or {}
+        # API key -> status returned for every request made with it (401, 402, 429, ...)
+        self.key_errors = key_errors or {}
+
+
+class StubStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests: Dict[str, int] = {}
+        self.statuses: Dict[int, int] = {}
+        self.connections = 0
+        self.bytes_sent = 0
+        self.keys: Dict[str, int] = {}
+
+    def record(self, path: str, status: int, size: int = 0, key: Optional[str] = None) -> None:
+        with self._lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+            self.bytes_sent += size
+            if key:
+                self.keys[key] = self.keys.get(key, 0) + 1
+
+    def connection_opened(self) -> None:
+        with self._lock:
+            self.connections += 1
+
+    @property
+    def total(self) -> int:
+        with self._lock:
+            return sum(self.requests.values())
+
+
+def _seed(value: str) -> int:
+    return zlib.crc32(value.encode("utf-8"))
+
+
+def _rows_key(path: str) -> str:
+    return path.rstrip("/").rsplit("/", 1)[-1].replace("-", "_") or "rows"
+
+
+def build_payload(config: StubConfig, method: str, path: str, params: Dict[str, str], body: Dict[str, Any]) -> Dict[str, Any]:
+    """Synthetic response for `path`, shaped like the corresponding Ahrefs endpoint."""
+    if path == "/batch-analysis":
+        items = body.get("items") or []
+        return {"targets": [{"target": t, "domain_rating": _seed(t) % 100, "refdomains": len(t) * 7} for t in items]}
+    if path.startswith("/subscription/"):
+        return {"limits_and_usage": {"units_usage_api_key": 1000, "units_limit_api_key": 1_000_000}}
+    if path == "/public/crawler-ip-ranges":
+        return {"prefixes": [{"ipv4Prefix": "54.36.148.0/23"}, {"ipv4Prefix": "202.8.40.0/22"}, {"ipv6Prefix": "2a02:2b0::/32"}]}
+    if path == "/public/crawler-ip-addresses":
+        return {"ips": [{"ip_address": f"54.36.148.{i}"} for i in range(1, 21)]}
+    if method in ("POST", "PUT"):
+        return {"ok": True, "echo": body}
+
+    target = params.get("target") or params.get("query") or params.get("domain") or params.get("url") or params.get("project_id", "")
+    if path.endswith("-history"):
+        start = _dt.date(2015, 1, 1)
+        if params.get("date_from"):
+            start = _dt.date.fromisoformat(params["date_from"])
+        end = _dt.date.fromisoformat(params["date_to"]) if params.get("date_to") else start + _dt.timedelta(days=config.total_rows - 1)
+        field = _rows_key(path)[: -len("_history")]
+        seed = _seed(target)
+        return {
+            field if field.endswith("s") else field + "s": [
+                {"date": (start + _dt.timedelta(days=i)).isoformat(), field: float((seed + start.toordinal() + i) % 1000)}
+                for i in range((end - start).days + 1)
+            ]
+        }
+
+    offset = int(params.get("offset", 0) or 0)
+    limit = int(params.get("limit", config.max_rows) or config.max_rows)
+    count = max(0, min(limit, config.total_rows - offset))
+    pad = "x" * config.row_padding
+    rows: List[Dict[str, Any]] = [
+        {
+            "target": target,
+            "url_from": f"https://ref{offset + i}.example/page",
+            "url_to": f"https://{target}/",
+            "domain_rating": float((offset + i) % 100),
+            "traffic": (offset + i) * 3,
+            "first_seen": "2024-01-01T00:00:00Z",
+            "anchor": f"anchor {offset + i}{pad}",
+        }
+        for i in range(count)
+    ]
+    if params.get("select"):
+        wanted = params["select"].split(",")
+        rows = [{k: row[k] for k in wanted if k in row} for row in rows]
+    return {_rows_key(path): rows}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    server: "_StubHTTPServer"
+
+    def setup(self) -> None:
+        super().setup()
+        self.server.stats.connection_opened()
+
+    def log_message(self, format: str, *args: Any) -> None:  # silence default stderr logging
+        pass
+
+    def _handle(self) -> None:
+        config = self.server.config
+        parts = urlsplit(self.path)
+        path = parts.path
+        params = dict(parse_qsl(parts.query))
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw) if raw else {}
+        except ValueError:
+            body = {}
+
+        delay = config.latency()
+        if delay > 0:
+            time.sleep(delay)
+
+        headers: Dict[str, str] = {}
+        key = (self.headers.get("Authorization") or "").rsplit(" ", 1)[-1] or params.get("token")
+        if config.require_auth and not key:
+            status, payload = 401, {"error": "unauthorized"}
+        elif key in config.key_errors:
+            status, payload = config.key_errors[key], {"error": f"key rejected with {config.key_errors[key]}"}
+        elif path in config.overrides:
+            status, payload = config.overrides[path]
+        elif not any(path.startswith(p) for p in KNOWN_PREFIXES):
+            status, payload = 404, {"error": f"unknown path {path}"}
+        else:
+            roll = random.random()
+            if roll < config.error_rate_429:
+                status, payload = 429, {"error": "rate limited"}
+                headers["Retry-After"] = str(config.retry_after_s)
+            elif roll < config.error_rate_429 + config.error_rate_5xx:
+                status, payload = random.choice((500, 502, 503)), {"error": "upstream failure"}
+            else:
+                status, payload = 200, build_payload(config, self.command, path, params, body)
+
+        data = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        # count before replying so a client that has its response always sees it in stats
+        self.server.stats.record(path, status, len(data), key)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 512
+
+    def __init__(self, address: Tuple[str, int], config: StubConfig) -> None:
+        self.config = config
+        self.stats = StubStats()
+        super().__init__(address, _Handler)
+
+
+class StubServer:
+    """Threaded stub server on a background thread; use as a context manager or call start()/stop()."""
+
+    def __init__(self, config: Optional[StubConfig] = None, *, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.config = config or StubConfig()
+        self._httpd = _StubHTTPServer((host, port), self.config)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def stats(self) -> StubStats:
+        return self._httpd.stats
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="ahrefs-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local Ahrefs API stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", default="fixed:0", help="fixed:S | uniform:LO,HI | lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--total-rows", type=int, default=1000)
+    parser.add_argument("--row-padding", type=int, default=0)
+    parser.add_argument("--error-429", type=float, default=0.0)
+    parser.add_argument("--error-5xx", type=float, default=0.0)
+    args = parser.parse_args(argv)
+
+    config = StubConfig(
+        latency=parse_latency(args.latency),
+        total_rows=args.total_rows,
+        row_padding=args.row_padding,
+        error_rate_429=args.error_429,
+        error_rate_5xx=args.error_5xx,
+    )
+    server = StubServer(config, host=args.host, port=args.port)
+    print(f"Ahrefs stub listening on {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""
+HTTP transport setup for `AhrefsClient`.
+
+Everything that needs `requests`/urllib3 lives here so importing the SDK stays
+cheap; the client imports this module when it first builds its session.
+
+One client (and so one session) is used from many threads at once, e.g. by
+FastAPI's threadpool. That is safe because the session is fully set up here,
+once, under the client's lock, and never mutated afterwards: auth goes on each
+request, cookies are never stored (the API is stateless), and urllib3's
+connection pools are thread-safe. The pool keeps up to `pool_maxsize`
+connections per host; with `pool_block=True` (the default) callers beyond that
+wait for a free connection instead of opening throwaway ones, so there is no
+connection churn and no "Connection pool is full" warnings under load. The wait
+is bounded by `pool_timeout_s`: a leaked or saturated pool fails requests with
+`requests.ConnectionError` rather than hanging them.
+
+`http2=True` sends requests through `HTTP2Adapter` (httpx with h2, optional
+dependencies): one multiplexed connection per host instead of a pool.
+"""
+from __future__ import annotations
+
+import os
+import ssl
+import threading
+import time
+from datetime import timedelta
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests import PreparedRequest, Response, Session
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import DEFAULT_CA_BUNDLE_PATH, select_proxy
+from urllib3.exceptions import EmptyPoolError, MaxRetryError
+from urllib3.util.retry import Retry
+
+from .cassette import Cassette, RecordingAdapter, ReplayAdapter
+from .endpoints import NON_IDEMPOTENT_PATHS, replay_allowed
+
+
+class EndpointRetry(Retry):
+    """
+    urllib3 retry policy that never replays requests to non-idempotent endpoints:
+    calls made through a spec that is not idempotent (`endpoints.single_attempt`,
+    whatever their path) and raw requests to those endpoints' paths.
+    """
+
+    no_retry_paths = NON_IDEMPOTENT_PATHS
+
+    def increment(self, method: Optional[str] = None, url: Optional[str] = None, *args: Any, **kwargs: Any) -> Retry:
+        path = urlsplit(url).path if url else ""
+        if path in self.no_retry_paths or not replay_allowed(path):
+            raise MaxRetryError(kwargs.get("_pool"), url, kwargs.get("error"))
+        return super().increment(method, url, *args, **kwargs)
+
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 32
+DEFAULT_POOL_TIMEOUT_S = 30.0
+
+
+def _bounded_pool(base: type, timeout_s: float) -> type:
+    """`base` connection pool whose callers wait at most `timeout_s` for a free connection."""
+
+    def _get_conn(self: Any, timeout: Optional[float] = None) -> Any:
+        return base._get_conn(self, timeout_s if timeout is None else timeout)
+
+    return type(base.__name__, (base,), {"_get_conn": _get_conn, "pool_timeout_s": timeout_s})
+
+
+class PoolAdapter(HTTPAdapter):
+    """
+    `HTTPAdapter` with a bounded wait for a pooled connection: with `pool_block`,
+    a request that finds no free connection within `pool_timeout_s` raises
+    `requests.ConnectionError` (None waits indefinitely, as urllib3 does).
+    """
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["pool_timeout_s"]
+
+    def __init__(self, *, pool_timeout_s: Optional[float] = DEFAULT_POOL_TIMEOUT_S, **kwargs: Any) -> None:
+        self.pool_timeout_s = pool_timeout_s
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self._bound(self.poolmanager)
+
+    def proxy_manager_for(self, proxy: str, **proxy_kwargs: Any) -> Any:
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        self._bound(manager)
+        return manager
+
+    def _bound(self, manager: Any) -> None:
+        timeout_s = self.pool_timeout_s
+        classes = manager.pool_classes_by_scheme
+        if timeout_s is None or all(getattr(cls, "pool_timeout_s", None) == timeout_s for cls in classes.values()):
+            return
+        # a new dict: the default one is shared by every PoolManager in the process
+        manager.pool_classes_by_scheme = {scheme: _bounded_pool(cls, timeout_s) for scheme, cls in classes.items()}
+
+    def send(self, request: PreparedRequest, *args: Any, **kwargs: Any) -> Response:
+        try:
+            return super().send(request, *args, **kwargs)
+        except EmptyPoolError as exc:
+            raise requests.ConnectionError(
+                f"No free connection to {urlsplit(request.url or '').netloc} within {self.pool_timeout_s}s "
+                f"(all {self._pool_maxsize} pooled connections are in use)",
+                request=request,
+            ) from exc
+
+
+def _ssl_verify(verify: Any, cert: Any) -> Any:
+    """httpx `verify` for requests' `verify` (bool or CA bundle path) and `cert` (path or (cert, key))."""
+    if verify is True and not cert:
+        return True
+    if verify is False:
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    else:
+        bundle = DEFAULT_CA_BUNDLE_PATH if verify is True else verify
+        if os.path.isdir(bundle):
+            context = ssl.create_default_context(capath=bundle)
+        else:
+            context = ssl.create_default_context(cafile=bundle)
+    if cert:
+        certfile, keyfile = (cert, None) if isinstance(cert, str) else cert
+        context.load_cert_chain(certfile, keyfile)
+    return context
+
+
+class HTTP2Adapter(BaseAdapter):
+    """
+    Transport adapter sending requests over HTTP/2 with a shared `httpx.Client`
+    (thread-safe; concurrent requests are multiplexed on one connection per host).
+
+    Applies the same retry policy as the urllib3 adapter: transient statuses and
+    connection errors are retried with backoff (honouring `Retry-After`), except
+    for non-idempotent endpoints. `verify`, `cert` and `proxies` are honoured as
+    requests would: each distinct setting gets its own httpx client.
+    """
+
+    def __init__(self, *, max_retries: int = 3, backoff_factor: float = 0.5, max_connections: int = DEFAULT_POOL_MAXSIZE) -> None:
+        super().__init__()
+        try:
+            import httpx
+
+            self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+            self._client = httpx.Client(http2=True, limits=self._limits, trust_env=False)
+        except ImportError as exc:  # httpx itself, or h2 (checked by httpx.Client)
+            raise ImportError("http2=True needs the optional 'httpx[http2]' dependency") from exc
+        self._httpx = httpx
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        # requests merges the environment (CA bundle, proxies) into each send's
+        # arguments; httpx fixes them per client, so there is one client per setting
+        self._clients: Dict[Tuple[Any, Any, Optional[str]], Any] = {(True, None, None): self._client}
+        self._clients_lock = threading.Lock()
+
+    def _client_for(self, verify: Any, cert: Any, proxy: Optional[str]) -> Any:
+        key = (verify, tuple(cert) if isinstance(cert, (list, tuple)) else cert, proxy)
+        client = self._clients.get(key)
+        if client is None:
+            with self._clients_lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._clients[key] = self._httpx.Client(
+                        http2=True, limits=self._limits, verify=_ssl_verify(verify, cert), proxy=proxy, trust_env=False
+                    )
+        return client
+
+    def send(self, request: PreparedRequest, stream: bool = False, timeout: Any = None, verify: Any = True, cert: Any = None, proxies: Any = None) -> Response:
+        url = request.url or ""
+        client = self._client_for(verify, cert, select_proxy(url, proxies) if proxies else None)
+        retryable = replay_allowed(urlsplit(url).path)
+        attempt = 0
+        start = time.perf_counter()
+        while True:
+            try:
+                upstream = client.request(request.method or "GET", url, content=request.body, headers=dict(request.headers), timeout=timeout)
+            except self._httpx.TransportError as exc:
+                if not retryable or attempt >= self.max_retries:
+                    raise requests.ConnectionError(exc, request=request) from exc
+                delay = None
+            else:
+                if upstream.status_code not in RETRY_STATUSES or not retryable or attempt >= self.max_retries:
+                    break
+                retry_after = upstream.headers.get("Retry-After")
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else None
+            attempt += 1
+            time.sleep(delay if delay is not None else self.backoff_factor * (2 ** (attempt - 1)))
+
+        resp = Response()
+        resp.status_code = upstream.status_code
+        resp.headers = CaseInsensitiveDict(upstream.headers)
+        resp._content = upstream.content
+        resp._content_consumed = True
+        resp.encoding = upstream.encoding
+        resp.reason = upstream.reason_phrase
+        resp.url = url
+        resp.request = request
+        resp.elapsed = timedelta(seconds=time.perf_counter() - start)
+        return resp
+
+    def close(self) -> None:
+        with self._clients_lock:
+            for client in self._clients.values():
+                client.close()
+
+
+def build_session(
+    session: Optional[Session] = None,
+    *,
+    max_retries: int = 3,
+    backoff_factor: float = 0.5,
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+    pool_block: bool = True,
+    pool_timeout_s: Optional[float] = DEFAULT_POOL_TIMEOUT_S,
+    http2: bool = False,
+    cassette_path: Optional[str] = None,
+    cassette_mode: str = "replay",
+    cassette_timing: bool = False,
+    ignored_params: Iterable[str] = ("token",),
+) -> Session:
+    """
+    Mount the retrying adapter (and optional cassette transport) on `session` or a new one.
+
+    `pool_connections` is the number of per-host pools kept, `pool_maxsize` the
+    connections kept per host, and `pool_block` makes callers wait for a free
+    connection rather than open one that is discarded afterwards.
+    """
+    session = session or requests.Session()
+    # Stateless API: never store cookies, so concurrent callers cannot affect each other
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    # Which requests may be replayed is decided per endpoint (EndpointSpec.idempotent)
+    retry = EndpointRetry(
+        total=max_retries,
+        read=max_retries,
+        connect=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=("GET", "POST", "PUT"),
+        raise_on_status=False,
+    )
+    adapter: BaseAdapter
+    if http2:
+        adapter = HTTP2Adapter(max_retries=max_retries, backoff_factor=backoff_factor, max_connections=pool_maxsize)
+    else:
+        adapter = PoolAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+            pool_block=pool_block,
+            pool_timeout_s=pool_timeout_s,
+        )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    # Cassette transport: "record" wraps the real adapter, "replay" never touches the network
+    if cassette_path:
+        cassette = Cassette(cassette_path)
+        if cassette_mode == "record":
+            transport = RecordingAdapter(cassette, adapter, ignored_params=ignored_params)
+        elif cassette_mode == "replay":
+            transport = ReplayAdapter(cassette, timing=cassette_timing, ignored_params=ignored_params)
+        else:
+            raise ValueError("cassette_mode must be 'record' or 'replay'")
+        session.mount("http://", transport)
+        session.mount("https://", transport)
+    return session
+
+
+_SESSIONS: Dict[Tuple[Tuple[str, Any], ...], Session] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def shared_session(**options: Any) -> Session:
+    """Process-wide session per set of `build_session` options, so short-lived clients reuse one pool."""
+    key = tuple(sorted(options.items()))
+    session = _SESSIONS.get(key)
+    if session is None:
+        with _SESSIONS_LOCK:
+            session = _SESSIONS.get(key)
+            if session is None:
+                session = _SESSIONS[key] = build_session(**options)
+    return session
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .endpoints import ENDPOINTS, EndpointCost, extract_rows
+from .errors import AhrefsBudgetExceededError
+
+logger = logging.getLogger(__name__)
+
+_current_tag: contextvars.ContextVar[str] = contextvars.ContextVar("ahrefs_unit_tag", default="default")
+
+
+@contextmanager
+def tagged(tag: str) -> Iterator[None]:
+    """Attribute API units spent inside the block to `tag` (e.g. "landing-page", "nightly-export")."""
+    token = _current_tag.set(tag)
+    try:
+        yield
+    finally:
+        _current_tag.reset(token)
+
+
+def current_tag() -> str:
+    return _current_tag.get()
+
+
+def key_fingerprint(api_key: Optional[str]) -> str:
+    """Stable, non-reversible identifier for an API key, safe to log and export."""
+    if not api_key:
+        return "anonymous"
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+# Ahrefs charges a minimum per request plus a per-row component; subscription,
+# management and public endpoints are free. Keys ending in "*" match by prefix;
+# exact entries come from the endpoint table (EndpointSpec.cost).
+DEFAULT_COSTS: Dict[str, EndpointCost] = {
+    "/subscription/*": EndpointCost(0),
+    "/management/*": EndpointCost(0),
+    "/public/*": EndpointCost(0),
+}
+DEFAULT_COSTS.update({spec.path: spec.cost for spec in ENDPOINTS if spec.cost is not None})
+
+
+class CostTable:
+    def __init__(self, costs: Optional[Dict[str, EndpointCost]] = None, *, default: EndpointCost = EndpointCost(50, 1)) -> None:
+        merged = dict(DEFAULT_COSTS)
+        merged.update(costs or {})
+        self.default = default
+        self._exact = {k: v for k, v in merged.items() if not k.endswith("*")}
+        # longest prefix first so more specific entries win
+        self._prefixes = sorted(((k[:-1], v) for k, v in merged.items() if k.endswith("*")), key=lambda kv: -len(kv[0]))
+
+    def cost_for(self, path: str) -> EndpointCost:
+        cost = self._exact.get(path)
+        if cost is not None:
+            return cost
+        for prefix, cost in self._prefixes:
+            if path.startswith(prefix):
+                return cost
+        return self.default
+
+    def estimate(self, path: str, *, params: Optional[Dict[str, Any]] = None, json: Optional[Dict[str, Any]] = None) -> float:
+        """Pre-request estimate: rows are bounded by `limit` (or the number of batch items)."""
+        cost = self.cost_for(path)
+        rows = 0
+        if params and "limit" in params:
+            try:
+                rows = int(params["limit"])
+            except (TypeError, ValueError):
+                rows = 0
+        elif json and isinstance(json.get("items"), list):
+            rows = len(json["items"])
+        return cost.per_request + cost.per_row * rows
+
+    def actual(self, path: str, rows: int) -> float:
+        cost = self.cost_for(path)
+        return cost.per_request + cost.per_row * rows
+
+
+def count_rows(data: Any) -> int:
+    """Row count of a response payload: the length of its largest top-level list."""
+    return len(extract_rows(data))
+
+
+class UnitLedger:
+    """
+    Thread-safe record of API units spent, keyed by (api key fingerprint, caller tag, endpoint).
+
+    `reconcile()` anchors the running total of a key to the upstream usage figure;
+    units recorded afterwards are added on top until the next reconcile.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str, str], List[float]] = {}  # -> [units, rows, requests]
+        self._since_reconcile: Dict[str, float] = {}
+        self._upstream: Dict[str, Tuple[float, Optional[float], float]] = {}  # key -> (used, limit, at)
+
+    def record(self, key_id: str, tag: str, endpoint: str, units: float, rows: int = 0) -> None:
+        with self._lock:
+            entry = self._entries.setdefault((key_id, tag, endpoint), [0.0, 0.0, 0.0])
+            entry[0] += units
+            entry[1] += rows
+            entry[2] += 1
+            self._since_reconcile[key_id] = self._since_reconcile.get(key_id, 0.0) + units
+
+    def reconcile(self, key_id: str, *, used: float, limit: Optional[float]) -> None:
+        with self._lock:
+            self._upstream[key_id] = (used, limit, time.time())
+            self._since_reconcile[key_id] = 0.0
+
+    def used(self, key_id: str) -> float:
+        """Best estimate of units used this period: last upstream figure plus local spend since."""
+        with self._lock:
+            upstream = self._upstream.get(key_id)
+            return (upstream[0] if upstream else 0.0) + self._since_reconcile.get(key_id, 0.0)
+
+    def limit(self, key_id: str) -> Optional[float]:
+        with self._lock:
+            upstream = self._upstream.get(key_id)
+            return upstream[1] if upstream else None
+
+    def totals(self, *, by: Tuple[str, ...] = ("key", "tag", "endpoint")) -> Dict[Tuple[str, ...], Dict[str, float]]:
+        """Aggregate units/rows/requests grouped by any of "key", "tag", "endpoint"."""
+        index = {"key": 0, "tag": 1, "endpoint": 2}
+        out: Dict[Tuple[str, ...], Dict[str, float]] = {}
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._entries.items()]
+        for key, (units, rows, requests) in items:
+            group = tuple(key[index[b]] for b in by)
+            agg = out.setdefault(group, {"units": 0.0, "rows": 0.0, "requests": 0.0})
+            agg["units"] += units
+            agg["rows"] += rows
+            agg["requests"] += requests
+        return out
+
+
+def parse_limits_and_usage(payload: Dict[str, Any]) -> Tuple[Optional[float], Optional[float]]:
+    """Extract (units used, units limit) from a `subscription/limits-and-usage` response.
+
+    Per-key figures are preferred over workspace-wide ones when both are present.
+    """
+    body: Any = payload
+    for wrapper in ("data", "limits_and_usage"):
+        if isinstance(body, dict) and isinstance(body.get(wrapper), dict):
+            body = body[wrapper]
+    if not isinstance(body, dict):
+        return None, None
+
+    def pick(*names: str) -> Optional[float]:
+        for name in names:
+            value = body.get(name)
+            if isinstance(value, (int, float)):
+                return float(value)
+        return None
+
+    used = pick("units_usage_api_key", "units_usage_workspace", "units_used", "usage")
+    limit = pick("units_limit_api_key", "units_limit_workspace", "units_limit", "limit")
+    return used, limit
+
+
+class BudgetGuard:
+    """
+    Pre-flight check against the unit budget of an API key.
+
+    - mode="hard": requests whose estimate would push usage past the limit raise
+      `AhrefsBudgetExceededError`.
+    - mode="soft": once usage passes `soft_ratio` of the limit, requests from tags
+      not listed in `priority_tags` are deprioritised: they queue in the bottom
+      lane of the client's (or pooled key's) `PriorityScheduler`, or, when there
+      is none, are delayed by `soft_delay_s` on the calling thread.
+
+    The limit is `monthly_units` when given, otherwise the last reconciled upstream limit.
+    """
+
+    def __init__(
+        self,
+        *,
+        monthly_units: Optional[float] = None,
+        mode: str = "hard",
+        soft_ratio: float = 0.9,
+        soft_delay_s: float = 1.0,
+        priority_tags: Tuple[str, ...] = (),
+    ) -> None:
+        if mode not in ("hard", "soft"):
+            raise ValueError("mode must be 'hard' or 'soft'")
+        self.monthly_units = monthly_units
+        self.mode = mode
+        self.soft_ratio = soft_ratio
+        self.soft_delay_s = soft_delay_s
+        self.priority_tags = frozenset(priority_tags)
+
+    def check(self, ledger: UnitLedger, key_id: str, estimate: float, tag: str) -> bool:
+        """Raise when the request must be rejected; return True when it should be deprioritised."""
+        if estimate <= 0:
+            return False
+        limit = self.monthly_units if self.monthly_units is not None else ledger.limit(key_id)
+        if limit is None:
+            return False
+        used = ledger.used(key_id)
+        if used + estimate > limit and (self.mode == "hard" or tag not in self.priority_tags):
+            raise AhrefsBudgetExceededError(
+                f"Request estimated at {estimate:g} units would exceed the budget ({used:g}/{limit:g} used)",
+                estimate=estimate,
+                used=used,
+                limit=limit,
+            )
+        return self.mode == "soft" and tag not in self.priority_tags and used + estimate > limit * self.soft_ratio
+
+
+class UnitReconciler:
+    """Background thread that periodically reconciles a client's ledger with upstream usage."""
+
+    def __init__(self, client: Any, *, interval_s: float = 300.0) -> None:
+        self.client = client
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def reconcile_once(self) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Anchor the ledger to upstream usage; returns (used, limit). With a key
+        pool every pooled key is reconciled on its own and the totals over the
+        keys that answered are returned.
+        """
+        pool = getattr(self.client, "key_pool", None)
+        if pool is None:
+            used, limit = parse_limits_and_usage(self.client.get_limits_and_usage())
+            if used is not None:
+                self.client.ledger.reconcile(key_fingerprint(self.client.api_key), used=used, limit=limit)
+            return used, limit
+        path = self.client.get_limits_and_usage.endpoint.path
+        total_used: Optional[float] = None
+        total_limit: Optional[float] = None
+        for key in pool.keys:
+            try:
+                # straight to this key, bypassing the pool's choice of key
+                used, limit = parse_limits_and_usage(self.client._send("GET", path, key=key))
+            except Exception:  # one rejected key must not stop the others
+                logger.exception("ahrefs unit reconciliation failed for key %s", key.fingerprint)
+                continue
+            if used is None:
+                continue
+            self.client.ledger.reconcile(key.fingerprint, used=used, limit=limit)
+            total_used = (total_used or 0.0) + used
+            if limit is not None:
+                total_limit = (total_limit or 0.0) + limit
+        return total_used, total_limit
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.reconcile_once()
+            except Exception:  # keep reconciling after transient upstream failures
+                logger.exception("ahrefs unit reconciliation failed")
+            self._stop.wait(self.interval_s)
+
+    def start(self) -> "UnitReconciler":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="ahrefs-unit-reconciler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+LEDGER = UnitLedger()
@@ -0,0 +1,249 @@
+"""
+Start-up warm-up: DNS caching and pre-opened keep-alive connections.
+
+Right after a deploy the first requests to `AHREFS_BASE_URL` each pay for a
+DNS lookup, a TCP connect and a TLS handshake. `warm_up(client)` does that
+work ahead of time: it resolves the API host into `DNS_CACHE` and opens
+`connections` connections into the client's pool, where the first requests
+find them. The cache is scoped to the client's adapter (`install_dns_cache`):
+its pools look hosts up there until the TTL runs out, while the rest of the
+process keeps resolving as usual.
+
+    app = FastAPI(lifespan=warmup.lifespan)  # or `await warm_up_default()` in your own lifespan
+
+`warm_up_default` warms the session shared by the router's default clients
+(see `config.get_client`), using `AHREFS_WARMUP_CONNECTIONS` and
+`AHREFS_DNS_TTL_S`. Failures are logged and counted, never raised: a cold
+start is slower, not broken.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import socket
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .metrics import REGISTRY, WARMUP_CONNECTIONS, WARMUP_DURATION, MetricsRegistry
+
+if TYPE_CHECKING:
+    from .client import AhrefsClient
+
+logger = logging.getLogger(__name__)
+
+
+class DnsCache:
+    """
+    `getaddrinfo` results per host and port, with a TTL. Nothing global is
+    patched: only connections opened by pools `install_dns_cache` set up on an
+    adapter look hosts up here. An expired entry whose refresh fails is served stale.
+    """
+
+    def __init__(self, ttl_s: float = 300.0, *, metrics: Optional[MetricsRegistry] = None) -> None:
+        self.ttl_s = ttl_s
+        self.metrics = metrics or REGISTRY
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, Any], Tuple[float, List[Any]]] = {}
+
+    def resolve(self, host: str, port: Any, family: int = 0) -> List[Any]:
+        """Stream-socket addresses of `host` (from the cache while fresh), limited to `family` when given."""
+        return [info for info in self._lookup(host, port) if not family or info[0] == family]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _upstream(self, host: str, port: Any) -> List[Any]:
+        return socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+
+    def _lookup(self, host: str, port: Any) -> List[Any]:
+        now = time.monotonic()
+        cached = self._entries.get((host, port))
+        fresh = cached is not None and cached[0] > now
+        self.metrics.record_cache("dns", fresh)
+        if cached is not None and fresh:
+            return cached[1]
+        try:
+            result = self._upstream(host, port)
+        except OSError:
+            if cached is None:
+                raise
+            logger.warning("DNS refresh for %s failed; serving the cached addresses", host)
+            return cached[1]
+        with self._lock:
+            self._entries[(host, port)] = (now + self.ttl_s, result)
+        return result
+
+
+DNS_CACHE = DnsCache()
+
+
+def _pool_class(base: type, cache: Optional[DnsCache]) -> type:
+    """`base` connection pool that can pre-open connections and, with a cache, resolves through it."""
+    from urllib3.exceptions import EmptyPoolError, HTTPError
+
+    connection_cls = base.ConnectionCls
+    if cache is not None:
+        connection_cls = type(f"CachedDns{connection_cls.__name__}", (_CachedDnsConnection, connection_cls), {"dns_cache": cache})
+
+    def prewarm(self: Any, connections: int) -> Tuple[int, int]:
+        """Connect up to `connections` idle pooled connections; returns (open, failed)."""
+        conns = []
+        for _ in range(min(connections, self.pool.maxsize)):
+            try:
+                conns.append(self._get_conn(timeout=1.0))
+            except EmptyPoolError:  # the rest are checked out by live requests
+                break
+        opened = failed = 0
+        for conn in conns:
+            try:
+                if not conn.is_connected:
+                    conn.connect()
+                opened += 1
+            except (OSError, HTTPError) as exc:
+                logger.warning("Warm-up connection to %s failed: %s", self.host, exc)
+                conn.close()
+                failed += 1
+        for conn in conns:
+            self._put_conn(conn)
+        return opened, failed
+
+    return type(
+        f"Warm{base.__name__}", (base,), {"ConnectionCls": connection_cls, "dns_cache": cache, "plain": base, "prewarm": prewarm}
+    )
+
+
+class _CachedDnsConnection:
+    """Mixin for urllib3 connections: look the host up in `dns_cache` and connect to its addresses in turn."""
+
+    dns_cache: DnsCache
+
+    def _new_conn(self) -> socket.socket:
+        from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+        from urllib3.util.connection import allowed_gai_family, create_connection
+
+        try:
+            infos = self.dns_cache.resolve(self.host, self.port, allowed_gai_family())
+        except socket.gaierror as exc:
+            raise NameResolutionError(self.host, self, exc) from exc
+        error: Optional[Exception] = None
+        for info in infos:
+            try:
+                # a literal address: create_connection does no further lookup
+                return create_connection(
+                    (info[4][0], self.port), self.timeout, source_address=self.source_address, socket_options=self.socket_options
+                )
+            except socket.timeout:
+                error = ConnectTimeoutError(self, f"Connection to {self.host} timed out. (connect timeout={self.timeout})")
+            except OSError as exc:
+                error = NewConnectionError(self, f"Failed to establish a new connection: {exc}")
+        raise error or NameResolutionError(self.host, self, socket.gaierror(f"no addresses for {self.host}"))
+
+
+def install_dns_cache(adapter: Any, cache: Optional[DnsCache]) -> None:
+    """
+    Give a requests `HTTPAdapter`'s pools `prewarm()` and, with `cache`, DNS
+    lookups through it. Pools the adapter already built are closed, so the next
+    request gets one of the new kind.
+    """
+    manager = adapter.poolmanager
+    classes = manager.pool_classes_by_scheme
+    if all(hasattr(cls, "prewarm") and cls.dns_cache is cache for cls in classes.values()):
+        return
+    # a new dict: the default one is shared by every PoolManager in the process
+    manager.pool_classes_by_scheme = {scheme: _pool_class(getattr(cls, "plain", cls), cache) for scheme, cls in classes.items()}
+    manager.clear()
+
+
+class WarmupReport(NamedTuple):
+    host: str
+    addresses: List[str]
+    connections: int  # opened (or already open) in the pool
+    failed: int
+    dns_s: float
+    connect_s: float
+
+
+def warm_up(
+    client: "AhrefsClient",
+    *,
+    connections: int = 4,
+    dns_ttl_s: float = 300.0,
+    dns_cache: Optional[DnsCache] = None,
+) -> WarmupReport:
+    """
+    Resolve the client's API host (cached for `dns_ttl_s`; 0 skips the cache)
+    and open up to `connections` keep-alive connections in its pool (at most the
+    pool's `pool_maxsize`). Transports without a urllib3 pool (cassettes, HTTP/2)
+    only get the DNS step.
+    """
+    from requests.adapters import HTTPAdapter
+
+    metrics = client.metrics
+    parts = urlsplit(client.base_url)
+    host = parts.hostname or ""
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    adapter = client.session.get_adapter(client.base_url)
+    pooled = isinstance(adapter, HTTPAdapter)
+
+    start = time.perf_counter()
+    addresses: List[str] = []
+    cache = None
+    try:
+        if dns_ttl_s > 0:
+            cache = dns_cache or DNS_CACHE
+            cache.ttl_s = dns_ttl_s
+            infos = cache.resolve(host, port)
+        else:
+            infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        addresses = sorted({info[4][0] for info in infos})
+    except OSError as exc:
+        logger.warning("Warm-up could not resolve %s: %s", host, exc)
+    if pooled:
+        install_dns_cache(adapter, cache)
+    dns_s = time.perf_counter() - start
+    metrics.observe(WARMUP_DURATION, (("phase", "dns"),), dns_s)
+
+    start = time.perf_counter()
+    opened, failed = _open_connections(client, adapter, connections) if pooled and connections > 0 and addresses else (0, 0)
+    connect_s = time.perf_counter() - start
+    metrics.observe(WARMUP_DURATION, (("phase", "connect"),), connect_s)
+    metrics.inc(WARMUP_CONNECTIONS, (("result", "ok"),), opened)
+    if failed:
+        metrics.inc(WARMUP_CONNECTIONS, (("result", "error"),), failed)
+    return WarmupReport(host, addresses, opened, failed, dns_s, connect_s)
+
+
+def _open_connections(client: "AhrefsClient", adapter: Any, connections: int) -> Tuple[int, int]:
+    from requests import Request
+    from requests.utils import select_proxy
+
+    session = client.session
+    settings = session.merge_environment_settings(client.base_url, {}, None, None, None)
+    if select_proxy(client.base_url, settings["proxies"]):
+        return 0, 0  # requests go through the proxy's pool, not the host's
+    # The same pool requests will use for this URL: pool keys include the TLS
+    # settings, which `Session.request` merges with the environment (CA bundle)
+    request = Request("GET", client.base_url).prepare()
+    _, pool_kwargs = adapter.build_connection_pool_key_attributes(request, settings["verify"], settings["cert"])
+    pool = adapter.poolmanager.connection_from_url(client.base_url, pool_kwargs=pool_kwargs)
+    return pool.prewarm(connections)
+
+
+async def warm_up_default(connections: Optional[int] = None) -> WarmupReport:
+    """Start-up hook: warm the session behind `config.get_client()` off the event loop."""
+    from .config import get_client, get_settings
+
+    s = get_settings()
+    count = s.warmup_connections if connections is None else connections
+    return await asyncio.to_thread(warm_up, get_client(), connections=count, dns_ttl_s=s.dns_ttl_s)
+
+
+@asynccontextmanager
+async def lifespan(app: Any) -> AsyncIterator[None]:
+    """FastAPI lifespan that warms up before the app starts serving."""
+    await warm_up_default()
+    yield